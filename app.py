@@ -2,18 +2,31 @@ import streamlit as st
 import pandas as pd
 import os
 import json 
-from src.etl import load_data
+import shutil
+import functools
+from src.etl import STATEMENTS_DIR, list_statements
+from src.ingest import start_ingest
 from src.analytics import generate_advice, check_budget, get_top_expenses
 from src.ai_advisor import get_financial_advice
-from src.forecast import project_goal_date
+from src.forecast import project_goal_date, monthly_net_savings, simulate_goal
+from src.logic import ALLOCATION_RULES, allocate_goals
 from src.charts import plot_sankey, get_bucket_html
-from src.history import load_history, plot_monthly_overview, plot_category_trends
+from src.history import load_history
+from src.store import load_month, month_fingerprint, append_overrides
+from src.ledger import LEDGER_ENABLED, LEDGER_FILE, sync_ledger, ledger_months, ledger_cube, read_budgets, save_budgets, read_goals, save_goals
+from src.editor import COMBO_SEP, SORT_COLUMNS, filter_positions, editor_page, page_count, collect_edits, with_pending, pending_changes
+from src.cube import CUBE_COLUMNS, update_cube, month_totals
+from src.frame import TransactionFrame
+from src.perf import TRACE_DIR, enable, start_trace, end_trace, span, timed, count, trace_rows
 from src.styles import apply_pro_style, render_hero_section, display_dashboard_card
 
 # --- 1. CONFIG ---
 st.set_page_config(page_title="AI CFO", page_icon="💳", layout="wide")
 apply_pro_style()
 
+# Performance tracing (toggle στο sidebar, ανά session): ένα trace ανά rerun, κλείνει στο τέλος του script
+start_trace("rerun", enabled=st.session_state.get('perf_on', False))
+
 # --- 0. DATA & SETTINGS ---
 os.makedirs("config", exist_ok=True)
 BUDGET_FILE = "config/budget_limits.json"
@@ -40,11 +53,30 @@ if 'budget_limits' not in st.session_state:
     if os.path.exists(BUDGET_FILE):
         with open(BUDGET_FILE, "r", encoding='utf-8') as f: st.session_state.budget_limits = json.load(f)
     else: st.session_state.budget_limits = DEFAULT_BUDGETS.copy()
+    # Με το SQLite ledger τα όρια ζουν στη βάση (την πρώτη φορά μεταφέρονται εκεί αυτά του JSON)
+    if LEDGER_ENABLED: st.session_state.budget_limits = read_budgets() or save_budgets(st.session_state.budget_limits)
 
 if 'goals_config' not in st.session_state:
     if os.path.exists(GOALS_FILE):
         with open(GOALS_FILE, "r", encoding='utf-8') as f: st.session_state.goals_config = json.load(f)
     else: st.session_state.goals_config = DEFAULT_GOALS.copy()
+    if LEDGER_ENABLED: st.session_state.goals_config = read_goals() or save_goals(st.session_state.goals_config)
+
+# Μία εισαγωγή ανά σύνολο statements για όλο το process: όλα τα sessions (tabs/browsers) βλέπουν το ίδιο job
+@st.cache_resource(show_spinner=False, max_entries=4)
+def shared_ingest(statements):
+    return start_ingest([path for path, _, _ in statements])
+
+def statement_set():
+    # Το κλειδί του shared_ingest: αλλάζει μόνο όταν αλλάξουν τα αρχεία (νέο upload), όχι σε κάθε rerun
+    statements = []
+    for path in list_statements():
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            continue   # Το σβήνει τώρα ένα upload σε άλλο session
+        statements.append((path, file_stat.st_size, file_stat.st_mtime_ns))
+    return tuple(statements)
 
 # ==============================================================================
 # SIDEBAR
@@ -52,15 +84,42 @@ if 'goals_config' not in st.session_state:
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/4712/4712109.png", width=80)
     st.markdown("### Control Center")
-    uploaded_file = st.file_uploader("Upload Statement (CSV/TXT)", type=['txt', 'csv'])
+    uploaded_files = st.file_uploader("Upload Statements (CSV/TXT)", type=['txt', 'csv'], accept_multiple_files=True)
     
-    if uploaded_file:
-        save_path = "data/raw/bank_export.txt"
-        os.makedirs("data/raw", exist_ok=True)
-        with open(save_path, "wb") as f: f.write(uploaded_file.getbuffer())
-        st.success("File Processed!", icon="✅")
-        # Καθαρίζουμε τη μνήμη για να φορτώσει το νέο αρχείο
-        if 'raw_data' in st.session_state: del st.session_state.raw_data
+    if uploaded_files:
+        # Μόνο για νέο upload: τα reruns με τα ίδια αρχεία στον uploader δεν ξαναφορτώνουν τίποτα
+        upload_ids = [f.file_id for f in uploaded_files]
+        if st.session_state.get('upload_ids') != upload_ids:
+            # Μια εισαγωγή που τρέχει ακόμα σταματάει (στο επόμενο chunk) πριν αλλάξουν τα αρχεία
+            if 'ingest_job' in st.session_state:
+                st.session_state.ingest_job.cancel()
+                st.session_state.ingest_job.wait()
+            # Τα νέα statements αντικαθιστούν τα προηγούμενα (ένα αρχείο ανά statement, με το όνομά του)
+            shutil.rmtree(STATEMENTS_DIR, ignore_errors=True)
+            os.makedirs(STATEMENTS_DIR, exist_ok=True)
+            with span("upload_write", files=len(uploaded_files), bytes=sum(f.size for f in uploaded_files)):
+                for uploaded in uploaded_files:
+                    stem, ext = os.path.splitext(os.path.basename(uploaded.name))
+                    save_path, n = os.path.join(STATEMENTS_DIR, stem + ext), 1
+                    while os.path.exists(save_path):   # Ίδιο όνομα από άλλο φάκελο
+                        n += 1
+                        save_path = os.path.join(STATEMENTS_DIR, f"{stem}-{n}{ext}")
+                    with open(save_path, "wb") as f: f.write(uploaded.getbuffer())
+            st.session_state.upload_ids = upload_ids
+            # Νέα εισαγωγή για τα νέα αρχεία (και για τα άλλα sessions) και καθαρισμός της μνήμης
+            st.session_state.ingest_job = shared_ingest(statement_set())
+            if 'raw_data' in st.session_state: del st.session_state.raw_data
+        st.success(f"{len(uploaded_files)} file(s) processed!", icon="✅")
+
+    # Statements που δεν φορτώθηκαν (στάδιο + αιτία) και η αναφορά της τελευταίας εισαγωγής
+    if 'ingest_job' in st.session_state and st.session_state.ingest_job.done:
+        last_import = st.session_state.ingest_job.progress()
+        for error in last_import.errors:
+            st.error(f"⚠️ {error.file or 'Import'}: {error}")
+        for warning in last_import.warnings:
+            st.warning(f"⚠️ {warning}")
+        if last_import.files_total:
+            st.caption(f"🧾 Last import: {last_import.report.new} new, {last_import.report.duplicate} duplicate transactions")
     
     st.markdown("---")
     
@@ -75,7 +134,9 @@ with st.sidebar:
         if b_changed and st.button("Save Budgets"):
             st.session_state.budget_limits = new_limits
             # Σημείωση: Στο Cloud το αρχείο δεν σώζεται μόνιμα, αλλά κρατιέται όσο είναι ανοιχτό το site
-            with open(BUDGET_FILE, "w", encoding='utf-8') as f: json.dump(new_limits, f, ensure_ascii=False)
+            if LEDGER_ENABLED: save_budgets(new_limits)
+            else:
+                with open(BUDGET_FILE, "w", encoding='utf-8') as f: json.dump(new_limits, f, ensure_ascii=False)
             st.rerun()
 
     with st.expander("🎯 Savings Goals"):
@@ -83,47 +144,64 @@ with st.sidebar:
         ed_goals = st.data_editor(goals_df, num_rows="dynamic", use_container_width=True, key="goals_ed")
         if st.button("Save Goals"):
             st.session_state.goals_config = ed_goals.to_dict('records')
-            with open(GOALS_FILE, "w", encoding='utf-8') as f: json.dump(st.session_state.goals_config, f, ensure_ascii=False)
+            if LEDGER_ENABLED: save_goals(st.session_state.goals_config)
+            else:
+                with open(GOALS_FILE, "w", encoding='utf-8') as f: json.dump(st.session_state.goals_config, f, ensure_ascii=False)
             st.rerun()
 
+    with st.expander("⏱️ Performance"):
+        st.toggle("Trace reruns", key="perf_on", help=f"Χρόνος ανά στάδιο + ένα JSONL trace ανά rerun στο {TRACE_DIR}")
+        perf_slot = st.empty()
+
 # ==============================================================================
-# MAIN AREA
+# FRAGMENTS
+# Κάθε κομμάτι του dashboard ξανατρέχει μόνο του όταν αλλάζει κάποιο δικό του widget.
+# Τα ακριβά inputs γίνονται memoize με κλειδί το fingerprint του μήνα στο store.
 # ==============================================================================
-render_hero_section()
+def traced_fragment(name):
+    # Ένα fragment που ξανατρέχει μόνο του τρέχει σε δικό του thread: το tracing ακολουθεί το toggle του session
+    def decorate(fn):
+        traced = timed(name, root=True)(fn)
 
-# Εδώ ελέγχουμε αν υπάρχει αρχείο. Αν όχι, σταματάμε και δεν δείχνουμε τίποτα.
-try:
-    if 'raw_data' not in st.session_state: st.session_state.raw_data = load_data()
-    df = st.session_state.raw_data
-except:
-    # Μήνυμα υποδοχής χωρίς προσωπικά δεδομένα
-    st.info("👋 **Welcome to your private AI CFO!**\n\nTo see your dashboard, please upload your bank statement from the sidebar.")
-    st.markdown("---")
-    st.caption("🔒 *Privacy Note: Your data is processed in memory and is wiped when you close this tab.*")
-    st.stop() # Σταματάει εδώ η εκτέλεση μέχρι να ανέβει αρχείο
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            enable(st.session_state.get('perf_on', False))
+            return traced(*args, **kwargs)
+        return wrapper
+    return decorate
 
-# Month Selection
-col_sel, _ = st.columns([1, 3])
-with col_sel:
-    all_months = sorted(df['Month'].unique(), reverse=True)
-    selected_month = st.selectbox("📅 Select Period", all_months)
+# cache_resource (όχι cache_data): κρατάμε το ίδιο TransactionFrame, μαζί με τα views του, ανάμεσα στα reruns
+@st.cache_resource(show_spinner=False, max_entries=12)
+def cached_month(month, fingerprint):
+    count("cache_miss:month")
+    return TransactionFrame(load_month(month))
 
-os.makedirs("data/processed", exist_ok=True)
-proc_path = f"data/processed/corrected_{selected_month}.csv"
-if not os.path.exists(proc_path):
-    df[df['Month'] == selected_month].to_csv(proc_path, index=False)
-month_df = pd.read_csv(proc_path) if os.path.exists(proc_path) else df[df['Month'] == selected_month]
-month_df['Date'] = pd.to_datetime(month_df['Date'])
+@st.cache_data(show_spinner=False)
+def cached_budget(fingerprint, limits, _month_df, _month_cube):
+    count("cache_miss:budget")
+    return check_budget(_month_df, custom_limits=limits, cube=_month_cube)
 
-# ==============================================================================
-# TABS INTERFACE
-# ==============================================================================
-tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "✍️ Editor", "📅 History"])
+@st.cache_data(show_spinner=False)
+def cached_sankey(fingerprint, _month_df, _month_cube):
+    count("cache_miss:sankey")
+    income, _ = month_totals(_month_cube)
+    return plot_sankey(_month_df, income, cube=_month_cube)
 
-# --- TAB 1: DASHBOARD ---
-with tab1:
-    income = month_df[month_df['Amount'] > 0]['Amount'].sum()
-    real_expenses = abs(month_df[(month_df['Amount'] < 0) & (month_df['Category'] != '💰 Αποταμίευση')]['Amount'].sum())
+@st.cache_data(show_spinner=False)
+def cached_top_expenses(fingerprint, month, _month_df):
+    count("cache_miss:top_expenses")
+    return get_top_expenses(_month_df, 10, month=month, ledger=LEDGER_FILE if LEDGER_ENABLED else None)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_editor_positions(fingerprint, filters, _month_df):
+    # Φιλτράρισμα + ταξινόμηση μία φορά ανά συνδυασμό φίλτρων: η αλλαγή σελίδας κοστίζει μόνο τη σελίδα
+    count("cache_miss:editor_positions")
+    return filter_positions(_month_df.df, **filters)
+
+@st.fragment
+@traced_fragment("fragment:kpis")
+def kpi_section(month_df, month_cube):
+    income, real_expenses = month_totals(month_cube)
     savings = income - real_expenses
     
     # KPIs
@@ -134,53 +212,61 @@ with tab1:
 
     if st.button("✨ Get AI Insights", type="primary"):
         with st.spinner("Analyzing..."):
-            st.info(get_financial_advice(month_df, income, real_expenses, savings))
+            st.info(get_financial_advice(month_df, income, real_expenses, savings, cube=month_cube))
 
-    st.markdown("---")
-    
-    col_main, col_side = st.columns([1.8, 1.2], gap="large")
-    
-    with col_main:
-        st.subheader("Monthly Budget Tracker")
-        budget_df = check_budget(month_df, custom_limits=st.session_state.budget_limits)
-        if not budget_df.empty:
-            budget_df['Status'] = budget_df['Status'].str.replace('✅ ', '').str.replace('⚠️ ', '')
-            st.dataframe(
-                budget_df, 
-                column_config={
-                    "Category": st.column_config.TextColumn("Category"),
-                    "Actual (€)": st.column_config.NumberColumn("Spent", format="%.0f €"),
-                    "Limit (€)": st.column_config.NumberColumn("Limit", format="%.0f €"),
-                    "Progress": st.column_config.ProgressColumn("Usage", format="%.0f%%", min_value=0, max_value=1),
-                }, hide_index=True, use_container_width=True
-            )
-        
-        st.markdown("##### 🌊 Cash Flow")
-        st.plotly_chart(plot_sankey(month_df, income), use_container_width=True)
-
-    with col_side:
-        st.subheader("Savings Vials")
-        goals_list = st.session_state.goals_config
-        if goals_list and goals_list[0]['target'] > 0: # Δείξε μόνο αν υπάρχει στόχος > 0
-            for goal in goals_list:
-                st.markdown(get_bucket_html(goal['saved'], goal['target'], goal['name']), unsafe_allow_html=True)
-            st.markdown("---")
-            st.markdown("**Simulator**")
-            sel_g = st.selectbox("Select Goal:", [g["name"] for g in goals_list])
-            act_g = next((g for g in goals_list if g["name"] == sel_g), goals_list[0])
-            val = st.slider(f"Add monthly:", 0, 2000, 200, 50)
-            msg, _ = project_goal_date(act_g['saved'], act_g['target'], val)
-            if val>0: st.caption(f"🗓️ Target Date: **{msg}**")
-        else:
-            st.info("ℹ️ Set your Savings Goals in the Sidebar to activate the Vials.")
+@st.fragment
+@traced_fragment("fragment:budget")
+def budget_section(month_df, month_cube, fingerprint):
+    st.subheader("Monthly Budget Tracker")
+    budget_df = cached_budget(fingerprint, st.session_state.budget_limits, month_df, month_cube)
+    if not budget_df.empty:
+        budget_df['Status'] = budget_df['Status'].str.replace('✅ ', '').str.replace('⚠️ ', '')
+        st.dataframe(
+            budget_df, 
+            column_config={
+                "Category": st.column_config.TextColumn("Category"),
+                "Actual (€)": st.column_config.NumberColumn("Spent", format="%.0f €"),
+                "Limit (€)": st.column_config.NumberColumn("Limit", format="%.0f €"),
+                "Progress": st.column_config.ProgressColumn("Usage", format="%.0f%%", min_value=0, max_value=1),
+            }, hide_index=True, use_container_width=True
+        )
 
-    st.markdown("---")
-    st.subheader("Top Transactions")
-    st.dataframe(get_top_expenses(month_df, 10), hide_index=True, use_container_width=True)
+@st.fragment
+@traced_fragment("fragment:sankey")
+def sankey_section(month_df, month_cube, fingerprint):
+    st.markdown("##### 🌊 Cash Flow")
+    st.plotly_chart(cached_sankey(fingerprint, month_df, month_cube), use_container_width=True)
 
-# --- TAB 2: EDITOR ---
-with tab2:
+@st.fragment
+@traced_fragment("fragment:simulator")
+def simulator_section(goals_list):
+    st.markdown("**Simulator**")
+    sel_g = st.selectbox("Select Goal:", [g["name"] for g in goals_list])
+    act_g = next((g for g in goals_list if g["name"] == sel_g), goals_list[0])
+    val = st.slider(f"Add monthly:", 0, 2000, 200, 50)
+    msg, _ = project_goal_date(act_g['saved'], act_g['target'], val)
+    if val>0: st.caption(f"🗓️ Target Date: **{msg}**")
+    # Monte Carlo: το ποσό του slider ως μέσος όρος + η διακύμανση των μηνών του ιστορικού
+    hist_savings = monthly_net_savings(cube=st.session_state.cube)
+    if val > 0 and len(hist_savings) > 1:
+        mc_msg, _, _ = simulate_goal(act_g['saved'], act_g['target'], val + (hist_savings - hist_savings.mean()))
+        st.caption(mc_msg)
+    with st.expander("🧮 Split across all goals"):
+        rule = st.radio("Allocation rule", ALLOCATION_RULES, horizontal=True, key="alloc_rule")
+        alloc_df, _ = allocate_goals(goals_list, val, rule, horizon=120)
+        st.dataframe(
+            alloc_df[["Goal", "Monthly", "Completion Date"]],
+            column_config={
+                "Monthly": st.column_config.NumberColumn("Monthly", format="%.0f €"),
+                "Completion Date": st.column_config.DateColumn("Done by", format="MM/YYYY"),
+            }, hide_index=True, use_container_width=True
+        )
+
+@st.fragment
+@traced_fragment("fragment:editor")
+def editor_section(month_df, selected_month):
     st.subheader("Transaction Editor")
+    if st.session_state.pop('editor_saved', False): st.success("Data Saved!")
     TAXONOMY = {
         "🍿 Lifestyle & Fun": ["Delivery", "Dining Out", "Entertainment", "Weekend Trip"],
         "🛍️ Shopping": ["Tech & Home", "Clothes", "Health & Beauty", "Misc Shopping"],
@@ -193,36 +279,213 @@ with tab2:
         "Salary": ["Payroll"],
         "Deposit/Gift": ["Deposits"]
     }
-    COMBO_OPTIONS = [f"{c} > {s}" for c, subs in TAXONOMY.items() for s in subs]
-    
-    edit_prep = month_df.copy()
-    edit_prep['Category'] = edit_prep['Category'] + " > " + edit_prep['Subcategory']
-    
+    COMBO_OPTIONS = [f"{c}{COMBO_SEP}{s}" for c, subs in TAXONOMY.items() for s in subs]
+
+    # Οι αλλαγές που δεν έχουν αποθηκευτεί, ανά Tx_Id (μένουν σε αλλαγή σελίδας ή φίλτρων)
+    if st.session_state.get('editor_pending', {}).get('month') != selected_month:
+        st.session_state.editor_pending = {'month': selected_month, 'edits': {}}
+    pending = st.session_state.editor_pending['edits']
+
+    # Φίλτρα & ταξινόμηση (server-side)
+    amounts = month_df['Amount_Cents']
+    low, high = float(amounts.min()) / 100, float(amounts.max()) / 100
+    f1, f2, f3, f4 = st.columns([2, 2, 2, 1])
+    with f1: categories = st.multiselect("Category", [str(c) for c in month_df['Category'].unique()], key="editor_categories")
+    with f2: text = st.text_input("Search", key="editor_text", placeholder="Description or reference")
+    with f3: amount_range = st.slider("Amount (€)", low, high, (low, high), key="editor_amount") if low < high else (low, high)
+    with f4:
+        uncategorized_only = st.checkbox("Uncategorized only", key="editor_uncategorized")
+        descending = st.toggle("Newest first", value=True, key="editor_descending")
+    sort_by = st.radio("Sort by", list(SORT_COLUMNS), horizontal=True, key="editor_sort")
+    filters = {
+        "categories": tuple(categories) or None,
+        "amount_range": None if tuple(amount_range) == (low, high) else tuple(amount_range),
+        "text": text.strip() or None,
+        "uncategorized_only": uncategorized_only,
+        "sort_by": sort_by,
+        "descending": descending,
+    }
+    positions = cached_editor_positions(month_fingerprint(selected_month), filters, month_df)
+    view_key = f"{selected_month}:{tuple(filters.values())}"   # Νέα φίλτρα -> από την αρχή (σελίδα 1)
+
+    pages = page_count(positions)
+    p1, p2 = st.columns([1, 4])
+    with p1: page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"editor_page:{view_key}") - 1
+    with p2: status = st.empty()   # Γεμίζει μετά τον editor, ώστε να μετράει και την τελευταία αλλαγή
+
+    # Μόνο η σελίδα που φαίνεται φτιάχνεται και στέλνεται στο browser
+    page_df = with_pending(editor_page(month_df.df, positions, page), pending)
+    # Ο λογαριασμός φαίνεται μόνο όταν ο μήνας έχει κινήσεις από περισσότερους από έναν
+    column_order = ["Date", "Transaction Description", "Amount", "Category"]
+    if 'Account' in month_df.columns and month_df['Account'].nunique() > 1:
+        column_order.insert(1, "Account")
+
     edited = st.data_editor(
-        edit_prep,
-        column_order=["Date", "Transaction Description", "Amount", "Category"],
+        page_df,
+        column_order=column_order,
         column_config={
             "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY", disabled=True),
+            "Account": st.column_config.TextColumn("Account", disabled=True),
             "Transaction Description": st.column_config.TextColumn("Description", disabled=True),
             "Amount": st.column_config.NumberColumn("Amount", format="%.2f €", disabled=True),
             "Category": st.column_config.SelectboxColumn("Categorize", options=COMBO_OPTIONS, width="large", required=True)
         },
-        hide_index=True, use_container_width=True, height=600, key="editor_main"
+        hide_index=True, use_container_width=True, height=600, key=f"editor_main:{view_key}:{page}"
     )
-    
+    collect_edits(page_df, edited, pending)
+    status.caption(f"{len(positions)} of {len(month_df)} transactions · page {page + 1}/{pages}" + (f" · ✏️ {len(pending)} unsaved" if pending else ""))
+
     if st.button("💾 Save Changes", type="primary", use_container_width=True):
-        split = edited['Category'].str.split(' > ', n=1, expand=True)
-        to_save = edited.copy()
-        to_save['Category'] = split[0]
-        to_save['Subcategory'] = split[1]
-        to_save.to_csv(proc_path, index=False)
-        st.success("Data Saved!")
+        # Στο journal γράφονται μόνο οι γραμμές που άλλαξαν (ταίριασμα με Tx_Id)· το partition του μήνα μένει ως έχει
+        append_overrides(pending_changes(month_df.df, pending), selected_month)
+        pending.clear()
+        if LEDGER_ENABLED: sync_ledger()   # Ξαναγράφεται μόνο αυτός ο μήνας
+        saved_df = cached_month(selected_month, month_fingerprint(selected_month))
+        st.session_state.cube = update_cube(st.session_state.cube, selected_month, saved_df.df)
+        # Οι αλλαγές επηρεάζουν και τα άλλα κομμάτια -> full rerun
+        st.session_state.editor_saved = True
+        st.rerun()
 
-# --- TAB 3: HISTORY ---
-with tab3:
+@st.fragment
+@traced_fragment("fragment:history")
+def history_section():
     st.subheader("Yearly Overview")
-    history_df = load_history()
-    if not history_df.empty:
+    if not st.session_state.cube.empty:
          st.info("Charts coming soon...")
     else:
-        st.info("No history yet.")
\ No newline at end of file
+        st.info("No history yet.")
+
+# ==============================================================================
+# MAIN AREA
+# ==============================================================================
+render_hero_section()
+
+def announce_import(job, progress):
+    # Μία φορά ανά εισαγωγή που τελείωσε
+    if st.session_state.get('ingest_reported') is not job:
+        st.session_state.ingest_reported = job
+        if progress.files_total: st.toast(f"🧾 {progress.report.new} new, {progress.report.duplicate} duplicate transactions")
+
+@st.fragment(run_every=1.0)
+def ingest_progress_section(job):
+    # Ξανατρέχει κάθε δευτερόλεπτο όσο τρέχει η εισαγωγή· full rerun μόνο όταν μπουν νέοι μήνες στο store ή υπάρχουν σφάλματα.
+    # Ένα restart με statements που έχουν ήδη εισαχθεί τελειώνει χωρίς να ξανατρέξει (και να ξαναφορτώσει) όλο το dashboard.
+    progress = job.progress()
+    if progress.published != st.session_state.get('ingest_published') or (not progress.running and progress.errors):
+        st.rerun()
+    if not progress.running:
+        announce_import(job, progress)
+        return
+    st.progress(progress.fraction, text=f"⏳ {progress.current} · {progress.rows_categorized:,} of {progress.rows_parsed:,} rows categorized · "
+                                        f"{len(progress.months)} month(s) ready ({progress.files_done}/{progress.files_total} files)")
+
+def load_ledger():
+    if LEDGER_ENABLED:
+        # SQLite ledger: ο cube (GROUP BY) και οι μήνες έρχονται από τη βάση, χωρίς να φορτωθεί όλο το ιστορικό
+        sync_ledger()
+        st.session_state.raw_data = None
+        st.session_state.cube = ledger_cube()
+    else:
+        # Το ledger είναι όλο το store (και παλιότερα imports), μέσα από το HistoryCache: για τους μήνες και τον cube
+        # διαβάζονται μόνο οι στήλες του cube (οι περιγραφές/σχόλια φορτώνονται ανά μήνα από το cached_month)
+        st.session_state.raw_data = TransactionFrame(load_history(columns=CUBE_COLUMNS))
+        # Ο aggregate cube χτίζεται μία φορά ανά φόρτωση και μετά ενημερώνεται ανά μήνα
+        st.session_state.cube = st.session_state.raw_data.cube
+    st.session_state.cube_synced = set()
+
+# Η εισαγωγή των statements τρέχει σε background thread (src.ingest): το dashboard δείχνει ό,τι έχει ήδη μπει στο store.
+# Στο store μπαίνουν μόνο οι νέες κινήσεις· όσες υπάρχουν ήδη κρατάνε τις διορθώσεις του Editor.
+# Κοινό job για όλα τα sessions: ένα δεύτερο tab δεν ξαναξεκινάει εισαγωγή των ίδιων αρχείων.
+st.session_state.ingest_job = shared_ingest(statement_set())
+job = st.session_state.ingest_job
+progress = job.progress()
+
+# Νέοι μήνες στο store -> ξαναφόρτωση (το HistoryCache / το sync του ledger διαβάζουν μόνο όσους άλλαξαν)
+if 'raw_data' not in st.session_state or st.session_state.get('ingest_published') != progress.published:
+    st.session_state.ingest_published = progress.published
+    load_ledger()
+if not progress.running:
+    announce_import(job, progress)
+
+if progress.running:
+    ingest_progress_section(job)
+df = st.session_state.raw_data
+all_months = ledger_months() if LEDGER_ENABLED else sorted(df.months, reverse=True) if len(df) else []
+
+if not all_months:
+    if progress.running:
+        st.info("⏳ Importing your statements... the first month appears here as soon as it is ready.")
+    elif progress.errors:
+        # Τα σφάλματα ανά αρχείο (στάδιο + αιτία) είναι στο sidebar· όχι η γενική οθόνη υποδοχής
+        st.warning(f"⚠️ None of the {progress.files_total} statement(s) could be imported. See the details in the sidebar.")
+    else:
+        # Μήνυμα υποδοχής χωρίς προσωπικά δεδομένα
+        st.info("👋 **Welcome to your private AI CFO!**\n\nTo see your dashboard, please upload your bank statement from the sidebar.")
+        st.markdown("---")
+        st.caption("🔒 *Privacy Note: Your data is processed in memory and is wiped when you close this tab.*")
+    end_trace()
+    st.stop() # Σταματάει εδώ η εκτέλεση μέχρι να υπάρχουν δεδομένα
+
+# Month Selection
+col_sel, _ = st.columns([1, 3])
+with col_sel:
+    selected_month = st.selectbox("📅 Select Period", all_months)
+
+fingerprint = month_fingerprint(selected_month)
+month_df = cached_month(selected_month, fingerprint)
+
+# Ο μήνας στο store μπορεί να έχει διορθώσεις από τον Editor: συγχρονίζουμε τον cube μία φορά
+if selected_month not in st.session_state.cube_synced:
+    st.session_state.cube = update_cube(st.session_state.cube, selected_month, month_df.df)
+    st.session_state.cube_synced.add(selected_month)
+month_cube = st.session_state.cube[st.session_state.cube['Month'] == selected_month]
+
+# ==============================================================================
+# TABS INTERFACE
+# ==============================================================================
+# Τρέχει μόνο το tab που είναι ανοιχτό: η αλλαγή tab κάνει rerun (on_change) και τότε υπολογίζεται το περιεχόμενό του
+tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "✍️ Editor", "📅 History"], key="main_tab", on_change="rerun")
+
+# --- TAB 1: DASHBOARD ---
+with tab1:
+    if tab1.open:
+        kpi_section(month_df, month_cube)
+
+        st.markdown("---")
+    
+        col_main, col_side = st.columns([1.8, 1.2], gap="large")
+    
+        with col_main:
+            budget_section(month_df, month_cube, fingerprint)
+            sankey_section(month_df, month_cube, fingerprint)
+
+        with col_side:
+            st.subheader("Savings Vials")
+            goals_list = st.session_state.goals_config
+            if goals_list and goals_list[0]['target'] > 0: # Δείξε μόνο αν υπάρχει στόχος > 0
+                for goal in goals_list:
+                    st.markdown(get_bucket_html(goal['saved'], goal['target'], goal['name']), unsafe_allow_html=True)
+                st.markdown("---")
+                simulator_section(goals_list)
+            else:
+                st.info("ℹ️ Set your Savings Goals in the Sidebar to activate the Vials.")
+
+        st.markdown("---")
+        st.subheader("Top Transactions")
+        st.dataframe(cached_top_expenses(fingerprint, selected_month, month_df), hide_index=True, use_container_width=True)
+
+# --- TAB 2: EDITOR ---
+with tab2:
+    if tab2.open: editor_section(month_df, selected_month)
+
+# --- TAB 3: HISTORY ---
+with tab3:
+    if tab3.open: history_section()
+
+# --- PERFORMANCE PANEL ---
+run_trace = end_trace()
+if run_trace is not None:
+    with perf_slot.container():
+        st.caption(f"Rerun: {run_trace.total_ms:.0f} ms")
+        st.dataframe(trace_rows(run_trace), hide_index=True)
+        if run_trace.counters: st.json(run_trace.counters)
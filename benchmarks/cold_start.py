@@ -0,0 +1,102 @@
+"""
+Cold start του dashboard: χρόνος από την εκκίνηση του process μέχρι να τελειώσει το πρώτο render του app.py.
+
+    python -m benchmarks.cold_start                         # 5 εκκινήσεις, 100k γραμμές, σύγκριση με το budget
+    python -m benchmarks.cold_start --rows 1m --runs 3 --budget 4
+
+Κάθε εκκίνηση είναι καινούργιο Python process (όπως ένα νέο container): imports + το πρώτο run του script
+μέσω streamlit.testing (AppTest, ο ίδιος script runner με τον server, χωρίς browser).
+Ο φάκελος της εφαρμογής έχει ήδη γεμάτο store και upload cache, όπως σε restart/scale-out (όχι πρώτο import).
+Exit code 1 αν ο διάμεσος χρόνος ξεπερνά το budget.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+
+import numpy as np
+
+from benchmarks.synthetic import ensure_export
+from benchmarks.run import BENCH_DIR, DATA_DIR, parse_size, environment, write_json
+from src.etl import STATEMENTS_DIR
+
+APP_FILE = os.path.join(os.path.dirname(BENCH_DIR), "app.py")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results", "cold_start.json")
+COLD_START_BUDGET = 2.0     # Δευτερόλεπτα (διάμεσος, 100k γραμμές), στο μηχάνημα των baselines
+DEFAULT_ROWS = "100k"
+DEFAULT_RUNS = 5
+
+# Τρέχει στο child process: μετράει μόνο του πόσο κράτησε το πρώτο run του script
+CHILD = """
+import sys, json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+start = time.perf_counter()
+at.run()
+script = time.perf_counter() - start
+print(json.dumps({"script": script, "errors": [e.message for e in at.exception]}), flush=True)
+if sys.argv[2] == "prepare":
+    at.session_state["ingest_job"].wait()   # Το πρώτο import ολοκληρώνεται πριν από τις μετρήσεις
+"""
+
+def launch(app_dir, mode="measure"):
+    """
+    Ένα καινούργιο process που τρέχει το app.py μία φορά. Επιστρέφει (δευτερόλεπτα μέχρι το πρώτο render, info του child).
+    """
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-c", CHILD, APP_FILE, mode], cwd=app_dir,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = child.stdout.readline()
+    elapsed = time.perf_counter() - start
+    child.wait()
+    if not line:
+        raise RuntimeError(f"app.py did not render (exit code {child.returncode})")
+    return elapsed, json.loads(line)
+
+def prepare_app_dir(rows):
+    """
+    Προσωρινός φάκελος εφαρμογής με ένα synthetic statement, ήδη εισηγμένο στο store.
+    """
+    app_dir = tempfile.mkdtemp(prefix="bench_cold_")
+    statements = os.path.join(app_dir, STATEMENTS_DIR)
+    os.makedirs(statements)
+    shutil.copy(ensure_export(DATA_DIR, rows, "cp1253-semi"), statements)
+    launch(app_dir, mode="prepare")
+    return app_dir
+
+def run_cold_start(rows, runs, log=print):
+    app_dir = prepare_app_dir(rows)
+    try:
+        samples = []
+        for i in range(runs):
+            elapsed, info = launch(app_dir)
+            if info["errors"]:
+                raise RuntimeError(f"app.py raised: {info['errors']}")
+            samples.append({"seconds": elapsed, "script": info["script"]})
+            log(f"run {i + 1}: {elapsed * 1000:8.0f} ms (script {info['script'] * 1000:.0f} ms)")
+    finally:
+        shutil.rmtree(app_dir, ignore_errors=True)
+    seconds = [s["seconds"] for s in samples]
+    return {"rows": rows, "median": float(np.median(seconds)), "best": min(seconds),
+            "script_median": float(np.median([s["script"] for s in samples])), "runs": samples}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start του app.py (process launch -> πρώτο render)")
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help="γραμμές του statement, π.χ. 10k, 100k, 1m")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget", type=float, default=COLD_START_BUDGET, help="δευτερόλεπτα (διάμεσος)")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    args = parser.parse_args(argv)
+
+    result = run_cold_start(parse_size(args.rows), args.runs)
+    write_json(args.results, {"meta": environment(), "budget": args.budget, "cold_start": result})
+    verdict = "OK" if result["median"] <= args.budget else "OVER BUDGET"
+    print(f"cold start median {result['median']:.2f}s (script {result['script_median']:.2f}s), budget {args.budget:.2f}s: {verdict}")
+    return 0 if verdict == "OK" else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Benchmarks όλης της διαδρομής ETL -> dashboard σε συνθετικά exports (βλ. benchmarks/synthetic.py).
+
+    python -m benchmarks.run                          # default μεγέθη -> benchmarks/results/latest.json
+    python -m benchmarks.run --sizes 1k,1m,10m --formats cp1253-semi
+    python -m benchmarks.run --save-baseline          # γράφει και το benchmarks/baselines/baseline.json
+    python -m benchmarks.run --check                  # μέτρηση + σύγκριση με το baseline (exit code 1 σε regression)
+    python -m benchmarks.run --check --no-run         # σύγκριση του τελευταίου results με το baseline
+
+Όλα τρέχουν offline: τα exports παράγονται τοπικά (benchmarks/data) και ξαναχρησιμοποιούνται.
+seconds = η καλύτερη από τις επαναλήψεις, peak_mb = python_mb + arrow_mb: peak των allocations Python/numpy
+(tracemalloc) + peak των buffers του Arrow (strings, parquet), που το tracemalloc δεν βλέπει.
+Τα baselines εξαρτώνται από το μηχάνημα: ξαναγράψτε τα (--save-baseline) όταν αλλάζει το περιβάλλον.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import ctypes
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.synthetic import FORMATS, ensure_export
+from src.etl import load_data, account_key, file_account_key, transaction_ids
+from src.frame import TransactionFrame
+from src.cube import month_totals
+from src.analytics import check_budget
+from src.ai_advisor import get_financial_advice
+from src.forecast import project_goal_date
+from src.store import save_month
+from src.charts import plot_sunburst, plot_spend_trend, plot_sankey, plot_monthly_overview, plot_category_trends
+from src import history
+from src import etl
+from src import ledger
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results", "latest.json")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baselines", "baseline.json")
+
+DEFAULT_SIZES = "1k,10k,100k"
+DEFAULT_THRESHOLD = 0.25    # +25% χρόνος ή μνήμη = regression
+MIN_SECONDS = 0.005         # Κάτω από 5ms οι διαφορές είναι θόρυβος
+MIN_MB = 1.0
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+def repeats_for(rows):
+    return 5 if rows <= 10_000 else 3 if rows <= 1_000_000 else 1
+
+def measure(fn, repeat):
+    """
+    Χρόνος (καλύτερος + διάμεσος των repeat εκτελέσεων) και, σε ξεχωριστή εκτέλεση, peak μνήμης:
+    tracemalloc για Python/numpy και ένα proxy memory pool ως default του Arrow, με δικό του max_memory ανά μέτρηση.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    previous_pool = pa.default_memory_pool()
+    arrow_pool = pa.proxy_memory_pool(previous_pool)
+    # Buffers που μένουν σε caches μετά τη μέτρηση δείχνουν ακόμα σε αυτό το pool: μένει ζωντανό ως το τέλος του process,
+    # αλλιώς στο shutdown μπορεί να σβηστεί πριν από αυτά (segfault)
+    ctypes.pythonapi.Py_IncRef(ctypes.py_object(arrow_pool))
+    pa.set_memory_pool(arrow_pool)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(previous_pool)
+    python_mb, arrow_mb = peak / 1e6, arrow_pool.max_memory() / 1e6
+    return {
+        "seconds": min(times), "median": float(np.median(times)),
+        "peak_mb": python_mb + arrow_mb, "python_mb": python_mb, "arrow_mb": arrow_mb, "repeat": repeat,
+    }
+
+def load_data_cold(path, memo_dir):
+    # Άδειο merchant memo (μνήμη + δίσκος) σε κάθε επανάληψη: μετράει και η κατηγοριοποίηση, όχι μόνο τα memo hits.
+    # Το memo_dir είναι προσωρινός φάκελος του benchmark: το memo του data/ δεν αγγίζεται ποτέ
+    etl._MEMOS.pop(memo_dir, None)
+    shutil.rmtree(memo_dir, ignore_errors=True)
+    return load_data(path, memo_dir)
+
+def _month_cases(month_df):
+    # Κάθε εκτέλεση παίρνει καινούργιο TransactionFrame, ώστε να μετράμε και τα views (όχι μόνο cache hits)
+    income, expenses = month_totals(TransactionFrame(month_df).cube)
+    return {
+        "check_budget": lambda: check_budget(TransactionFrame(month_df)),
+        "get_financial_advice": lambda: get_financial_advice(TransactionFrame(month_df), income, expenses, income - expenses),
+        "plot_sunburst": lambda: plot_sunburst(TransactionFrame(month_df)),
+        "plot_spend_trend": lambda: plot_spend_trend(TransactionFrame(month_df)),
+        "plot_sankey": lambda: plot_sankey(TransactionFrame(month_df), income),
+    }
+
+def _history_cases(df, store_dir):
+    def load_history_cold():
+        # Χωρίς snapshot: όλοι οι μήνες από το store (και εγγραφή του snapshot)
+        history._HISTORY_CACHES.clear()
+        if os.path.exists(history.snapshot_path(store_dir)): os.remove(history.snapshot_path(store_dir))
+        return history.load_history(folder=store_dir)
+
+    def load_history_restart():
+        # Νέο process, store αμετάβλητο: οι μήνες από το snapshot
+        history._HISTORY_CACHES.clear()
+        return history.load_history(folder=store_dir)
+
+    history.load_history(folder=store_dir)
+    return {
+        "load_history_cold": load_history_cold,
+        "load_history_restart": load_history_restart,
+        "load_history_warm": lambda: history.load_history(folder=store_dir),
+        "plot_monthly_overview": lambda: plot_monthly_overview(TransactionFrame(df)),
+        "plot_category_trends": lambda: plot_category_trends(TransactionFrame(df)),
+        "plot_spend_trend_history": lambda: plot_spend_trend(TransactionFrame(df)),
+    }
+
+def _ledger_cases(month, store_dir):
+    path = os.path.join(store_dir, "ledger.sqlite")
+    def sync_cold():
+        if os.path.exists(path): os.remove(path)
+        return ledger.sync_ledger(store_dir, path)
+
+    ledger.sync_ledger(store_dir, path)
+    return {
+        "ledger_sync_cold": sync_cold,
+        "ledger_sync_warm": lambda: ledger.sync_ledger(store_dir, path),
+        "ledger_cube_history": lambda: ledger.ledger_cube(path=path),
+        "ledger_check_budget": lambda: check_budget(None, cube=ledger.ledger_cube(month, path=path)),
+        "ledger_top_expenses": lambda: ledger.ledger_top_expenses(month, 10, path),
+    }
+
+def run_suite(sizes, formats, log=print):
+    memo_dir = tempfile.mkdtemp(prefix="bench_memo_")
+    try:
+        return _run_suite(sizes, formats, memo_dir, log)
+    finally:
+        shutil.rmtree(memo_dir, ignore_errors=True)
+        etl._MEMOS.pop(memo_dir, None)
+
+def _run_suite(sizes, formats, memo_dir, log):
+    results = {}
+    for rows in sizes:
+        repeat = repeats_for(rows)
+        tx = None
+        for fmt in formats:
+            path = ensure_export(DATA_DIR, rows, fmt)
+            key = f"load_data[{fmt},{rows}]"
+            results[key] = {**measure(lambda: load_data_cold(path, memo_dir), repeat), "rows": rows}
+            log(f"{key:45s} {results[key]['seconds'] * 1000:10.1f} ms {results[key]['peak_mb']:9.1f} MB")
+            if tx is None: tx, account = load_data(path, memo_dir), account_key(path) or file_account_key(path)
+
+        df = tx.df
+        month_df = tx.month(tx.months[-1]).df
+        store_dir = tempfile.mkdtemp(prefix="bench_store_")
+        try:
+            for month in tx.months:
+                part = tx.month(month).df
+                save_month(part.assign(Tx_Id=transaction_ids(part, account)), month, store_dir)
+            cases = {**_month_cases(month_df), **_history_cases(df, store_dir), **_ledger_cases(str(tx.months[-1]), store_dir)}
+            cases["project_goal_date"] = lambda: project_goal_date(1000, 5500, 200)
+            for name, fn in cases.items():
+                key = f"{name}[{rows}]"
+                results[key] = {**measure(fn, repeat), "rows": rows}
+                log(f"{key:45s} {results[key]['seconds'] * 1000:10.1f} ms {results[key]['peak_mb']:9.1f} MB")
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+    return results
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created": datetime.now().isoformat(timespec='seconds'),
+    }
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding='utf-8') as f: json.dump(payload, f, ensure_ascii=False, indent=2)
+
+def read_json(path):
+    with open(path, "r", encoding='utf-8') as f: return json.load(f)
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions: μετρήσεις που υπάρχουν και στα δύο και χειροτέρεψαν πάνω από threshold
+    (και πάνω από το όριο θορύβου). Επιστρέφει λίστα από dicts.
+    """
+    regressions = []
+    for key, base in baseline.items():
+        if key not in current: continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_MB)):
+            if metric == "peak_mb" and ("arrow_mb" in base) != ("arrow_mb" in current[key]):
+                continue  # Παλιό baseline χωρίς Arrow: τα peak_mb δεν συγκρίνονται (ξαναγράψτε το με --save-baseline)
+            old, new = base[metric], current[key][metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append({"case": key, "metric": metric, "baseline": old, "current": new, "ratio": new / old if old else float('inf')})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ETL -> dashboard benchmarks σε συνθετικά δεδομένα")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="π.χ. 1k,10k,100k,1m,10m")
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"από τα {', '.join(FORMATS)}")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--no-run", action="store_true", help="μόνο σύγκριση του --results με το baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.no_run:
+        results = read_json(args.results)["results"]
+    else:
+        sizes = [parse_size(s) for s in args.sizes.split(",")]
+        results = run_suite(sizes, args.formats.split(","))
+        payload = {"meta": environment(), "results": results}
+        write_json(args.results, payload)
+        if args.save_baseline:
+            write_json(args.baseline, payload)
+            print(f"Baseline saved: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline} (run with --save-baseline first)")
+            return 1
+        regressions = compare(results, read_json(args.baseline)["results"], args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} (x{r['ratio']:.2f})")
+        print(f"{len(regressions)} regression(s) over +{args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
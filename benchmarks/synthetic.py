@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pandas as pd
+from src.etl import CATEGORY_RULES, BANK_CATEGORY_RULES
+from src.ai_advisor import BONUS_KEYWORDS
+
+# Συνθετικά exports τραπέζης με τη μορφή του πραγματικού αρχείου:
+# λίγες γραμμές "εισαγωγής" πριν από το header, ελληνικά headers, ποσά '1.234,56 EUR'.
+HEADERS = ['Ημ/νία Συναλλαγής', 'Περιγραφή Συναλλαγής', 'Σχόλια / Κωδικός Αναφοράς', 'Ποσό', 'Κατηγορία']
+PREAMBLE = "Κίνηση Λογαριασμού\nIBAN GR0000000000000000000000000\n\n"
+FORMATS = {
+    'utf8-tab': ('utf-8', '\t'),
+    'utf8-semi': ('utf-8', ';'),
+    'cp1253-tab': ('cp1253', '\t'),
+    'cp1253-semi': ('cp1253', ';'),
+}
+GENERATE_CHUNK = 500_000
+YEARS = 10
+
+def merchant_pool():
+    """
+    Περιγραφές συναλλαγών από τα keywords των κανόνων (γίνονται π.χ. 'SKLAVENITIS 0412'),
+    μαζί με έμπορους που δεν ταιριάζουν σε κανέναν κανόνα (fallback στην κατηγορία της τράπεζας).
+    """
+    keywords = [kw for rule in CATEGORY_RULES for kw in rule[0]]
+    unknown = ['POS 4471 ATHINA', 'ΑΓΟΡΑ ΚΑΡΤΑΣ', 'ONLINE PAYMENT', 'ΠΛΗΡΩΜΗ ΟΦΕΙΛΗΣ', 'ΑΝΑΛΗΨΗ ATM']
+    return keywords + unknown
+
+def bank_pool():
+    # Κατηγορίες της τράπεζας (οι keywords του fallback) + κενές τιμές
+    return [rule[0][0].capitalize() for rule in BANK_CATEGORY_RULES] + ['Λοιπά', None]
+
+def _format_amounts(cents):
+    # -123456 -> '-1.234,56 EUR' (vectorized με τις .str πράξεις)
+    euros = pd.Series(np.abs(cents) // 100).map('{:,}'.format).str.replace(',', '.', regex=False)
+    decimals = pd.Series(np.abs(cents) % 100).astype(str).str.zfill(2)
+    sign = np.where(cents < 0, '-', '')
+    return sign + euros + ',' + decimals + ' EUR'
+
+def synthetic_frame(n, seed=0, start='2015-01-01', years=YEARS):
+    """
+    n συναλλαγές σε `years` χρόνια: κυρίως μικρά έξοδα, μισθοί/καταθέσεις και λίγα άκυρα ποσά.
+    """
+    rng = np.random.default_rng(seed)
+    merchants = np.array(merchant_pool(), dtype=object)
+    bank = np.array(bank_pool(), dtype=object)
+
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, 365 * years, n), unit='D')
+    cents = -np.rint(rng.gamma(2.0, 1500.0, n)).astype(np.int64)
+    income = rng.random(n) < 0.03
+    cents[income] = np.abs(np.rint(rng.normal(150_000, 30_000, income.sum()))).astype(np.int64)
+
+    descriptions = merchants[rng.integers(0, len(merchants), n)]
+    descriptions = np.where(income, np.where(rng.random(n) < 0.8, 'ΜΙΣΘΟΔΟΣΙΑ ΕΤΑΙΡΕΙΑΣ', 'ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ'), descriptions)
+    bonus = income & (rng.random(n) < 0.05)
+    descriptions = np.where(bonus, f'{BONUS_KEYWORDS[0]} ΕΤΑΙΡΕΙΑΣ', descriptions)
+    descriptions = pd.Series(descriptions, dtype=object) + ' ' + pd.Series(rng.integers(1000, 9999, n)).astype(str)
+
+    amounts = _format_amounts(cents)
+    amounts[rng.random(n) < 0.001] = 'n/a'   # Άκυρα ποσά όπως στα πραγματικά exports
+    references = pd.Series(rng.integers(0, 10**8, n)).map('REF{:08d}'.format).where(rng.random(n) < 0.7)
+
+    return pd.DataFrame({
+        HEADERS[0]: dates.strftime('%d/%m/%Y'),
+        HEADERS[1]: descriptions,
+        HEADERS[2]: references,
+        HEADERS[3]: amounts,
+        HEADERS[4]: bank[rng.integers(0, len(bank), n)],
+    })
+
+def write_export(path, n, fmt='utf8-tab', seed=0):
+    """
+    Γράφει ένα export n γραμμών σε chunks (σταθερή μνήμη ακόμα και για 10M γραμμές).
+    """
+    encoding, sep = FORMATS[fmt]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding=encoding, newline='') as f:
+        f.write(PREAMBLE)
+        for i, start in enumerate(range(0, n, GENERATE_CHUNK)):
+            chunk = synthetic_frame(min(GENERATE_CHUNK, n - start), seed=seed + i)
+            chunk.to_csv(f, sep=sep, index=False, header=(i == 0))
+    os.replace(tmp_path, path)
+    return path
+
+def ensure_export(data_dir, n, fmt='utf8-tab', seed=0):
+    """
+    Το ίδιο (n, fmt, seed) δίνει πάντα το ίδιο αρχείο, οπότε το ξαναχρησιμοποιούμε αν υπάρχει.
+    """
+    path = os.path.join(data_dir, f"export_{fmt}_{n}_{seed}.txt")
+    if not os.path.exists(path):
+        write_export(path, n, fmt, seed)
+    return path
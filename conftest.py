@@ -0,0 +1 @@
+# Κενό: κάνει τον φάκελο του repo rootdir του pytest, ώστε τα tests να κάνουν import το src
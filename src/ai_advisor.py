@@ -1,34 +1,62 @@
 import pandas as pd
+import numpy as np
+import re
+from src.cube import expenses_by_category, monthly_overview
+from src.frame import FIXED_CATEGORIES, as_transactions
+from src.perf import timed
 
-def get_financial_advice(df, income, expenses, savings):
+BONUS_KEYWORDS = ['ΔΩΡΟ', 'DORO', 'BONUS', 'XRISTOUGENNON', 'XMAS', 'CHRISTMAS', 'PASXA', 'EASTER', 'ΔΩΡΟΧΡ', 'DOROXRIST']
+_BONUS_PATTERN = '|'.join(re.escape(kw) for kw in BONUS_KEYWORDS)
+
+def _bonus_mask(df):
     """
-    V2.0 Smart CFO: Διαχωρίζει τα Δώρα/Bonus από τον Μισθό
-    για να δίνει ρεαλιστικές προβλέψεις και όχι φούσκες.
+    Έσοδα που μοιάζουν με Δώρο/Bonus (ένα regex σε όλη τη στήλη αντί για iterrows).
     """
-    
-    # --- 1. DETECT BONUS / ΔΩΡΟ ---
-    # Ψάχνουμε για έκτακτα εισοδήματα μέσα στις περιγραφές
-    income_rows = df[df['Amount'] > 0].copy()
-    bonus_keywords = ['ΔΩΡΟ', 'DORO', 'BONUS', 'XRISTOUGENNON', 'XMAS', 'CHRISTMAS', 'PASXA', 'EASTER', 'ΔΩΡΟΧΡ', 'DOROXRIST']
-    
-    bonus_amount = 0.0
-    for index, row in income_rows.iterrows():
-        text = (str(row['Transaction Description']) + " " + str(row['Comments'])).upper()
-        if any(kw in text for kw in bonus_keywords):
-            bonus_amount += row['Amount']
+    comments = df['Comments'] if 'Comments' in df.columns else pd.Series(np.nan, index=df.index)   # Exports χωρίς στήλη σχολίων
+    text = df['Transaction Description'].fillna('nan').astype(str) + " " + comments.fillna('nan').astype(str)
+    return (df['Amount_Cents'] > 0) & text.str.upper().str.contains(_BONUS_PATTERN, regex=True)
+
+def advice_table(history_df, cube=None):
+    """
+    Batch εκδοχή του get_financial_advice: ένα vectorized πέρασμα σε όλο το ιστορικό.
+    Επιστρέφει ανά μήνα: Income, Expenses, Savings, Bonus, Sustainable_Savings,
+    Real_Savings_Rate, Projected_Yearly, Top_Category, Top_Category_Amount.
+    """
+    tx = as_transactions(history_df)
+    if cube is None: cube = tx.cube
+    table = monthly_overview(cube).rename(columns={'Period': 'Month'}).set_index('Month')
+
+    income = tx.income
+    bonus = income.loc[_bonus_mask(income), 'Amount_Cents'].groupby(tx.period, observed=True).sum() / 100
+    bonus.index = bonus.index.astype(str)
+    table['Bonus'] = bonus.reindex(table.index, fill_value=0.0)
 
-    # --- 2. ΥΠΟΛΟΓΙΣΜΟΣ "ΚΑΘΑΡΗΣ" ΑΠΟΤΑΜΙΕΥΣΗΣ ---
     # Πόσα αποταμίευσες ΜΟΝΟ από τον μισθό σου (χωρίς το δώρο)
-    sustainable_savings = savings - bonus_amount
-    
-    # Ρυθμός αποταμίευσης (επί του κανονικού εισοδήματος)
-    regular_income = income - bonus_amount
-    if regular_income > 0:
-        real_savings_rate = (sustainable_savings / regular_income) * 100
-    else:
-        real_savings_rate = 0
+    table['Sustainable_Savings'] = table['Savings'] - table['Bonus']
+    regular_income = table['Income'] - table['Bonus']
+    table['Real_Savings_Rate'] = np.where(regular_income > 0, table['Sustainable_Savings'] / regular_income.where(regular_income > 0, 1) * 100, 0.0)
+    # Το δώρο το μετράμε μια φορά
+    table['Projected_Yearly'] = table['Sustainable_Savings'] * 12 + table['Bonus']
+
+    # Μεγαλύτερη ελαστική κατηγορία ανά μήνα (ίδια σειρά με idxmax: πρώτη αλφαβητικά σε ισοπαλία)
+    elastic = cube[(cube['Flow'] == 'out') & (~cube['Category'].isin(FIXED_CATEGORIES))]
+    by_cat = (elastic.groupby(['Month', 'Category'])['Cents'].sum().abs() / 100).rename('Amount').reset_index()
+    top = by_cat.sort_values(['Month', 'Amount'], ascending=[True, False], kind='stable').drop_duplicates('Month').set_index('Month')
+    table['Top_Category'] = top['Category'].reindex(table.index)
+    table['Top_Category_Amount'] = top['Amount'].reindex(table.index)
+
+    return table.reset_index()
+
+def render_advice(row):
+    """
+    Το κείμενο του report για έναν μήνα (μία γραμμή του advice_table).
+    """
+    savings = row['Savings']
+    bonus_amount = row['Bonus']
+    sustainable_savings = row['Sustainable_Savings']
+    real_savings_rate = row['Real_Savings_Rate']
+    projected_yearly = row['Projected_Yearly']
 
-    # --- 3. ΔΗΜΙΟΥΡΓΙΑ REPORT ---
     report = []
 
     # A. REALITY CHECK (Δώρο vs Μισθός)
@@ -56,8 +84,6 @@ def get_financial_advice(df, income, expenses, savings):
 
     # B. ΕΞΥΠΝΗ ΠΡΟΒΛΕΨΗ (FORECAST)
     # Προβάλουμε μόνο την "βιώσιμη" αποταμίευση x 12
-    projected_yearly = (sustainable_savings * 12) + bonus_amount # (Το δώρο το μετράμε μια φορά)
-    
     if projected_yearly > 0:
         report.append(f"🔮 **Ρεαλιστική Πρόβλεψη:** Με τον τρέχοντα ρυθμό εξόδων (χωρίς να υπολογίζουμε έξτρα δώρα), σε 1 χρόνο θα έχεις μαζέψει περίπου **{projected_yearly:,.0f}€**.")
     else:
@@ -66,13 +92,54 @@ def get_financial_advice(df, income, expenses, savings):
     report.append("\n")
 
     # C. TOP EXPENSE (Η Μαύρη Τρύπα)
-    elastic_expenses = df[
-        (df['Amount'] < 0) & 
-        (~df['Category'].isin(['🏠 Σπίτι & Πάγια', '💰 Αποταμίευση']))
-    ]
-    if not elastic_expenses.empty:
-        top_category = elastic_expenses.groupby('Category')['Amount'].sum().abs().idxmax()
-        top_cat_amount = elastic_expenses.groupby('Category')['Amount'].sum().abs().max()
-        report.append(f"📉 **Μεγαλύτερο Έξοδο:** {top_category} ({top_cat_amount:.2f}€).")
-
-    return "\n".join(report)
\ No newline at end of file
+    if pd.notna(row['Top_Category']):
+        report.append(f"📉 **Μεγαλύτερο Έξοδο:** {row['Top_Category']} ({row['Top_Category_Amount']:.2f}€).")
+
+    return "\n".join(report)
+
+def advise_history(history_df, cube=None):
+    """
+    Reports για όλους τους μήνες του ιστορικού: {month: κείμενο}.
+    """
+    table = advice_table(history_df, cube)
+    return {row['Month']: render_advice(row) for row in table.to_dict('records')}
+
+@timed()
+def get_financial_advice(df, income, expenses, savings, cube=None):
+    """
+    V2.0 Smart CFO: Διαχωρίζει τα Δώρα/Bonus από τον Μισθό
+    για να δίνει ρεαλιστικές προβλέψεις και όχι φούσκες.
+    """
+    
+    # --- 1. DETECT BONUS / ΔΩΡΟ ---
+    # Ψάχνουμε για έκτακτα εισοδήματα μέσα στις περιγραφές
+    tx = as_transactions(df)
+    bonus_amount = tx.income.loc[_bonus_mask(tx.income), 'Amount_Cents'].sum() / 100
+
+    # --- 2. ΥΠΟΛΟΓΙΣΜΟΣ "ΚΑΘΑΡΗΣ" ΑΠΟΤΑΜΙΕΥΣΗΣ ---
+    # Πόσα αποταμίευσες ΜΟΝΟ από τον μισθό σου (χωρίς το δώρο)
+    sustainable_savings = savings - bonus_amount
+    
+    # Ρυθμός αποταμίευσης (επί του κανονικού εισοδήματος)
+    regular_income = income - bonus_amount
+    if regular_income > 0:
+        real_savings_rate = (sustainable_savings / regular_income) * 100
+    else:
+        real_savings_rate = 0
+
+    # --- 3. TOP EXPENSE (Η Μαύρη Τρύπα) ---
+    if cube is None: cube = tx.cube
+    elastic_expenses = expenses_by_category(cube, exclude=FIXED_CATEGORIES)
+    # Σε ισοπαλία η πρώτη αλφαβητικά, όπως στο advice_table (το idxmax δίνει την πρώτη με το μέγιστο)
+    top_category = elastic_expenses.sort_index().idxmax() if not elastic_expenses.empty else None
+
+    # --- 4. ΔΗΜΙΟΥΡΓΙΑ REPORT ---
+    return render_advice({
+        'Savings': savings,
+        'Bonus': bonus_amount,
+        'Sustainable_Savings': sustainable_savings,
+        'Real_Savings_Rate': real_savings_rate,
+        'Projected_Yearly': (sustainable_savings * 12) + bonus_amount,
+        'Top_Category': top_category,
+        'Top_Category_Amount': elastic_expenses.max() if top_category is not None else None,
+    })
@@ -1,14 +1,19 @@
 import pandas as pd
 import numpy as np
+from src.cube import expenses_by_category
+from src.frame import as_transactions
+from src.ledger import ledger_top_expenses
+from src.perf import timed
 
-def get_top_expenses(df, n=10):
+@timed()
+def get_top_expenses(df, n=10, month=None, ledger=None):
     """
     Επιστρέφει τα n μεγαλύτερα έξοδα του μήνα.
+    ledger: path του SQLite ledger (src.ledger) -> το top-N γίνεται με SQL για τον month, χωρίς το df.
     """
-    expenses = df[
-        (df['Amount'] < 0) & 
-        (df['Category'] != '💰 Αποταμίευση')
-    ].copy()
+    if ledger is not None:
+        return ledger_top_expenses(month, n, ledger)
+    expenses = as_transactions(df).expenses
     
     top_expenses = expenses.sort_values(by='Amount', ascending=True).head(n)
     return top_expenses[['Date', 'Subcategory', 'Comments', 'Amount']]
@@ -23,9 +28,11 @@ def generate_advice(df, savings_rate):
         advice_list.append("✅ **Μπράβο!** Εξαιρετική οικονομική υγεία.")
     return advice_list
 
-def check_budget(df, custom_limits=None):
+@timed()
+def check_budget(df, custom_limits=None, cube=None):
     """
     Ελέγχει τον προϋπολογισμό βάσει των ορίων που θέτει ο χρήστης.
+    cube: προαιρετικός aggregate cube (src.cube) για να μη ξαναγίνει groupby στις γραμμές.
     """
     DEFAULT_LIMITS = {
         "🏠 Σπίτι & Πάγια": 650, "🛒 Supermarket": 250, "🍿 Lifestyle & Έξοδοι": 200,   
@@ -33,12 +40,8 @@ def check_budget(df, custom_limits=None):
     }
     limits = custom_limits if custom_limits else DEFAULT_LIMITS
 
-    expenses = df[
-        (df['Amount'] < 0) & 
-        (df['Category'] != '💰 Αποταμίευση')
-    ].copy()
-    
-    actual_spend = expenses.groupby('Category')['Amount'].sum().abs().round(2)
+    if cube is None: cube = as_transactions(df).cube
+    actual_spend = expenses_by_category(cube).round(2)
     budget_data = []
     
     all_categories = set(actual_spend.index) | set(limits.keys())
@@ -1,21 +1,29 @@
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from src.cube import expenses_by_category, monthly_overview, category_trends
+from src.frame import as_transactions
+from src.downsample import MAX_POINTS, downsample, use_webgl
+from src.perf import timed
 
+# Το plotly.express (~50 ms import) φορτώνεται μέσα στα γραφήματα που το χρησιμοποιούν και όχι στο startup του app·
+# το plotly.graph_objects το έχει ήδη φορτώσει το streamlit.
+
+@timed()
 def plot_sunburst(df):
     """
     Sunburst Chart: Κατηγορία -> Υποκατηγορία
     """
-    expenses = df[
-        (df['Amount'] < 0) & 
-        (df['Category'] != '💰 Αποταμίευση')
-    ].copy()
-    expenses['Abs_Amount'] = expenses['Amount'].abs()
+    expenses = as_transactions(df).expenses
 
     if expenses.empty: return None
 
+    # Το plotly θέλει string ετικέτες: αθροίζουμε πρώτα (λίγες γραμμές) και μετά μετατρέπουμε
+    by_sub = expenses.groupby(['Category', 'Subcategory'], observed=True)['Abs_Amount'].sum().reset_index()
+    by_sub[['Category', 'Subcategory']] = by_sub[['Category', 'Subcategory']].astype(str)
+
+    import plotly.express as px
     fig = px.sunburst(
-        expenses, 
+        by_sub, 
         path=['Category', 'Subcategory'], 
         values='Abs_Amount',
         color='Category',
@@ -25,45 +33,119 @@ def plot_sunburst(df):
     fig.update_layout(margin=dict(t=0, l=0, r=0, b=0), height=400)
     return fig
 
-def plot_spend_trend(df):
+@timed()
+def plot_spend_trend(df, max_points=MAX_POINTS, method='lttb'):
     """
     Area Chart: Cumulative Spend Trend
+    Με πολλά χρόνια ημερήσιων δεδομένων η σειρά γίνεται downsample (max_points) και WebGL,
+    ενώ το hover δείχνει τα ακριβή έξοδα από το προηγούμενο σημείο.
     """
-    expenses = df[
-        (df['Amount'] < 0) & 
-        (df['Category'] != '💰 Αποταμίευση')
-    ].copy()
+    expenses = as_transactions(df).expenses
     
     if expenses.empty: return None
 
-    expenses['Abs_Amount'] = expenses['Amount'].abs()
     daily_spend = expenses.groupby('Date')['Abs_Amount'].sum().reset_index().sort_values('Date')
     daily_spend['Cumulative'] = daily_spend['Abs_Amount'].cumsum()
-    
-    fig = px.area(
-        daily_spend, 
-        x='Date', y='Cumulative',
-        title="💸 Ταχύτητα Εξόδων",
-        labels={'Cumulative': 'Έξοδα (€)', 'Date': ''},
-        color_discrete_sequence=['#ff4b4b']
-    )
+    points = downsample(daily_spend, 'Date', 'Cumulative', max_points, method, totals=['Abs_Amount'])
+
+    trace_cls = go.Scattergl if use_webgl(len(points)) else go.Scatter
+    fig = go.Figure(trace_cls(
+        x=points['Date'], y=points['Cumulative'], mode='lines', fill='tozeroy',
+        line=dict(color='#ff4b4b'), name='Έξοδα (€)',
+        customdata=points[['Abs_Amount_Bucket', 'Points']],
+        hovertemplate="%{x|%d/%m/%Y}<br>Σύνολο: %{y:,.2f} €<br>Έξοδα διαστήματος: %{customdata[0]:,.2f} € (%{customdata[1]} ημέρες)<extra></extra>"
+    ))
     fig.update_layout(
+        title="💸 Ταχύτητα Εξόδων", yaxis_title='Έξοδα (€)',
         height=350, margin=dict(l=20, r=20, t=40, b=20),
         plot_bgcolor='rgba(0,0,0,0)',
         yaxis_gridcolor='rgba(200, 200, 200, 0.2)'
     )
     return fig
 
-def plot_sankey(df, income):
+@timed()
+def plot_monthly_overview(df, cube=None, max_points=MAX_POINTS, method='lttb'):
     """
-    Modern 'Monochromatic' Sankey (Blue/Cyan Theme).
+    Bar Chart: Income vs Expenses (Διορθωμένο Math & Axis)
+    Πάνω από max_points μήνες κρατιούνται οι μήνες που δίνει το downsample της Savings,
+    με τα ακριβή σύνολα κάθε διαστήματος στο hover.
     """
-    # 1. Prepare Data
-    expenses = df[(df['Amount'] < 0) & (df['Category'] != '💰 Αποταμίευση')].copy()
-    expenses['Abs_Amount'] = expenses['Amount'].abs()
+    # Υπολογισμός (Σωστά Μαθηματικά) από τον aggregate cube, ανά Μήνα
+    # Income: Όλα τα θετικά
+    # Expenses: Όλα τα αρνητικά ΕΚΤΟΣ Αποταμίευσης
+    # Savings: Income - Expenses (Θεωρητική Αποταμίευση, όχι υπόλοιπο τράπεζας)
+    if cube is None: cube = as_transactions(df).cube
+    monthly = downsample(monthly_overview(cube), 'Period', 'Savings', max_points, method,
+                         totals=['Income', 'Expenses', 'Savings'])
+    hover = "%{x}<br>%{y:,.2f} €<br>Σύνολο διαστήματος: %{customdata[0]:,.2f} € (%{customdata[1]} μήνες)<extra>%{fullData.name}</extra>"
+
+    fig = go.Figure()
+
+    # Μπάρες
+    fig.add_trace(go.Bar(x=monthly['Period'], y=monthly['Income'], name='Έσοδα', marker_color='#198754',
+                         customdata=monthly[['Income_Bucket', 'Points']], hovertemplate=hover))
+    fig.add_trace(go.Bar(x=monthly['Period'], y=monthly['Expenses'], name='Έξοδα', marker_color='#dc3545',
+                         customdata=monthly[['Expenses_Bucket', 'Points']], hovertemplate=hover))
+
+    # Γραμμή (Trend)
+    trace_cls = go.Scattergl if use_webgl(3 * len(monthly)) else go.Scatter
+    fig.add_trace(trace_cls(
+        x=monthly['Period'], y=monthly['Savings'], name='Net Savings',
+        mode='lines+markers+text', text=monthly['Savings'].apply(lambda x: f"{x:.0f}€"),
+        textposition="top center",
+        line=dict(color='#0dcaf0', width=3),
+        customdata=monthly[['Savings_Bucket', 'Points']], hovertemplate=hover
+    ))
+
+    # Layout (Fix Axis Type to Category)
+    fig.update_layout(
+        title="📊 Έσοδα vs Έξοδα (Σύγκριση Μηνών)",
+        barmode='group',
+        height=450,
+        xaxis=dict(type='category', categoryorder='category ascending'), # <-- ΑΥΤΟ ΦΤΙΑΧΝΕΙ ΤΟ ΓΡΑΦΗΜΑ ΝΑ ΜΗΝ ΕΧΕΙ ΚΕΝΑ
+        margin=dict(l=20, r=20, t=40, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+@timed()
+def plot_category_trends(df, cube=None, max_points=MAX_POINTS, method='lttb'):
+    """
+    Line Chart: Τάσεις Κατηγοριών
+    Κάθε κατηγορία γίνεται downsample χωριστά (max_points σημεία ανά σειρά).
+    """
+    if cube is None: cube = as_transactions(df).cube
+    trends = category_trends(cube)
+    if not trends.empty:
+        trends = pd.concat(
+            [downsample(series, 'Period', 'Abs_Amount', max_points, method) for _, series in trends.groupby('Category', observed=True)],
+            ignore_index=True
+        )
+
+    import plotly.express as px
+    fig = px.line(
+        trends, x='Period', y='Abs_Amount', color='Category', markers=True,
+        title="📈 Πού αυξάνονται τα έξοδα;",
+        hover_data={'Abs_Amount': ':,.2f', 'Abs_Amount_Bucket': ':,.2f', 'Points': True} if not trends.empty else None,
+        labels={'Abs_Amount_Bucket': 'Σύνολο διαστήματος', 'Points': 'Μήνες'},
+        render_mode='webgl' if use_webgl(len(trends)) else 'svg'
+    )
     
-    expenses_by_cat = expenses.groupby('Category')['Abs_Amount'].sum().reset_index()
-    expenses_by_cat = expenses_by_cat.sort_values('Abs_Amount', ascending=False)
+    fig.update_layout(
+        height=400,
+        xaxis=dict(type='category', categoryorder='category ascending'), # <-- ΚΑΙ ΕΔΩ CATEGORY
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+@timed()
+def plot_sankey(df, income, cube=None):
+    """
+    Modern 'Monochromatic' Sankey (Blue/Cyan Theme).
+    """
+    # 1. Prepare Data (από τον aggregate cube)
+    if cube is None: cube = as_transactions(df).cube
+    expenses_by_cat = expenses_by_category(cube).rename('Abs_Amount').reset_index()
     
     total_expenses = expenses_by_cat['Abs_Amount'].sum()
     savings = max(0, income - total_expenses)
@@ -159,4 +241,4 @@ def get_bucket_html(current, target, name):
 </div>
 </div>
 """
-    return html
\ No newline at end of file
+    return html
\ No newline at end of file
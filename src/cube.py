@@ -0,0 +1,75 @@
+import pandas as pd
+import numpy as np
+
+SAVINGS_CATEGORY = '💰 Αποταμίευση'
+CUBE_KEYS = ['Month', 'Category', 'Subcategory', 'Flow']
+# Οι στήλες που διαβάζει το build_cube: αρκούν για τον cube όλου του ιστορικού (χωρίς περιγραφές/σχόλια)
+CUBE_COLUMNS = ['Date', 'Category', 'Subcategory', 'Amount_Cents']
+
+def build_cube(df):
+    """
+    Pre-aggregated cube: άθροισμα (ακέραια λεπτά, Cents) και πλήθος συναλλαγών ανά (Month, Category, Subcategory, Flow).
+    Flow: 'in' για έσοδα (Amount > 0), 'out' για έξοδα (Amount < 0). Τα μηδενικά ποσά δεν μετράνε.
+    Το groupby γίνεται στα compact κλειδιά (period/categorical codes) και μόνο οι γραμμές του cube γίνονται strings.
+    Οι συναρτήσεις παρακάτω επιστρέφουν ευρώ.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_KEYS + ['Cents', 'Count'])
+
+    rows = df[df['Amount_Cents'] != 0]
+    month = rows['Month'] if 'Month' in rows.columns else rows['Date'].dt.to_period('M')
+    flow = pd.Categorical.from_codes((rows['Amount_Cents'] < 0).to_numpy(dtype=np.int8), ['in', 'out'])
+    keys = [month.rename('Month'), rows['Category'], rows['Subcategory'], pd.Series(flow, index=rows.index, name='Flow')]
+    cube = rows['Amount_Cents'].groupby(keys, observed=True, sort=False).agg(['sum', 'count'])
+    cube = cube.rename(columns={'sum': 'Cents', 'count': 'Count'}).reset_index()
+    for key in CUBE_KEYS:
+        cube[key] = cube[key].astype(str)
+    return cube
+
+def update_cube(cube, month, month_df):
+    """
+    Αντικαθιστά μόνο τις γραμμές ενός μήνα (π.χ. μετά από αποθήκευση στον Editor).
+    """
+    month_cube = build_cube(month_df.assign(Month=month))
+    rest = cube[cube['Month'] != month]
+    if rest.empty: return month_cube
+    if month_cube.empty: return rest.reset_index(drop=True)
+    return pd.concat([rest, month_cube], ignore_index=True)
+
+def _select(cube, month=None):
+    return cube if month is None else cube[cube['Month'] == month]
+
+def month_totals(cube, month=None):
+    """
+    (έσοδα, πραγματικά έξοδα) — τα έξοδα χωρίς τις μεταφορές σε Αποταμίευση.
+    """
+    cube = _select(cube, month)
+    income = cube.loc[cube['Flow'] == 'in', 'Cents'].sum()
+    expenses = abs(cube.loc[(cube['Flow'] == 'out') & (cube['Category'] != SAVINGS_CATEGORY), 'Cents'].sum())
+    return income / 100, expenses / 100
+
+def expenses_by_category(cube, month=None, exclude=(SAVINGS_CATEGORY,)):
+    """
+    Απόλυτα έξοδα ανά κατηγορία, ταξινομημένα από το μεγαλύτερο.
+    """
+    cube = _select(cube, month)
+    out = cube[(cube['Flow'] == 'out') & (~cube['Category'].isin(exclude))]
+    return (out.groupby('Category')['Cents'].sum().abs() / 100).rename('Amount').sort_values(ascending=False, kind='stable')
+
+def monthly_overview(cube):
+    """
+    Έσοδα / Έξοδα / Αποταμίευση ανά μήνα (Period).
+    """
+    income = cube[cube['Flow'] == 'in'].groupby('Month')['Cents'].sum()
+    expenses = cube[(cube['Flow'] == 'out') & (cube['Category'] != SAVINGS_CATEGORY)].groupby('Month')['Cents'].sum().abs()
+    monthly = pd.DataFrame({'Income': income, 'Expenses': expenses}).fillna(0).sort_index()
+    monthly['Savings'] = monthly['Income'] - monthly['Expenses']
+    return (monthly.astype(float) / 100).rename_axis('Period').reset_index()
+
+def category_trends(cube):
+    """
+    Απόλυτα έξοδα ανά (Period, Category) για τα γραφήματα τάσεων.
+    """
+    out = cube[(cube['Flow'] == 'out') & (cube['Category'] != SAVINGS_CATEGORY)]
+    trends = out.groupby(['Month', 'Category'])['Cents'].sum().abs() / 100
+    return trends.rename('Abs_Amount').rename_axis(['Period', 'Category']).reset_index()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Πόσα σημεία στέλνουμε το πολύ ανά σειρά στον browser
+MAX_POINTS = 1000
+# Πάνω από τόσα σημεία ανά γράφημα τα traces γίνονται WebGL (Scattergl) αντί για SVG
+WEBGL_THRESHOLD = 1000
+DOWNSAMPLE_METHODS = ['lttb', 'minmax']
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: κρατάει τα n_out σημεία που διατηρούν το σχήμα της καμπύλης.
+    Το πρώτο και το τελευταίο σημείο μένουν πάντα.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)   # n_out-2 κάδοι ανάμεσα στα άκρα
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        # Εμβαδόν τριγώνου (προηγούμενο σημείο, υποψήφιο, μέσος όρος επόμενου κάδου)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: σε κάθε κάδο κρατάει το ελάχιστο και το μέγιστο (κρατάει τις κορυφές).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    buckets = np.arange(n) * ((n_out - 2) // 2) // n       # 2 σημεία ανά κάδο + τα δύο άκρα
+    values = pd.Series(np.asarray(y, dtype=float))
+    grouped = values.groupby(buckets)
+    keep = np.concatenate([[0, n - 1], grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()])
+    return np.unique(keep)
+
+def downsample(df, x, y, max_points=MAX_POINTS, method='lttb', totals=None):
+    """
+    Μειώνει μια σειρά (ταξινομημένη κατά x) σε max_points σημεία.
+    Κάθε σημείο που μένει "εκπροσωπεί" τις γραμμές από το προηγούμενο σημείο ως και το ίδιο:
+    οι στήλες του totals (default το y) αθροίζονται σε '{col}_Bucket' και το πλήθος σε 'Points',
+    ώστε το hover να δείχνει τα ακριβή σύνολα ακόμα κι όταν λείπουν σημεία.
+    max_points=None: καμία μείωση (μόνο οι στήλες του hover).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method: {method}")
+    df = df.reset_index(drop=True)
+    totals = [y] if totals is None else list(totals)
+
+    if max_points is None or len(df) <= max_points:
+        keep = np.arange(len(df))
+    elif method == 'lttb':
+        x_values = df[x]
+        if pd.api.types.is_datetime64_any_dtype(x_values):
+            x_values = x_values.astype('int64')
+        elif not pd.api.types.is_numeric_dtype(x_values):
+            x_values = np.arange(len(df))      # Κατηγορικός άξονας (π.χ. Period): η θέση μετράει
+        keep = lttb_indices(x_values, df[y], max_points)
+    else:
+        keep = minmax_indices(df[y], max_points)
+
+    # Σε ποιο σημείο ανήκει κάθε γραμμή: στο πρώτο κρατημένο σημείο με θέση >= της
+    owner = np.searchsorted(keep, np.arange(len(df)), side='left')
+    sampled = df.iloc[keep].copy()
+    for col in totals:
+        sampled[f'{col}_Bucket'] = np.bincount(owner, weights=df[col].to_numpy(dtype=float), minlength=len(keep))
+    sampled['Points'] = np.bincount(owner, minlength=len(keep))
+    return sampled.reset_index(drop=True)
+
+def use_webgl(n_points, threshold=WEBGL_THRESHOLD):
+    return n_points > threshold
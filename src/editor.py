@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from src.etl import DEFAULT_CATEGORY
+
+# Ο Editor δουλεύει σε σελίδες: φιλτράρισμα/ταξινόμηση γίνονται εδώ (server-side)
+# και στο st.data_editor στέλνεται μόνο η σελίδα που φαίνεται.
+PAGE_SIZE = 100
+COMBO_SEP = " > "
+SORT_COLUMNS = {"Date": "Date", "Amount": "Amount_Cents", "Description": "Transaction Description", "Category": "Category"}
+
+def combo_labels(category, subcategory, sep=COMBO_SEP):
+    """
+    'Category > Subcategory' ανά γραμμή ως Categorical: τα strings φτιάχνονται από τα categorical codes
+    μόνο για τους μοναδικούς συνδυασμούς, όχι για κάθε γραμμή.
+    """
+    category, subcategory = category.astype('category'), subcategory.astype('category')
+    n_sub = len(subcategory.cat.categories) + 1
+    # +1 ώστε το -1 (κενό) να γίνει 0 -> το 'nan' στο τέλος των ονομάτων
+    pair = (category.cat.codes.to_numpy(np.int64) + 1) * n_sub + subcategory.cat.codes.to_numpy(np.int64) + 1
+    codes, pairs = pd.factorize(pair)
+    cat_names = np.append(category.cat.categories.astype(str).to_numpy(dtype=object), 'nan')
+    sub_names = np.append(subcategory.cat.categories.astype(str).to_numpy(dtype=object), 'nan')
+    labels = cat_names[pairs // n_sub - 1] + sep + sub_names[pairs % n_sub - 1]
+    label_codes, unique_labels = pd.factorize(labels)
+    return pd.Categorical.from_codes(label_codes[codes], unique_labels)
+
+def split_combo(labels, sep=COMBO_SEP):
+    """
+    Το αντίστροφο του combo_labels: (Category, Subcategory).
+    """
+    split = pd.Series(labels, dtype=object).str.split(sep, n=1, expand=True).reindex(columns=[0, 1])
+    return split[0], split[1]
+
+def _text_match(col, text):
+    # Αναζήτηση μόνο στις μοναδικές τιμές (οι περιγραφές επαναλαμβάνονται)
+    codes, uniques = pd.factorize(col)
+    hit = pd.Series(uniques.astype(str)).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+    return np.append(hit, False)[codes]
+
+def filter_positions(df, categories=None, amount_range=None, text=None, uncategorized_only=False, sort_by="Date", descending=True):
+    """
+    Οι θέσεις (iloc) των γραμμών που περνούν τα φίλτρα, με τη σειρά της ταξινόμησης.
+    amount_range σε ευρώ (min, max), text: περιγραφή ή σχόλια (χωρίς διάκριση πεζών/κεφαλαίων).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if categories:
+        mask &= df['Category'].isin(categories).to_numpy(dtype=bool)
+    if amount_range is not None:
+        low, high = (int(round(x * 100)) for x in amount_range)
+        cents = df['Amount_Cents'].to_numpy()
+        mask &= (cents >= low) & (cents <= high)
+    if text:
+        found = _text_match(df['Transaction Description'], text)
+        if 'Comments' in df.columns:
+            found |= _text_match(df['Comments'], text)
+        mask &= found
+    if uncategorized_only:
+        mask &= (df['Subcategory'] == DEFAULT_CATEGORY[1]).to_numpy(dtype=bool)
+
+    positions = np.flatnonzero(mask)
+    key = df[SORT_COLUMNS[sort_by]].iloc[positions].reset_index(drop=True)
+    if isinstance(key.dtype, pd.CategoricalDtype):
+        key = key.astype(str)
+    order = key.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+def editor_page(df, positions, page=0, page_size=PAGE_SIZE):
+    """
+    Μόνο οι γραμμές της σελίδας, έτοιμες για το st.data_editor (Amount σε ευρώ, Category = combo label).
+    """
+    rows = df.iloc[positions[page * page_size:(page + 1) * page_size]]
+    page_df = pd.DataFrame({
+        'Tx_Id': rows['Tx_Id'].to_numpy(),
+        'Date': rows['Date'].to_numpy(),
+        'Account': rows['Account'].astype(str).to_numpy() if 'Account' in rows.columns else '',
+        'Transaction Description': rows['Transaction Description'].to_numpy(),
+        'Amount': rows['Amount_Cents'].to_numpy() / 100,
+        'Category': np.asarray(combo_labels(rows['Category'], rows['Subcategory']), dtype=object),
+    })
+    return page_df
+
+def page_count(positions, page_size=PAGE_SIZE):
+    return max(1, -(-len(positions) // page_size))
+
+def collect_edits(page_df, edited, pending):
+    """
+    Κρατάει στο pending ({Tx_Id: combo label}) τις αλλαγές της σελίδας, ώστε να μη χάνονται στην αλλαγή σελίδας/φίλτρων.
+    """
+    changed = edited['Category'].to_numpy(dtype=object) != page_df['Category'].to_numpy(dtype=object)
+    pending.update(zip(page_df['Tx_Id'].to_numpy()[changed].tolist(), edited['Category'].to_numpy(dtype=object)[changed]))
+    return pending
+
+def with_pending(page_df, pending):
+    """
+    Η σελίδα με τις εκκρεμείς (μη αποθηκευμένες) αλλαγές από πάνω.
+    """
+    if not pending:
+        return page_df
+    labels = [pending.get(tx_id) for tx_id in page_df['Tx_Id'].tolist()]
+    page_df = page_df.copy()
+    page_df['Category'] = [label if label is not None else current for label, current in zip(labels, page_df['Category'])]
+    return page_df
+
+def pending_changes(df, pending):
+    """
+    Οι εκκρεμείς αλλαγές ως DataFrame (Tx_Id, Category, Subcategory), ταιριασμένες με Tx_Id,
+    χωρίς όσες γύρισαν στην κατηγορία που ήδη έχει η συναλλαγή.
+    """
+    ids = np.fromiter(pending, dtype=np.uint64, count=len(pending))
+    labels = np.array(list(pending.values()), dtype=object)
+    pos = pd.Index(df['Tx_Id']).get_indexer(ids)
+    known = pos >= 0
+    ids, labels, pos = ids[known], labels[known], pos[known]
+    current = np.asarray(combo_labels(df['Category'].iloc[pos], df['Subcategory'].iloc[pos]), dtype=object)
+    differs = labels != current
+    category, subcategory = split_combo(labels[differs])
+    return pd.DataFrame({'Tx_Id': ids[differs], 'Category': category.to_numpy(), 'Subcategory': subcategory.to_numpy()})
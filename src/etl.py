@@ -1,5 +1,14 @@
+import io
+import os
+import re
+import json
+import time
+import hashlib
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
+from src.frame import TransactionFrame
+from src.perf import timed, annotate
 
 def clean_amount(amount_str):
     if pd.isna(amount_str): return 0.0
@@ -9,112 +18,572 @@ def clean_amount(amount_str):
     except ValueError:
         return 0.0
 
-def assign_category_data(row):
+# Ποσά που το float() διαβάζει όπως είναι (π.χ. -1234.56), μετά τον καθαρισμό του ελληνικού format
+_PLAIN_AMOUNT = r'-?[0-9]+(?:\.[0-9]+)?'
+
+def parse_amounts(amounts, cents=False):
     """
-    V16.0 - Merged Dining & Coffee into one subcategory.
+    Vectorized εκδοχή του clean_amount για ολόκληρη στήλη ('1.234,56 EUR' -> 1234.56).
+    Οι άκυρες/κενές τιμές γίνονται 0.0 όπως πριν.
+    cents=True: επιστρέφει ακέραια λεπτά (int64) αντί για float.
+    Επιστρέφει (Series, πλήθος τιμών που έγιναν 0 λόγω σφάλματος).
     """
-    raw_text = (str(row['Transaction Description']) + " " + str(row['Comments'])).upper()
-    full_text = raw_text.replace('Ά', 'Α').replace('Έ', 'Ε').replace('Ή', 'Η').replace('Ί', 'Ι').replace('Ό', 'Ο').replace('Ύ', 'Υ').replace('Ώ', 'Ω')
-    
-    amount = row['Amount']
-    day_name = row.get('Day_Name', '')
+    present = amounts.notna().to_numpy()
+    present_pos = np.flatnonzero(present)
+    failed = ~present
+    values = np.zeros(len(amounts))
+
+    # Το 'str' dtype (Arrow) κάνει τις .str πράξεις σε C αντί για Python loop
+    text = amounts[present].astype('str')
+    cleaned = (
+        text.str.replace(' EUR', '', regex=False).str.strip()
+        .str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    )
+    plain = cleaned.str.fullmatch(_PLAIN_AMOUNT).to_numpy(dtype=bool)
+    parsed = np.zeros(len(cleaned))
+    parsed[plain] = cleaned[plain].to_numpy(dtype=object).astype(np.float64)
+
+    # Οι σπάνιες "περίεργες" τιμές περνάνε από float() για ίδια ακριβώς συμπεριφορά
+    for pos in np.flatnonzero(~plain):
+        try:
+            parsed[pos] = float(cleaned.iat[pos])
+        except ValueError:
+            failed[present_pos[pos]] = True
+    values[present_pos] = parsed
 
+    if cents:
+        bad = ~np.isfinite(values)
+        failed |= bad
+        values[bad] = 0.0
+        values = np.rint(values * 100).astype(np.int64)
+
+    return pd.Series(values, index=amounts.index, name=amounts.name), int(failed.sum())
+
+# Κανόνες κατηγοριοποίησης με σειρά προτεραιότητας: (keywords, πρόσημο ποσού, κατηγορία, υποκατηγορία).
+# Πρόσημο: -1 μόνο για έξοδα, 1 μόνο για έσοδα, 0 για όλα. Ο πρώτος κανόνας που ταιριάζει κερδίζει.
+CATEGORY_RULES = [
     # 1. ΑΠΟΤΑΜΙΕΥΣΗ
-    if amount < 0 and ('TINIAKOS' in full_text or 'ΤΗΝΙΑΚΟΣ' in full_text): return '💰 Αποταμίευση', 'Μεταφορές σε εμένα'
-    if 'ΜΙΣΘΟΔΟΣΙΑ' in full_text: return 'Salary', 'Μισθός'
-    if 'ΚΑΤΑΘΕΣΗ' in full_text and amount > 0: return 'Deposit/Gift', 'Καταθέσεις'
+    (['TINIAKOS', 'ΤΗΝΙΑΚΟΣ'], -1, '💰 Αποταμίευση', 'Μεταφορές σε εμένα'),
+    (['ΜΙΣΘΟΔΟΣΙΑ'], 0, 'Salary', 'Μισθός'),
+    (['ΚΑΤΑΘΕΣΗ'], 1, 'Deposit/Gift', 'Καταθέσεις'),
 
     # 2. ΣΠΙΤΙ & ΠΑΓΙΑ
-    if 'ΕΝΟΙΚ' in full_text or 'ENOIK' in full_text: return '🏠 Σπίτι & Πάγια', 'Ενοίκιο'
-    if any(kw in full_text for kw in ['COSMOTE', 'VODAFONE', 'NOVA', 'WIND', 'DEI', 'PROTERGIA', 'EYDAP', 'VOLTON', 'KOINOXR']): return '🏠 Σπίτι & Πάγια', 'Λογαριασμοί'
+    (['ΕΝΟΙΚ', 'ENOIK'], 0, '🏠 Σπίτι & Πάγια', 'Ενοίκιο'),
+    (['COSMOTE', 'VODAFONE', 'NOVA', 'WIND', 'DEI', 'PROTERGIA', 'EYDAP', 'VOLTON', 'KOINOXR'], 0, '🏠 Σπίτι & Πάγια', 'Λογαριασμοί'),
 
     # 3. SUPERMARKET
-    if any(kw in full_text for kw in ['SKLAVENITIS', 'LIDL', 'MARKET IN', 'AB VASSILOPOULOS', 'MY MARKET', 'KRITIKOS', 'MASOUTIS', 'BAZAAR', 'GALAXIAS', 'AV SHOP', 'PAPAGIA', 'KOUOLITY', 'QUALITY FOODS']): 
-        return '🛒 Supermarket', 'Ψώνια Σπιτιού'
-    
-    # 4. LIFESTYLE (ΕΔΩ ΕΓΙΝΕ Η ΑΛΛΑΓΗ)
-    
+    (['SKLAVENITIS', 'LIDL', 'MARKET IN', 'AB VASSILOPOULOS', 'MY MARKET', 'KRITIKOS', 'MASOUTIS', 'BAZAAR', 'GALAXIAS', 'AV SHOP', 'PAPAGIA', 'KOUOLITY', 'QUALITY FOODS'], 0, '🛒 Supermarket', 'Ψώνια Σπιτιού'),
+
+    # 4. LIFESTYLE
     # A. Delivery (Το κρατάμε ξεχωριστά γιατί είναι "κακή συνήθεια" σπιτιού)
-    if any(kw in full_text for kw in ['WOLT', 'WOΛT', 'WΟΛΤ', 'E-FOOD', 'EFOOD', 'BOX', 'PIZZA', 'BURGER', 'SOUVLAKI']): 
-        return '🍿 Lifestyle & Έξοδοι', 'Delivery'
-    
+    (['WOLT', 'WOΛT', 'WΟΛΤ', 'E-FOOD', 'EFOOD', 'BOX', 'PIZZA', 'BURGER', 'SOUVLAKI'], 0, '🍿 Lifestyle & Έξοδοι', 'Delivery'),
     # B. Εστίαση & Καφές (Ενωμένα όλα τα "έξω": Καφέδες, Εστιατόρια, Ποτά, Κυλικεία)
-    dining_keywords = [
+    ([
         'CAFE', 'COFFEE', 'GREGORYS', 'GRIGORIS', 'EVEREST', 'FOURNOS', 'KYLIKEIO', 'MAMA JAY', 'RUDU', 'DILIEN', 'GEFSINUS', 'KARADIMAS', # Καφέδες
         'RESTAURANT', 'TAVERNA', 'BAR', 'CLUB', 'ESTIATORIA', 'HOLY GINGER', 'PINAKAS' # Φαγητό έξω
-    ]
-    if any(kw in full_text for kw in dining_keywords): 
-        return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'
-    
+    ], 0, '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'),
     # C. Διασκέδαση & Συνδρομές
-    if any(kw in full_text for kw in ['NETFLIX', 'SPOTIFY', 'YOUTUBE', 'CINEMA', 'THEATER', 'TICKET', 'VIVA', 'MORE.GR']): 
-        return '🍿 Lifestyle & Έξοδοι', 'Θέαμα & Συνδρομές'
+    (['NETFLIX', 'SPOTIFY', 'YOUTUBE', 'CINEMA', 'THEATER', 'TICKET', 'VIVA', 'MORE.GR'], 0, '🍿 Lifestyle & Έξοδοι', 'Θέαμα & Συνδρομές'),
 
     # 5. SHOPPING
-    if any(kw in full_text for kw in ['PUBLIC', 'PLAISIO', 'ISTORM', 'GERMANOS', 'KOTSOVOLOS', 'APPLE STORE', 'APPLE.COM', 'ELECTRONICS', 'IKEA', 'LEROY', 'JUMBO', 'PRACTIKER', 'E-SHOP']): 
-        return '🛍️ Shopping', 'Tech & Σπίτι'
-    if any(kw in full_text for kw in ['ZARA', 'H&M', 'HM ', 'BSB', 'ATTICA', 'MAZARAKI', 'MICHALIK', 'VANIKIOTI', 'ACCESSORIES', 'CLOTHES', 'SHOES', 'INTERSPORT', 'ELLE', 'ARTOPOIIMATA']): 
-        return '🛍️ Shopping', 'Ρούχα & Μόδα'
-    if any(kw in full_text for kw in ['HONDOS', 'SEPHORA', 'BEAUTY', 'HAIR', 'BARBER', 'PHARMACY', 'FARMAKEIO', 'DOCTOR', 'HOSPITAL', 'IATROS']): 
-        return '🛍️ Shopping', 'Υγεία & Ομορφιά'
-    if 'IQOS' in full_text: return '🛍️ Shopping', 'Διάφορα Ψώνια'
+    (['PUBLIC', 'PLAISIO', 'ISTORM', 'GERMANOS', 'KOTSOVOLOS', 'APPLE STORE', 'APPLE.COM', 'ELECTRONICS', 'IKEA', 'LEROY', 'JUMBO', 'PRACTIKER', 'E-SHOP'], 0, '🛍️ Shopping', 'Tech & Σπίτι'),
+    (['ZARA', 'H&M', 'HM ', 'BSB', 'ATTICA', 'MAZARAKI', 'MICHALIK', 'VANIKIOTI', 'ACCESSORIES', 'CLOTHES', 'SHOES', 'INTERSPORT', 'ELLE', 'ARTOPOIIMATA'], 0, '🛍️ Shopping', 'Ρούχα & Μόδα'),
+    (['HONDOS', 'SEPHORA', 'BEAUTY', 'HAIR', 'BARBER', 'PHARMACY', 'FARMAKEIO', 'DOCTOR', 'HOSPITAL', 'IATROS'], 0, '🛍️ Shopping', 'Υγεία & Ομορφιά'),
+    (['IQOS'], 0, '🛍️ Shopping', 'Διάφορα Ψώνια'),
 
     # 6. IRIS & ΜΕΤΑΦΟΡΕΣ
-    if 'IRIS' in full_text or 'YPER' in full_text or 'ΥΠΕΡ' in full_text: 
-        return '💸 Διάφορα', 'IRIS/Φίλοι'
+    (['IRIS', 'YPER', 'ΥΠΕΡ'], 0, '💸 Διάφορα', 'IRIS/Φίλοι'),
 
     # 7. ΥΠΟΛΟΙΠΑ
-    if any(kw in full_text for kw in ['UBER', 'BOLT', 'BEAT', 'FREENOW', 'OASA', 'SHELL', 'EKO', 'AVIN', 'AEGEAN']): return '🚗 Μετακίνηση', 'Μεταφορικά'
-    if any(kw in full_text for kw in ['REVOLUT', 'PAYPAL', 'TOP UP']): return '💳 FinTech', 'Revolut'
+    (['UBER', 'BOLT', 'BEAT', 'FREENOW', 'OASA', 'SHELL', 'EKO', 'AVIN', 'AEGEAN'], 0, '🚗 Μετακίνηση', 'Μεταφορικά'),
+    (['REVOLUT', 'PAYPAL', 'TOP UP'], 0, '💳 FinTech', 'Revolut'),
+]
+
+# Weekend Trap -> Πάει στο Εστίαση & Καφές
+WEEKEND_CATEGORY = ('🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές')
+
+# Fallback στην κατηγορία της τράπεζας
+BANK_CATEGORY_RULES = [
+    (['ΕΣΤΙΑΤΟΡΙΑ'], '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'), # Ενωμένο και εδώ
+    (['SUPERMARKET'], '🛒 Supermarket', 'Ψώνια Σπιτιού'),
+    (['ΡΟΥΧΙΣΜΟΣ', 'ΑΞΕΣΟΥΑΡ'], '🛍️ Shopping', 'Ρούχα (Bank)'),
+    (['ΥΓΕΙΑ'], '🛍️ Shopping', 'Υγεία (Bank)'),
+    (['ΤΕΧΝΟΛΟΓΙΑ'], '💸 Διάφορα', 'Uncategorized Tech'),
+]
+
+DEFAULT_CATEGORY = ('💸 Διάφορα', 'Uncategorized')
+
+# Αλλάζει αυτόματα όταν αλλάξει οποιοσδήποτε κανόνας (για invalidation των caches).
+# Το ETL_VERSION ανεβαίνει με το χέρι όταν αλλάζει ο καθαρισμός των δεδομένων.
+ETL_VERSION = 2
+RULES_VERSION = hashlib.sha1(json.dumps(
+    [ETL_VERSION, CATEGORY_RULES, WEEKEND_CATEGORY, BANK_CATEGORY_RULES, DEFAULT_CATEGORY], ensure_ascii=False
+).encode('utf-8')).hexdigest()[:12]
+
+# Compact schema: οι κατηγορίες είναι categoricals με τη σειρά του taxonomy (η σειρά των πινάκων κανόνων)
+_LABELS = [rule[2:] for rule in CATEGORY_RULES] + [WEEKEND_CATEGORY] + [rule[1:] for rule in BANK_CATEGORY_RULES] + [DEFAULT_CATEGORY]
+CATEGORY_ORDER = list(dict.fromkeys(c for c, _ in _LABELS))
+SUBCATEGORY_ORDER = list(dict.fromkeys(s for _, s in _LABELS))
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SCHEMA_CATEGORIES = {'Category': CATEGORY_ORDER, 'Subcategory': SUBCATEGORY_ORDER, 'Day_Name': DAY_ORDER, 'Bank Category': None, 'Account': None}
+
+# Αφαίρεση τόνων από κεφαλαία (μετά το upper())
+ACCENT_MAP = str.maketrans('ΆΈΉΊΌΎΏ', 'ΑΕΗΙΟΥΩ')
+
+def _rule_applies(sign, amount):
+    return sign == 0 or (sign < 0 and amount < 0) or (sign > 0 and amount > 0)
+
+def assign_category_data(row):
+    """
+    V16.0 - Merged Dining & Coffee into one subcategory.
+    Κατηγοριοποίηση μίας γραμμής (βλ. categorize_frame για ολόκληρο DataFrame).
+    """
+    full_text = (str(row['Transaction Description']) + " " + str(row['Comments'])).upper().translate(ACCENT_MAP)
+    amount = row['Amount']
+    day_name = row.get('Day_Name', '')
+
+    for keywords, sign, category, subcategory in CATEGORY_RULES:
+        if any(kw in full_text for kw in keywords) and _rule_applies(sign, amount):
+            return category, subcategory
 
-    # Weekend Trap -> Πάει στο Εστίαση & Καφές
     if day_name in ['Saturday', 'Sunday'] and amount < 0:
-        return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'
+        return WEEKEND_CATEGORY
 
-    # Fallback
     bank_cat = str(row['Bank Category']).upper()
-    if 'ΕΣΤΙΑΤΟΡΙΑ' in bank_cat: return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές' # Ενωμένο και εδώ
-    if 'SUPERMARKET' in bank_cat: return '🛒 Supermarket', 'Ψώνια Σπιτιού'
-    if 'ΡΟΥΧΙΣΜΟΣ' in bank_cat or 'ΑΞΕΣΟΥΑΡ' in bank_cat: return '🛍️ Shopping', 'Ρούχα (Bank)'
-    if 'ΥΓΕΙΑ' in bank_cat: return '🛍️ Shopping', 'Υγεία (Bank)'
-    if 'ΤΕΧΝΟΛΟΓΙΑ' in bank_cat: return '💸 Διάφορα', 'Uncategorized Tech'
-    
-    return '💸 Διάφορα', 'Uncategorized'
-
-def load_data():
-    file_path = "data/raw/bank_export.txt"
-    start_row = 0
+    for keywords, category, subcategory in BANK_CATEGORY_RULES:
+        if any(kw in bank_cat for kw in keywords):
+            return category, subcategory
+
+    return DEFAULT_CATEGORY
+
+def _compile_rules(rules, signed=False):
+    """
+    Ενώνει τα keywords σε regex. Το lookahead βρίσκει matches σε κάθε θέση
+    (και επικαλυπτόμενα), οπότε κανένα keyword δεν "κρύβεται" πίσω από άλλο.
+    Σε ίδια θέση το regex δίνει ένα μόνο keyword: του κανόνα με τη μεγαλύτερη προτεραιότητα.
+    signed=True: ένα regex ανά πρόσημο κανόνα, ώστε ένας κανόνας που δεν ισχύει για το ποσό
+    να μην κρύβει κανόνα χαμηλότερης προτεραιότητας που ταιριάζει στην ίδια θέση.
+    Επιστρέφει [(regex, {keyword: δείκτης κανόνα})].
+    """
+    groups = {}
+    for idx, rule in enumerate(rules):
+        keyword_rule = groups.setdefault(rule[1] if signed else 0, {})
+        for kw in rule[0]:
+            keyword_rule.setdefault(kw, idx)
+    matchers = []
+    for keyword_rule in groups.values():
+        ordered = sorted(keyword_rule, key=keyword_rule.get)
+        pattern = re.compile('(?=(' + '|'.join(re.escape(kw) for kw in ordered) + '))')
+        matchers.append((pattern, keyword_rule))
+    return matchers
+
+_RULE_MATCHERS = _compile_rules(CATEGORY_RULES, signed=True)
+_BANK_MATCHERS = _compile_rules(BANK_CATEGORY_RULES)
+
+def _first_rule(text, matchers, signs=None, amount=None):
+    """
+    Επιστρέφει για κάθε γραμμή τον δείκτη του πρώτου κανόνα που ταιριάζει (-1 αν κανένας).
+    Αν δοθούν signs/amount, οι κανόνες με πρόσημο ισχύουν μόνο όταν ταιριάζει το ποσό.
+    """
+    rows, rules = [], []
+    for matcher, keyword_rule in matchers:
+        hits = text.str.findall(matcher).explode().dropna()
+        rows.append(hits.index.to_numpy())
+        rules.append(hits.map(keyword_rule).to_numpy(dtype=np.int64))
+    rows, rules = np.concatenate(rows), np.concatenate(rules)
+
+    best = np.full(len(text), -1, dtype=np.int64)
+    if signs is not None:
+        sign, amt = signs[rules], amount[rows]
+        ok = (sign == 0) | ((sign < 0) & (amt < 0)) | ((sign > 0) & (amt > 0))
+        rows, rules = rows[ok], rules[ok]
+    if not len(rows):
+        return best
+
+    # Ελάχιστος δείκτης κανόνα ανά γραμμή
+    no_match = np.iinfo(np.int64).max
+    first = np.full(len(text), no_match, dtype=np.int64)
+    np.minimum.at(first, rows, rules)
+    matched = first != no_match
+    best[matched] = first[matched]
+    return best
+
+# --- Merchant memo: οι κανόνες keywords τρέχουν μία φορά ανά μοναδικό έμπορο, όχι ανά γραμμή ---
+MEMO_DIR = "data/cache/category_memo"   # Ένα αρχείο ανά RULES_VERSION
+_MEMOS = {}   # memo_dir -> {(κλειδί, πρόσημο ποσού): δείκτης κανόνα ή -1}
+_DIRTY = set()   # memo_dirs με νέα κλειδιά που δεν έχουν γραφτεί ακόμα (βλ. flush_memo)
+
+def _unique_texts(col, strip=True):
+    """
+    factorize + κανονικοποίηση μόνο των μοναδικών τιμών: κεφαλαία, τα κενά κελιά 'NAN' όπως το str().
+    strip=True: και χωρίς τόνους, με τους αριθμούς (κάρτας, αναφοράς) να γίνονται '#'. Κανένα keyword δεν έχει ψηφία,
+    οπότε το κλειδί ταιριάζει ακριβώς στους ίδιους κανόνες με το αρχικό κείμενο.
+    Επιστρέφει (codes ανά γραμμή, μοναδικά κανονικοποιημένα κείμενα).
+    """
+    codes, uniques = pd.factorize(col)
+    codes = np.where(codes < 0, len(uniques), codes)
+    text = pd.Series(np.append(uniques.astype(str), 'nan'), dtype='str').str.upper()
+    if strip:
+        accented = text.str.contains('[ΆΈΉΊΌΎΏ]')   # Το translate είναι αργό: μόνο όπου χρειάζεται
+        text[accented] = text[accented].str.translate(ACCENT_MAP)
+        text = text.str.replace(r'[0-9]+', '#', regex=True)
+    key_codes, keys = pd.factorize(text)
+    return key_codes[codes], np.asarray(keys, dtype=object)
+
+def _read_memo(memo_dir):
+    path = os.path.join(memo_dir, f"{RULES_VERSION}.parquet") if memo_dir else None
+    if not (path and os.path.exists(path)):
+        return {}
+    saved = pd.read_parquet(path)
+    return dict(zip(zip(saved['key'], saved['sign'].tolist()), saved['rule'].tolist()))
+
+def _load_memo(memo_dir):
+    if memo_dir not in _MEMOS:
+        _MEMOS[memo_dir] = _read_memo(memo_dir)
+    return _MEMOS[memo_dir]
+
+@contextmanager
+def _memo_lock(memo_dir, timeout=10.0, stale=60.0):
+    """
+    Lock αρχείο (O_EXCL, δουλεύει και σε Windows) γύρω από το διάβασμα + ένωση + εγγραφή του memo,
+    ώστε δύο processes να μη γράψουν ταυτόχρονα το καθένα μόνο τα δικά του κλειδιά.
+    Ένα lock παλιότερο από stale δευτερόλεπτα (process που πέθανε) αγνοείται.
+    """
+    os.makedirs(memo_dir, exist_ok=True)
+    path = os.path.join(memo_dir, ".lock")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime > stale: os.remove(path)
+            except FileNotFoundError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"memo lock busy: {path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+def flush_memo(memo_dir=MEMO_DIR):
+    """
+    Γράφει το memo αν απέκτησε νέα κλειδιά: μία φορά ανά αρχείο (load_data / τέλος του iter_transactions), όχι ανά chunk.
+    Πριν την εγγραφή ενώνεται με ό,τι υπάρχει στον δίσκο, ώστε τα statements που κατηγοριοποιούνται παράλληλα
+    (άλλα processes) να μη σβήνουν το ένα τα κλειδιά του άλλου.
+    """
+    if memo_dir not in _DIRTY:
+        return
+    _DIRTY.discard(memo_dir)
+    memo = _load_memo(memo_dir)
+    with _memo_lock(memo_dir):
+        memo.update({k: v for k, v in _read_memo(memo_dir).items() if k not in memo})
+        _save_memo(memo_dir, memo)
+
+def _save_memo(memo_dir, memo):
+    """
+    Atomic εγγραφή του memo· τα αρχεία άλλων εκδόσεων κανόνων σβήνονται.
+    """
+    os.makedirs(memo_dir, exist_ok=True)
+    for f in os.listdir(memo_dir):
+        if f.endswith('.parquet') and f != f"{RULES_VERSION}.parquet":
+            os.remove(os.path.join(memo_dir, f))
+    keys = list(memo)
+    saved = pd.DataFrame({
+        'key': [k for k, _ in keys],
+        'sign': np.array([s for _, s in keys], dtype=np.int8),
+        'rule': np.array([memo[k] for k in keys], dtype=np.int16),
+    })
+    # tmp ανά process: τα statements κατηγοριοποιούνται παράλληλα
+    tmp_path = os.path.join(memo_dir, f".{RULES_VERSION}.{os.getpid()}.tmp")
+    saved.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(memo_dir, f"{RULES_VERSION}.parquet"))
+
+def _memo_rules(df, amount, memo_dir):
+    """
+    Ο κανόνας keywords (δείκτης στο CATEGORY_RULES, -1 αν κανένας) ανά γραμμή.
+    Κλειδί = (περιγραφή + σχόλια κανονικοποιημένα, πρόσημο ποσού), γιατί κάποιοι κανόνες ισχύουν μόνο για έξοδα ή έσοδα.
+    Ταξινομούνται μόνο τα κλειδιά που δεν υπάρχουν στο memo.
+    """
+    comments = df['Comments'] if 'Comments' in df.columns else pd.Series(np.nan, index=df.index)
+    desc_codes, desc_keys = _unique_texts(df['Transaction Description'])
+    comment_codes, comment_keys = _unique_texts(comments)
+    sign = np.sign(np.nan_to_num(amount)).astype(np.int64)
+
+    combined = (desc_codes.astype(np.int64) * len(comment_keys) + comment_codes) * 3 + (sign + 1)
+    row_key, unique_combined = pd.factorize(combined)
+    pair, key_sign = np.divmod(unique_combined, 3)
+    keys = desc_keys[pair // len(comment_keys)] + ' ' + comment_keys[pair % len(comment_keys)]
+    key_sign = key_sign - 1
+
+    memo = _load_memo(memo_dir)
+    rules = np.array([memo.get(k, -2) for k in zip(keys, key_sign.tolist())], dtype=np.int64)
+    missing = np.flatnonzero(rules == -2)
+    if len(missing):
+        signs = np.array([rule[1] for rule in CATEGORY_RULES])
+        found = _first_rule(pd.Series(keys[missing], dtype='str'), _RULE_MATCHERS, signs, key_sign[missing].astype(float))
+        rules[missing] = found
+        memo.update(zip(zip(keys[missing], key_sign[missing].tolist()), found.tolist()))
+        if memo_dir: _DIRTY.add(memo_dir)
+    return rules[row_key]
+
+def categorize_frame(df, memo_dir=MEMO_DIR):
+    """
+    Vectorized εκδοχή του assign_category_data: ίδια σειρά προτεραιότητας.
+    Οι κανόνες keywords τρέχουν (ένα compiled regex ανά πρόσημο) μόνο στους μοναδικούς εμπόρους που λείπουν από το memo
+    (βλ. _memo_rules)· το Σαββατοκύριακο και η κατηγορία της τράπεζας εφαρμόζονται μετά ανά γραμμή.
+    memo_dir=None: memo μόνο στη μνήμη του process· αλλιώς τα νέα κλειδιά γράφονται με flush_memo. Επιστρέφει (Category, Subcategory) ως Series με το index του df.
+    """
+    amount = (df['Amount_Cents'] if 'Amount_Cents' in df.columns else df['Amount']).to_numpy(dtype=float)
+    rule_idx = _memo_rules(df, amount, memo_dir)
+
+    day_name = df['Day_Name'] if 'Day_Name' in df.columns else pd.Series('', index=df.index)
+    weekend = np.asarray(day_name.isin(['Saturday', 'Sunday']), dtype=bool) & (amount < 0)
+
+    # Λίγες διαφορετικές κατηγορίες τράπεζας: ο κανόνας ανά μοναδική τιμή (όπως πριν, χωρίς αφαίρεση τόνων)
+    bank_codes, bank_keys = _unique_texts(df['Bank Category'], strip=False)
+    bank_idx = _first_rule(pd.Series(bank_keys, dtype='str'), _BANK_MATCHERS)[bank_codes]
+
+    weekend_pos = len(CATEGORY_RULES)
+    bank_offset = weekend_pos + 1
+    default_pos = len(_LABELS) - 1
+
+    choice = np.select(
+        [rule_idx >= 0, weekend, bank_idx >= 0],
+        [rule_idx, weekend_pos, bank_offset + bank_idx],
+        default=default_pos
+    )
+    # Κατευθείαν categorical codes: κανένα string ανά γραμμή
+    category_codes = np.array([CATEGORY_ORDER.index(c) for c, _ in _LABELS])
+    subcategory_codes = np.array([SUBCATEGORY_ORDER.index(s) for _, s in _LABELS])
+    return (
+        pd.Series(pd.Categorical.from_codes(category_codes[choice], CATEGORY_ORDER), index=df.index, name='Category'),
+        pd.Series(pd.Categorical.from_codes(subcategory_codes[choice], SUBCATEGORY_ORDER), index=df.index, name='Subcategory'),
+    )
+
+def _ordered_categorical(values, order=None):
+    # Άγνωστες ετικέτες (π.χ. από τον Editor) μπαίνουν μετά το taxonomy, αλφαβητικά
+    labels = values.astype('category')
+    present = [str(c) for c in labels.cat.categories]
+    categories = sorted(present) if order is None else order + sorted(set(present) - set(order))
+    if list(labels.cat.categories) == categories:
+        return labels
+    return labels.cat.set_categories(categories)
+
+def _as_datetime(col):
+    # Το pd.to_datetime κοστίζει ~ms ανά κλήση ακόμα και σε στήλη που είναι ήδη datetime (π.χ. ανά μήνα)
+    return col if pd.api.types.is_datetime64_any_dtype(col) else pd.to_datetime(col)
+
+def compact_schema(df):
+    """
+    Το compact schema των συναλλαγών (ίδιο στη μνήμη και στο store):
+    Amount_Cents int64 (σε float μόνο για εμφάνιση), Tx_Id uint64, Month period[M],
+    Category/Subcategory/Day_Name/Bank Category/Account categoricals.
+    Δέχεται και παλιά frames με float Amount / string Month. Αγγίζει μόνο όσες στήλες υπάρχουν.
+    """
+    df = df.copy(deep=False)
+    if 'Amount' in df.columns:
+        if 'Amount_Cents' not in df.columns:
+            cents = np.rint(pd.to_numeric(df['Amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float) * 100)
+            df.insert(df.columns.get_loc('Amount'), 'Amount_Cents', cents.astype(np.int64))
+        df = df.drop(columns=['Amount'])
+    if 'Amount_Cents' in df.columns:
+        df['Amount_Cents'] = df['Amount_Cents'].astype(np.int64)
+    if 'Tx_Id' in df.columns:
+        df['Tx_Id'] = df['Tx_Id'].astype(np.uint64)
+    if 'Date' in df.columns:
+        df['Date'] = _as_datetime(df['Date'])
+        if 'Month' in df.columns and not isinstance(df['Month'].dtype, pd.PeriodDtype):
+            df['Month'] = df['Date'].dt.to_period('M')
+    for col, order in SCHEMA_CATEGORIES.items():
+        if col in df.columns:
+            df[col] = _ordered_categorical(df[col], order)
+    return df
+
+RAW_FILE = "data/raw/bank_export.txt"
+STATEMENTS_DIR = "data/raw/statements"
+STATEMENT_EXTENSIONS = ('.txt', '.csv')
+SNIFF_BYTES = 64 * 1024   # Αρκεί για να βρούμε header, encoding και separator
+CHUNK_ROWS = 50_000
+
+COLUMN_MAP = {
+    'Ημ/νία Συναλλαγής': 'Date',
+    'Περιγραφή Συναλλαγής': 'Transaction Description',
+    'Σχόλια / Κωδικός Αναφοράς': 'Comments',
+    'Ποσό': 'Amount',
+    'Κατηγορία': 'Bank Category'
+}
+
+def sniff_export(file_path, sniff_bytes=SNIFF_BYTES):
+    """
+    Διαβάζει μόνο τα πρώτα KB του export και επιστρέφει (encoding, sep, start_row):
+    utf-8 ή cp1253, tab ή ';', και τη γραμμή του header.
+    """
+    with open(file_path, 'rb') as f: head = f.read(sniff_bytes)
+    # Κόβουμε στο τελευταίο newline για να μη σπάσει χαρακτήρας utf-8 στη μέση
+    if len(head) == sniff_bytes and b'\n' in head:
+        head = head[:head.rindex(b'\n') + 1]
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f: lines = f.readlines()
-    except:
-        with open(file_path, 'r', encoding='cp1253') as f: lines = f.readlines()
+        text, encoding = head.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        text, encoding = head.decode('cp1253'), 'cp1253'
 
+    lines = io.StringIO(text, newline=None).readlines()
+    start_row, header = 0, lines[0] if lines else ''
     for i, line in enumerate(lines):
         if 'Κατηγορία' in line and 'Ποσό' in line:
-            start_row = i
+            start_row, header = i, line
             break
-            
-    try:
-        df = pd.read_csv(file_path, sep='\t', skiprows=start_row)
-    except:
-        df = pd.read_csv(file_path, sep=';', skiprows=start_row)
-
-    col_map = {
-        'Ημ/νία Συναλλαγής': 'Date',
-        'Περιγραφή Συναλλαγής': 'Transaction Description',
-        'Σχόλια / Κωδικός Αναφοράς': 'Comments',
-        'Ποσό': 'Amount',
-        'Κατηγορία': 'Bank Category'
-    }
-    cols_to_keep = [c for c in col_map.keys() if c in df.columns]
-    df = df[cols_to_keep].rename(columns=col_map)
+
+    sep = '\t' if header.count('\t') >= header.count(';') else ';'
+    return encoding, sep, start_row
+
+IBAN_PATTERN = re.compile(r'\b([A-Z]{2}\d{2}(?:\s?[A-Z0-9]){11,30})\b')
+# Αριθμός λογαριασμού/κάρτας σε γραμμή του preamble (κεφαλαία, χωρίς τόνους), π.χ. 'ΑΡΙΘΜΟΣ ΛΟΓΑΡΙΑΣΜΟΥ: 0123-456789',
+# 'ΚΑΡΤΑ VISA XXXX XXXX XXXX 1234'. Τα κρυμμένα ψηφία (X, *) μένουν στο κλειδί όπως είναι
+ACCOUNT_NUMBER_PATTERN = re.compile(r'(?:ΛΟΓΑΡΙΑΣΜ|ΚΑΡΤ|ACCOUNT|CARD)\w*\D*?((?:[0-9X*][ -]?){8,})')
+
+def _statement_account(file_path, sniff_bytes):
+    """
+    Τα στοιχεία του λογαριασμού από τις γραμμές πριν από το header: ('iban', IBAN χωρίς κενά),
+    ('number', αριθμός λογαριασμού/κάρτας χωρίς κενά/παύλες) ή None.
+    """
+    encoding, _, start_row = sniff_export(file_path, sniff_bytes)
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        preamble = [f.readline() for _ in range(start_row)]
+    match = IBAN_PATTERN.search(''.join(preamble))
+    if match:
+        return 'iban', match.group(1).replace(' ', '')
+    for line in preamble:
+        match = ACCOUNT_NUMBER_PATTERN.search(line.upper().translate(ACCENT_MAP))
+        number = re.sub(r'[ -]', '', match.group(1)) if match else ''
+        if sum(c.isdigit() for c in number) >= 4:
+            return 'number', number
+    return None
+
+def source_account(file_path, sniff_bytes=SNIFF_BYTES):
+    """
+    Η ετικέτα του λογαριασμού ενός export για εμφάνιση: το IBAN μόνο με τα 4 τελευταία ψηφία (π.χ. 'GR…1234'),
+    ο αριθμός λογαριασμού/κάρτας με τα 4 τελευταία (π.χ. '…1234'), αλλιώς το όνομα του αρχείου χωρίς κατάληξη.
+    Δεν μπαίνει στο Tx_Id (βλ. account_key).
+    """
+    account = _statement_account(file_path, sniff_bytes)
+    if account is None:
+        return os.path.splitext(os.path.basename(file_path))[0]
+    kind, value = account
+    return f"{value[:2]}…{value[-4:]}" if kind == 'iban' else f"…{value[-4:]}"
+
+def account_key(file_path, sniff_bytes=SNIFF_BYTES):
+    """
+    Ο λογαριασμός όπως μπαίνει στο Tx_Id: το πλήρες IBAN (δύο λογαριασμοί με ίδια 4 τελευταία ψηφία δεν συμπίπτουν),
+    αλλιώς ο αριθμός λογαριασμού/κάρτας του preamble. None αν το export δεν έχει κανένα από τα δύο (βλ. file_account_key).
+    """
+    account = _statement_account(file_path, sniff_bytes)
+    return None if account is None else f"{account[0]}:{account[1]}"
+
+def file_account_key(file_path):
+    """
+    Account key για export χωρίς στοιχεία λογαριασμού: το hash των bytes του αρχείου. Το ίδιο αρχείο ξαναφορτωμένο
+    δίνει τα ίδια ids (δεν διπλασιάζεται), αλλά οι κινήσεις του δεν ταιριάζουν ποτέ με άλλο export: χωρίς ταυτότητα
+    λογαριασμού δύο κάρτες με την ίδια συνδρομή την ίδια μέρα θα έβγαιναν "διπλές".
+    """
+    with open(file_path, 'rb') as f: return f"file:{hashlib.file_digest(f, 'sha256').hexdigest()}"
+
+def prepare_transactions(df, memo_dir=MEMO_DIR):
+    """
+    Καθαρισμός + κατηγοριοποίηση ενός raw DataFrame (ολόκληρου αρχείου ή chunk). memo_dir: βλ. categorize_frame.
+    """
+    missing = [c for c in COLUMN_MAP if c not in df.columns and COLUMN_MAP[c] != 'Comments']
+    if missing:
+        raise ValueError(f"Not a bank export, missing columns: {', '.join(missing)}")
+    cols_to_keep = [c for c in COLUMN_MAP.keys() if c in df.columns]
+    df = df[cols_to_keep].rename(columns=COLUMN_MAP)
 
     df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
     df = df.dropna(subset=['Date'])
-    df['Month'] = df['Date'].dt.strftime('%Y-%m')
-    df['Day_Name'] = df['Date'].dt.day_name()
-    df['Amount'] = df['Amount'].apply(clean_amount)
-    
-    df[['Category', 'Subcategory']] = df.apply(lambda x: pd.Series(assign_category_data(x)), axis=1)
+    df['Month'] = df['Date'].dt.to_period('M')
+    df['Day_Name'] = pd.Categorical.from_codes(df['Date'].dt.dayofweek.to_numpy(), DAY_ORDER)
+    df = df.rename(columns={'Amount': 'Amount_Cents'})
+    df['Amount_Cents'], df.attrs['coerced_amounts'] = parse_amounts(df['Amount_Cents'], cents=True)
+    df['Bank Category'] = _ordered_categorical(df['Bank Category'])
+
+    df['Category'], df['Subcategory'] = categorize_frame(df, memo_dir)
+
+    return df
 
-    return df
\ No newline at end of file
+@timed()
+def load_data(file_path=RAW_FILE, memo_dir=MEMO_DIR):
+    encoding, sep, start_row = sniff_export(file_path)
+    df = pd.read_csv(file_path, sep=sep, skiprows=start_row, encoding=encoding)
+    annotate(rows_in=len(df), encoding=encoding)
+    prepared = prepare_transactions(df, memo_dir)
+    flush_memo(memo_dir)
+    return TransactionFrame(prepared)
+
+def _text_hash(col):
+    """
+    Hash (uint64) του κειμένου κανονικοποιημένου: κεφαλαία, χωρίς τόνους και διπλά κενά,
+    γιατί η ίδια κίνηση σε δύο exports μπορεί να διαφέρει μόνο σε αυτά. Κενά κελιά = ''.
+    Η κανονικοποίηση γίνεται μόνο στις μοναδικές τιμές (οι περιγραφές επαναλαμβάνονται πολύ).
+    """
+    codes, uniques = pd.factorize(col)
+    text = pd.Series(uniques.astype(str)).str.upper()
+    accented = text.str.contains('[ΆΈΉΊΌΎΏ]')   # Το translate είναι αργό: μόνο όπου χρειάζεται
+    text[accented] = text[accented].str.translate(ACCENT_MAP)
+    text = text.str.replace(r'\s+', ' ', regex=True).str.strip()
+    # Οι τιμές είναι ήδη μοναδικές: χωρίς το εσωτερικό factorize του hash_array
+    hashes = pd.util.hash_array(np.append(text.to_numpy(dtype=object), ''), categorize=False)
+    return hashes[codes]   # code -1 (κενό) -> το τελευταίο, δηλαδή το hash του ''
+
+def transaction_ids(df, account):
+    """
+    Ταυτότητα κάθε συναλλαγής (uint64): hash των (Date, Amount_Cents, περιγραφή, σχόλια) κανονικοποιημένων
+    και του account: το account_key (ή file_account_key) του export, ίδιο για όλες τις γραμμές του frame.
+    Ίδιες γραμμές (π.χ. δύο ίδιοι καφέδες την ίδια μέρα) ξεχωρίζουν με τον αύξοντα αριθμό τους μέσα στο αρχείο,
+    οπότε δύο exports του ίδιου λογαριασμού που επικαλύπτονται δίνουν τα ίδια ids για τις ίδιες κινήσεις.
+    """
+    if not account:
+        raise ValueError("transaction_ids needs an account key (see etl.account_key / file_account_key)")
+    empty = pd.Series('', index=df.index)
+    key = pd.DataFrame({
+        'date': _as_datetime(df['Date']).to_numpy(dtype='datetime64[s]').astype(np.int64),
+        'cents': df['Amount_Cents'].to_numpy(dtype=np.int64),
+        'description': _text_hash(df['Transaction Description']),
+        'comments': _text_hash(df['Comments'] if 'Comments' in df.columns else empty),
+        'account': np.full(len(df), _text_hash(pd.Series([account]))[0], dtype=np.uint64),
+    }, index=df.index)
+    base = pd.util.hash_pandas_object(key, index=False)
+    occurrence = base.groupby(base.to_numpy(), sort=False).cumcount()
+    ids = pd.util.hash_pandas_object(pd.DataFrame({'key': base, 'n': occurrence}), index=False)
+    return ids.rename('Tx_Id')
+
+def list_statements(folder=STATEMENTS_DIR, fallback=RAW_FILE):
+    """
+    Τα statements του φακέλου (ταξινομημένα). Αν δεν υπάρχει κανένα, το παλιό μοναδικό export (αν υπάρχει).
+    """
+    paths = []
+    if os.path.isdir(folder):
+        paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(STATEMENT_EXTENSIONS))
+    if not paths and fallback and os.path.exists(fallback):
+        paths = [fallback]
+    return paths
+
+def iter_transactions(file_path=RAW_FILE, chunksize=CHUNK_ROWS, memo_dir=MEMO_DIR):
+    """
+    Streaming εκδοχή του load_data: διαβάζει το αρχείο σε chunks σταθερού μεγέθους
+    και επιστρέφει κάθε chunk καθαρισμένο και κατηγοριοποιημένο.
+    """
+    encoding, sep, start_row = sniff_export(file_path)
+    reader = pd.read_csv(file_path, sep=sep, skiprows=start_row, encoding=encoding, chunksize=chunksize)
+    try:
+        with reader:
+            for chunk in reader:
+                prepared = prepare_transactions(chunk, memo_dir)
+                prepared.attrs['rows_read'] = len(chunk)   # Πριν πεταχτούν οι γραμμές χωρίς έγκυρη ημερομηνία
+                yield prepared
+    finally:
+        flush_memo(memo_dir)   # Μία εγγραφή του memo ανά αρχείο (και όταν ο caller σταματήσει νωρίτερα)
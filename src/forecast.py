@@ -1,6 +1,14 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+from src.cube import monthly_overview
+from src.frame import as_transactions
+from src.perf import timed
 
+MC_PATHS = 10_000
+MC_MAX_MONTHS = 240  # Πέρα από 20 χρόνια θεωρούμε ότι ο στόχος "δεν πιάνεται"
+
+@timed()
 def project_goal_date(current_saved, goal_amount, monthly_savings_rate):
     """
     Υπολογίζει πότε θα πιάσεις τον στόχο με βάση τον τωρινό ρυθμό σου.
@@ -53,4 +61,55 @@ def project_goal_date(current_saved, goal_amount, monthly_savings_rate):
             
     df_project = pd.DataFrame(projection_data)
     
-    return f"📅 Εκτιμώμενη Ημερομηνία: **{formatted_date}** (σε {months_needed:.1f} μήνες)", df_project
\ No newline at end of file
+    return f"📅 Εκτιμώμενη Ημερομηνία: **{formatted_date}** (σε {months_needed:.1f} μήνες)", df_project
+
+def monthly_net_savings(history_df=None, cube=None):
+    """
+    Η ιστορική καθαρή αποταμίευση ανά μήνα (Έσοδα - Έξοδα), π.χ. από το load_history().
+    """
+    if cube is None: cube = as_transactions(history_df).cube
+    return monthly_overview(cube)['Savings'].to_numpy(dtype=float)
+
+@timed()
+def simulate_goal(current_saved, goal_amount, monthly_samples, n_paths=MC_PATHS, max_months=MC_MAX_MONTHS, seed=None):
+    """
+    Monte Carlo πρόβλεψη: κάθε path τραβάει μηνιαίες αποταμιεύσεις από την εμπειρική κατανομή
+    (monthly_samples) και όλα τα paths προσομοιώνονται μαζί ως ένας NumPy πίνακας (paths x μήνες).
+    Επιστρέφει (μήνυμα, bands DataFrame με Date/P10/P50/P90, {P10/P50/P90: ημερομηνία ή None}).
+    """
+    samples = np.asarray(monthly_samples, dtype=float)
+    if current_saved >= goal_amount:
+        return "🎉 Ο στόχος επιτεύχθηκε!", pd.DataFrame(), {}
+    if samples.size == 0 or samples.mean() <= 0:
+        return "⚠️ Με αρνητική/μηδενική αποταμίευση, δεν θα φτάσεις ποτέ...", pd.DataFrame(), {}
+
+    # Ορίζοντας: αρκετά παραπάνω από τη μέση εκτίμηση, για να φανούν και τα αργά paths
+    remaining_amount = goal_amount - current_saved
+    horizon = int(min(max_months, np.ceil(remaining_amount / samples.mean() * 3) + 1))
+
+    rng = np.random.default_rng(seed)
+    draws = rng.choice(samples.astype(np.float32), size=(n_paths, horizon))
+    balances = current_saved + np.cumsum(draws, axis=1)
+
+    # Πρώτος μήνας που κάθε path περνάει τον στόχο (inf αν δεν τον περνάει ποτέ)
+    reached = balances >= goal_amount
+    months_needed = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, np.inf)
+    finish = np.quantile(months_needed, [0.1, 0.5, 0.9], method='inverted_cdf')
+
+    today = pd.Timestamp(datetime.now().date())
+    dates = {
+        label: (today + pd.DateOffset(months=int(m)) if np.isfinite(m) else None)
+        for label, m in zip(['P10', 'P50', 'P90'], finish)
+    }
+
+    bands = np.quantile(balances, [0.1, 0.5, 0.9], axis=0)
+    df_bands = pd.DataFrame({
+        "Date": [today + pd.DateOffset(months=m) for m in range(horizon + 1)],
+        "P10": np.r_[current_saved, bands[0]],
+        "P50": np.r_[current_saved, bands[1]],
+        "P90": np.r_[current_saved, bands[2]],
+    })
+
+    fmt = lambda d: d.strftime("%m/%Y") if d is not None else "—"
+    msg = f"📅 Πιθανότερη Ημερομηνία: **{fmt(dates['P50'])}** (P10: {fmt(dates['P10'])}, P90: {fmt(dates['P90'])})"
+    return msg, df_bands, dates
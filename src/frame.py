@@ -0,0 +1,118 @@
+import pandas as pd
+from src.cube import SAVINGS_CATEGORY, build_cube
+
+# Τα "ανελαστικά" έξοδα δεν μετράνε για τη Μαύρη Τρύπα
+FIXED_CATEGORIES = ['🏠 Σπίτι & Πάγια', SAVINGS_CATEGORY]
+
+class TransactionFrame:
+    """
+    Οι συναλλαγές (compact schema, βλ. etl.compact_schema) μαζί με τα παράγωγα "views" τους
+    (expenses, income, elastic, amount, abs_amount, period, months, cube),
+    που υπολογίζονται μία φορά, την πρώτη φορά που ζητηθούν, και ξαναφτιάχνονται μόνο μετά από αλλαγή.
+    Για ό,τι άλλο συμπεριφέρεται σαν το DataFrame (tx['Month'], tx.empty, tx[mask] κτλ.).
+    """
+    def __init__(self, df):
+        self._df = df
+        self._views = {}
+
+    @property
+    def df(self):
+        return self._df
+
+    def _view(self, name, build):
+        if name not in self._views:
+            self._views[name] = build()
+        return self._views[name]
+
+    def invalidate(self):
+        self._views = {}
+
+    def replace(self, df):
+        """
+        Νέα δεδομένα (π.χ. μετά από αποθήκευση στον Editor): πετιούνται όλα τα views.
+        """
+        self._df = df
+        self.invalidate()
+        return self
+
+    def __setitem__(self, column, value):
+        self._df[column] = value
+        self.invalidate()
+
+    # --- Views (read-only: όποιος θέλει να τα αλλάξει κάνει πρώτα .copy()) ---
+    @property
+    def expenses(self):
+        # Πραγματικά έξοδα (χωρίς τις μεταφορές σε Αποταμίευση), με Amount/Abs_Amount σε ευρώ για εμφάνιση
+        def build():
+            df = self._df
+            expenses = df[(df['Amount_Cents'] < 0) & (df['Category'] != SAVINGS_CATEGORY)].copy()
+            expenses['Amount'] = expenses['Amount_Cents'] / 100
+            expenses['Abs_Amount'] = expenses['Amount'].abs()
+            return expenses
+        return self._view('expenses', build)
+
+    @property
+    def income(self):
+        return self._view('income', lambda: self._df[self._df['Amount_Cents'] > 0])
+
+    @property
+    def elastic(self):
+        return self._view('elastic', lambda: self.expenses[~self.expenses['Category'].isin(FIXED_CATEGORIES)])
+
+    @property
+    def amount(self):
+        # Ποσά σε ευρώ (float) μόνο για εμφάνιση, οι πράξεις γίνονται στα Amount_Cents
+        return self._view('amount', lambda: (self._df['Amount_Cents'] / 100).rename('Amount'))
+
+    @property
+    def abs_amount(self):
+        return self._view('abs_amount', lambda: self.amount.abs())
+
+    @property
+    def period(self):
+        # Κλειδί μήνα (period[M]) για κάθε γραμμή
+        def build():
+            df = self._df
+            return df['Month'] if 'Month' in df.columns else df['Date'].dt.to_period('M')
+        return self._view('period', build)
+
+    @property
+    def months(self):
+        # Οι μήνες ως 'YYYY-MM', ταξινομημένοι
+        return self._view('months', lambda: sorted(str(m) for m in self.period.unique()))
+
+    @property
+    def cube(self):
+        return self._view('cube', lambda: build_cube(self._df))
+
+    def month(self, month):
+        return self._view(('month', month), lambda: TransactionFrame(self._df[self.period == pd.Period(month, 'M')]))
+
+    # --- Συμπεριφορά DataFrame ---
+    def __getitem__(self, key):
+        return self._df[key]
+
+    def __getattr__(self, name):
+        # Καλείται μόνο για ό,τι δεν υπάρχει στην κλάση (columns, empty, groupby, ...)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._df, name)
+
+    def __len__(self):
+        return len(self._df)
+
+def memory_report(df):
+    """
+    Μνήμη ανά στήλη (deep, σε MB) μαζί με το dtype, και μια γραμμή TOTAL.
+    """
+    df = df.df if isinstance(df, TransactionFrame) else df
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'Column': usage.index, 'Dtype': [str(df[c].dtype) for c in usage.index], 'MB': usage.to_numpy() / 1e6})
+    total = pd.DataFrame({'Column': ['TOTAL'], 'Dtype': [''], 'MB': [report['MB'].sum()]})
+    return pd.concat([report, total], ignore_index=True)
+
+def as_transactions(df):
+    """
+    Δέχεται DataFrame ή TransactionFrame και επιστρέφει πάντα TransactionFrame.
+    """
+    return df if isinstance(df, TransactionFrame) else TransactionFrame(df)
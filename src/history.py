@@ -1,102 +1,166 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-import plotly.graph_objects as go
-import plotly.express as px
-import streamlit as st
+import json
+import hashlib
+import threading
+from functools import partial
+from src.store import PROCESSED_DIR, list_months, load_month, month_file, override_versions, atomic_write
+from src.etl import compact_schema
+from src.parallel import read_files
+from src.perf import timed, annotate
 
-def load_history():
+SNAPSHOT_METADATA_KEY = b"history_months"
+
+def snapshot_path(folder=PROCESSED_DIR, columns=None):
     """
-    Φορτώνει όλα τα CSV από το data/processed και τα ενώνει.
+    Το αρχείο όπου το HistoryCache κρατάει το ενωμένο ιστορικό ανάμεσα σε restarts, δίπλα στο manifest (ένα ανά σύνολο στηλών).
     """
-    folder = "data/processed"
-    if not os.path.exists(folder):
-        return pd.DataFrame()
+    if columns is None:
+        return os.path.join(folder, "history.parquet")
+    return os.path.join(folder, f"history-{hashlib.sha1(','.join(columns).encode('utf-8')).hexdigest()[:10]}.parquet")
 
-    all_files = [f for f in os.listdir(folder) if f.endswith('.csv')]
-    if not all_files:
-        return pd.DataFrame()
+def _jsonable(signature):
+    size, mtime_ns, versions = signature
+    return [size, mtime_ns, list(versions) if versions is not None else None]
 
-    df_list = []
-    for filename in all_files:
-        path = os.path.join(folder, filename)
-        try:
-            temp_df = pd.read_csv(path)
-            temp_df['Date'] = pd.to_datetime(temp_df['Date'])
-            df_list.append(temp_df)
-        except Exception as e:
-            print(f"Error loading {filename}: {e}")
-
-    if df_list:
-        full_history = pd.concat(df_list, ignore_index=True)
-        return full_history.sort_values(by='Date')
-    else:
-        return pd.DataFrame()
-
-def plot_monthly_overview(df):
+class HistoryCache:
     """
-    Bar Chart: Income vs Expenses (Διορθωμένο Math & Axis)
+    Κρατάει στη μνήμη κάθε μήνα του store μαζί με το (size, mtime) του αρχείου του και την έκδοση των overrides του.
+    Σε κάθε load() ξαναδιαβάζονται (παράλληλα) μόνο οι νέοι/αλλαγμένοι μήνες και πετιούνται όσοι σβήστηκαν.
+    Ένα cache μοιράζεται από όλα τα sessions (threads): refresh/_merge τρέχουν κάτω από lock.
+    persist=True: το ενωμένο ιστορικό γράφεται και στο snapshot_path μαζί με τα signatures των μηνών,
+    ώστε μετά από restart οι αμετάβλητοι μήνες να διαβάζονται από ένα αρχείο αντί για ένα ανά μήνα.
     """
-    # 1. Grouping ανά Μήνα
-    df['Period'] = df['Date'].dt.to_period('M').astype(str)
-    
-    # 2. Υπολογισμός (Σωστά Μαθηματικά)
-    # Income: Όλα τα θετικά
-    # Expenses: Όλα τα αρνητικά ΕΚΤΟΣ Αποταμίευσης
-    # Savings: Income - Expenses (Θεωρητική Αποταμίευση, όχι υπόλοιπο τράπεζας)
-    
-    monthly = df.groupby('Period').apply(
-        lambda x: pd.Series({
-            'Income': x[x['Amount'] > 0]['Amount'].sum(),
-            'Expenses': abs(x[(x['Amount'] < 0) & (x['Category'] != '💰 Αποταμίευση')]['Amount'].sum()),
-        })
-    ).reset_index()
-
-    # Υπολογίζουμε την καθαρή αποταμίευση βάσει της εξίσωσης
-    monthly['Savings'] = monthly['Income'] - monthly['Expenses']
-
-    fig = go.Figure()
-
-    # Μπάρες
-    fig.add_trace(go.Bar(x=monthly['Period'], y=monthly['Income'], name='Έσοδα', marker_color='#198754'))
-    fig.add_trace(go.Bar(x=monthly['Period'], y=monthly['Expenses'], name='Έξοδα', marker_color='#dc3545'))
-
-    # Γραμμή (Trend)
-    fig.add_trace(go.Scatter(
-        x=monthly['Period'], y=monthly['Savings'], name='Net Savings',
-        mode='lines+markers+text', text=monthly['Savings'].apply(lambda x: f"{x:.0f}€"),
-        textposition="top center",
-        line=dict(color='#0dcaf0', width=3)
-    ))
-
-    # Layout (Fix Axis Type to Category)
-    fig.update_layout(
-        title="📊 Έσοδα vs Έξοδα (Σύγκριση Μηνών)",
-        barmode='group',
-        height=450,
-        xaxis=dict(type='category'), # <-- ΑΥΤΟ ΦΤΙΑΧΝΕΙ ΤΟ ΓΡΑΦΗΜΑ ΝΑ ΜΗΝ ΕΧΕΙ ΚΕΝΑ
-        margin=dict(l=20, r=20, t=40, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    return fig
-
-def plot_category_trends(df):
+    def __init__(self, folder=PROCESSED_DIR, columns=None, workers=None, persist=True):
+        self.folder = folder
+        self.columns = columns
+        self.workers = workers
+        self.persist = persist
+        self.parts = {}             # month -> ((size, mtime_ns), ταξινομημένο DataFrame)
+        self.history = None         # Ενωμένο ιστορικό (None = πρέπει να ξαναφτιαχτεί)
+        self.stats = {"hits": 0, "misses": 0, "dropped": 0, "restored": 0}
+        self.errors = {}            # month -> μήνυμα σφάλματος του τελευταίου refresh
+        self._lock = threading.RLock()
+        self._restored = False
+
+    def _signatures(self):
+        signatures = {}
+        versions = override_versions(self.folder)
+        for month in list_months(self.folder):
+            try:
+                file_stat = os.stat(os.path.join(self.folder, month_file(month)))
+            except FileNotFoundError:
+                continue  # Το αρχείο σβήστηκε -> ο μήνας θεωρείται διαγραμμένος
+            signatures[month] = (file_stat.st_size, file_stat.st_mtime_ns, versions.get(month))
+        return signatures
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        signatures = self._signatures()
+        self.stats = {"hits": 0, "misses": 0, "dropped": 0, "restored": 0}
+        if self.persist and not self._restored:
+            self._restored = True
+            self._restore(signatures)
+
+        for month in set(self.parts) - set(signatures):
+            del self.parts[month]
+            self.stats["dropped"] += 1
+            self.history = None
+
+        changed = [m for m, signature in signatures.items() if self.parts.get(m, (None,))[0] != signature]
+        self.stats["hits"] = len(signatures) - len(changed)
+        self.stats["misses"] = len(changed)
+        if not changed:
+            self.errors = {}
+            return
+
+        reader = partial(_read_sorted_month, columns=self.columns, folder=self.folder)
+        result = read_files(changed, reader, self.workers)
+        for month, part in result.frames.items():
+            self.parts[month] = (signatures[month], part)
+        for month in result.errors:
+            self.parts.pop(month, None)
+        self.errors = result.errors
+        self.history = None
+
+    def load(self, months=None):
+        # Refresh + merge μαζί: άλλο session δεν αλλάζει τα parts ανάμεσα στα δύο
+        with self._lock:
+            self._refresh()
+            if months is not None:
+                return self._merge([m for m in sorted(self.parts) if m in set(months)])
+            if self.history is None:
+                self.history = self._merge(sorted(self.parts))
+                if self.persist: self._save()
+            # Shallow copy: οι νέες στήλες του caller δεν πειράζουν το cache
+            return self.history.copy(deep=False)
+
+    def _merge(self, months):
+        if not months:
+            return pd.DataFrame()
+        merged = pd.concat([self.parts[m][1] for m in months], ignore_index=True)
+        # Το concat μηνών με διαφορετικές κατηγορίες χάνει το categorical dtype
+        return compact_schema(merged)
+
+    def _restore(self, signatures):
+        # Μόνο οι μήνες του snapshot που δεν άλλαξαν από τότε· οι υπόλοιποι διαβάζονται κανονικά στο _refresh
+        path = snapshot_path(self.folder, self.columns)
+        try:
+            saved = json.loads(pq.read_schema(path).metadata[SNAPSHOT_METADATA_KEY])
+            if not any(signatures.get(month) is not None and _jsonable(signatures[month]) == signature for month, _, signature in saved):
+                return
+            history = compact_schema(pd.read_parquet(path))
+        except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+            return  # Δεν υπάρχει ή δεν διαβάζεται: όλοι οι μήνες από το store
+
+        start = 0
+        for month, rows, signature in saved:
+            if signatures.get(month) is not None and _jsonable(signatures[month]) == signature:
+                self.parts[month] = (signatures[month], history.iloc[start:start + rows])
+                self.stats["restored"] += 1
+            start += rows
+        if set(self.parts) == set(signatures):
+            self.history = history
+
+    def _save(self):
+        months = sorted(self.parts)
+        saved = json.dumps([[month, len(self.parts[month][1]), _jsonable(self.parts[month][0])] for month in months])
+        try:
+            table = pa.Table.from_pandas(self.history, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), SNAPSHOT_METADATA_KEY: saved.encode('utf-8')})
+            atomic_write(snapshot_path(self.folder, self.columns), lambda tmp_path: pq.write_table(table, tmp_path))
+        except (OSError, pa.ArrowException):
+            pass  # Το snapshot είναι μόνο επιτάχυνση του restart
+
+def _read_sorted_month(month, columns, folder):
+    # Κάθε μήνας ταξινομείται μόνος του, οπότε η ένωση με σειρά μηνών είναι ήδη ταξινομημένη
+    return load_month(month, columns, folder).sort_values(by='Date', kind='stable')
+
+_HISTORY_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_history_cache(columns=None, folder=PROCESSED_DIR):
+    key = (folder, tuple(columns) if columns is not None else None)
+    with _CACHES_LOCK:
+        if key not in _HISTORY_CACHES:
+            _HISTORY_CACHES[key] = HistoryCache(folder, columns)
+        return _HISTORY_CACHES[key]
+
+@timed()
+def load_history(columns=None, months=None, folder=PROCESSED_DIR):
     """
-    Line Chart: Τάσεις Κατηγοριών
+    Φορτώνει τους μήνες από το store (data/processed) και τους ενώνει, ταξινομημένους κατά Date.
+    columns/months: διαβάζονται μόνο οι στήλες και οι μήνες που χρειάζονται.
+    Χρησιμοποιεί το HistoryCache, οπότε αν δεν άλλαξε κανένας μήνας δεν διαβάζεται τίποτα.
     """
-    expenses = df[(df['Amount'] < 0) & (df['Category'] != '💰 Αποταμίευση')].copy()
-    expenses['Period'] = expenses['Date'].dt.to_period('M').astype(str)
-    expenses['Abs_Amount'] = expenses['Amount'].abs()
-    
-    trends = expenses.groupby(['Period', 'Category'])['Abs_Amount'].sum().reset_index()
-    
-    fig = px.line(
-        trends, x='Period', y='Abs_Amount', color='Category', markers=True,
-        title="📈 Πού αυξάνονται τα έξοδα;"
-    )
-    
-    fig.update_layout(
-        height=400,
-        xaxis=dict(type='category'), # <-- ΚΑΙ ΕΔΩ CATEGORY
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    return fig
\ No newline at end of file
+    if columns is not None and 'Date' not in columns:
+        columns = ['Date'] + list(columns)
+    cache = get_history_cache(columns, folder)
+    history = cache.load(months)
+    annotate(cache_hits=cache.stats["hits"], cache_misses=cache.stats["misses"])
+    return history
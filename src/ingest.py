@@ -0,0 +1,298 @@
+import os
+import copy
+import time
+import queue
+import threading
+import functools
+import multiprocessing
+from dataclasses import dataclass, field
+import pandas as pd
+from src.etl import CHUNK_ROWS, compact_schema, iter_transactions, source_account, account_key, file_account_key, transaction_ids
+from src.upload_cache import UPLOAD_CACHE_DIR, MAX_CACHE_BYTES, CacheWriter, cache_path, iter_cached, read_months, evict
+from src.store import PROCESSED_DIR, ImportReport, import_transactions
+from src.parallel import DEFAULT_WORKERS, read_files
+from src.perf import trace
+
+EVENT_QUEUE_SIZE = 8   # Αν το store αργεί, οι workers περιμένουν αντί να κρατάνε στη μνήμη μήνες που δεν γράφτηκαν
+
+# Η εισαγωγή των statements τρέχει σε background thread (IngestJob), ώστε το Streamlit script να μη μπλοκάρει:
+# το UI παίρνει όποτε θέλει ένα snapshot της προόδου (job.progress()) και κάθε μήνας μπαίνει στο store
+# μόλις ολοκληρωθεί, οπότε φαίνεται πριν τελειώσει το διάβασμα όλου του αρχείου.
+# Το διάβασμα/κατηγοριοποίηση (CPU-bound) γίνεται σε process pool (parse_statement, ένα αρχείο ανά worker)·
+# οι workers στέλνουν τους μήνες σε ένα queue και το thread του job τους γράφει στο store.
+
+@dataclass
+class IngestError:
+    """
+    Σφάλμα ενός αρχείου: σε ποιο στάδιο (read / parse / import / cache), τύπος και μήνυμα της εξαίρεσης.
+    """
+    file: str
+    stage: str
+    error: str
+    message: str
+
+    def __str__(self):
+        return f"{self.stage} failed ({self.error}): {self.message}"
+
+@dataclass
+class IngestProgress:
+    """
+    Snapshot της προόδου ενός IngestJob (αντίγραφο: ασφαλές για διάβασμα από άλλο thread).
+    """
+    files_total: int
+    files_done: int = 0
+    current: str = None                 # Το αρχείο που διαβάζεται τώρα
+    rows_parsed: int = 0                # Γραμμές που διαβάστηκαν από τα exports
+    rows_categorized: int = 0           # Γραμμές με έγκυρη ημερομηνία, καθαρισμένες και κατηγοριοποιημένες
+    months: list = field(default_factory=list)   # Μήνες που γράφτηκαν στο store, με τη σειρά που γράφτηκαν
+    published: int = 0                  # Αυξάνεται όταν αλλάζει το store (νέες γραμμές): αλλαγή = υπάρχουν νέα δεδομένα
+    report: ImportReport = field(default_factory=ImportReport)
+    errors: list = field(default_factory=list)   # IngestError ανά αρχείο που απέτυχε
+    warnings: list = field(default_factory=list)  # Π.χ. statements χωρίς στοιχεία λογαριασμού (χωρίς dedupe με άλλα αρχεία)
+    state: str = "running"              # running / done / failed / cancelled
+    elapsed: float = 0.0
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    @property
+    def fraction(self):
+        return self.files_done / self.files_total if self.files_total else 1.0
+
+def _send_newest_first(events, path, months):
+    # Ο πιο πρόσφατος μήνας (αυτός που ανοίγει το UI) στέλνεται μόνος του πρώτα, οι υπόλοιποι μαζί
+    order = sorted(months, reverse=True)
+    for batch in (order[:1], order[1:]):
+        if batch: events.put(('months', path, {month: months[month] for month in batch}))
+
+def parse_statement(path, events, cancelled, cache_dir=UPLOAD_CACHE_DIR, chunksize=CHUNK_ROWS):
+    """
+    Worker του IngestJob (top-level ώστε να τρέχει σε process pool): διαβάζει ένα statement σε chunks και στέλνει στο events
+    ('rows', path, parsed, categorized) ανά chunk, ('months', path, {month: DataFrame}) για κάθε μήνα που ολοκληρώθηκε,
+    ('failed', path, stage, error, message) αν αποτύχει και στο τέλος ('done', path).
+    Το upload cache γράφεται όσο διαβάζεται το αρχείο, ή (ίδια bytes + ίδιοι κανόνες) διαβάζεται κι αυτό σε κομμάτια
+    αντί για ETL: και στις δύο περιπτώσεις στη μνήμη μένουν μόνο οι μήνες που δεν έχουν κλείσει ακόμα.
+    """
+    stage = "read"
+    try:
+        if cancelled.is_set():
+            return
+        entry = cache_path(path, cache_dir)
+        hit = os.path.exists(entry)
+        if hit:
+            os.utime(entry)  # Ανανέωση του mtime για το LRU
+            chunks = iter_cached(entry, chunksize)
+        else:
+            stage = "parse"
+            chunks = iter_transactions(path, chunksize)
+
+        parts, published, reopened = {}, set(), set()
+        with CacheWriter(entry) as cache:
+            for chunk in chunks:
+                if cancelled.is_set():
+                    return
+                events.put(('rows', path, chunk.attrs.get('rows_read', len(chunk)), len(chunk)))
+                if chunk.empty:
+                    continue
+                if not hit:
+                    stage = "cache"
+                    cache.write(chunk)
+                    stage = "parse"
+                current = set()
+                for month, part in chunk.groupby('Month', sort=False, observed=True):
+                    month = str(month)
+                    current.add(month)
+                    parts.setdefault(month, []).append(part)
+                    if month in published: reopened.add(month)
+                # Τα exports είναι ταξινομημένα κατά ημερομηνία: ένας μήνας που δεν συνεχίζει στο chunk έχει ολοκληρωθεί.
+                # Αν ξαναεμφανιστεί αργότερα (μη ταξινομημένο αρχείο), ξαναστέλνεται στο τέλος με όλες του τις γραμμές.
+                closed = sorted(set(parts) - current - published, reverse=True)
+                if closed:
+                    events.put(('months', path, {month: pd.concat(parts.pop(month), ignore_index=True) for month in closed}))
+                    published.update(closed)
+            if not hit:
+                stage = "cache"
+                cache.commit()
+
+        months = {month: pd.concat(frames, ignore_index=True) for month, frames in parts.items()}
+        if reopened:
+            # Οι προηγούμενες γραμμές τους έχουν ήδη φύγει από τη μνήμη: ξαναδιαβάζονται από το entry
+            months.update(read_months(entry, reopened))
+        _send_newest_first(events, path, months)
+    except Exception as e:
+        events.put(('failed', path, stage, type(e).__name__, str(e)))
+    finally:
+        events.put(('done', path))
+
+class IngestJob:
+    """
+    Handle μιας εισαγωγής statements σε background thread (βλ. start_ingest).
+    progress(): snapshot για το UI, cancel(): σταματάει στο επόμενο chunk, wait(): περιμένει να τελειώσει.
+    Τα αρχεία διαβάζονται παράλληλα σε process pool (ένας worker αν workers=1 ή υπάρχει ένα αρχείο)·
+    ένα αρχείο που αποτυγχάνει δεν σταματάει τα υπόλοιπα.
+    """
+    def __init__(self, paths, folder=PROCESSED_DIR, cache_dir=UPLOAD_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, chunksize=CHUNK_ROWS, workers=None):
+        self.paths = list(paths)
+        self.folder = folder
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.chunksize = chunksize
+        self.workers = min(workers or DEFAULT_WORKERS, max(len(self.paths), 1))
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._progress = IngestProgress(files_total=len(self.paths))
+        self._thread = threading.Thread(target=self._run, name="ingest", daemon=True)
+        self._accounts = {}            # path -> (Account, account_key)
+        self._rows_imported = {}       # (path, month) -> γραμμές που έχουν ήδη γραφτεί
+        self._failed = set()           # Αρχεία με σφάλμα: οι μήνες τους που έρχονται μετά δεν γράφονται
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def progress(self):
+        with self._lock:
+            snapshot = copy.deepcopy(self._progress)
+        if snapshot.running:
+            snapshot.elapsed = time.perf_counter() - self._started
+        return snapshot
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def done(self):
+        return self._started is not None and not self._thread.is_alive()
+
+    def _run(self):
+        manager = None
+        try:
+            with trace("ingest", files=len(self.paths), workers=self.workers):
+                if self.workers > 1:
+                    # Queue/Event που περνάνε στους workers του process pool
+                    manager = multiprocessing.Manager()
+                    events, cancelled = manager.Queue(EVENT_QUEUE_SIZE), manager.Event()
+                else:
+                    events, cancelled = queue.Queue(EVENT_QUEUE_SIZE), threading.Event()
+                reader = functools.partial(parse_statement, events=events, cancelled=cancelled,
+                                           cache_dir=self.cache_dir, chunksize=self.chunksize)
+                parser = threading.Thread(target=self._parse, args=(reader, events), name="ingest-parse", daemon=True)
+                parser.start()
+                self._consume(events, cancelled)
+                parser.join()
+                evict(self.cache_dir, self.max_bytes)
+        except Exception as e:
+            self._fail(None, "job", e)
+        finally:
+            if manager is not None: manager.shutdown()
+            with self._lock:
+                progress = self._progress
+                progress.current = None
+                progress.elapsed = time.perf_counter() - self._started
+                if self._cancelled.is_set():
+                    progress.state = "cancelled"
+                elif progress.errors and not progress.months:
+                    progress.state = "failed"
+                else:
+                    progress.state = "done"
+
+    def _parse(self, reader, events):
+        def on_done(path, _, error):
+            # Μόνο αν ο worker δεν έστειλε ο ίδιος το τέλος του (π.χ. process που πέθανε)
+            if error is not None:
+                name, _, message = error.partition(": ")
+                events.put(('failed', path, "parse", name, message))
+                events.put(('done', path))
+        try:
+            read_files(self.paths, reader, self.workers, use_processes=self.workers > 1, on_done=on_done)
+        finally:
+            events.put(None)
+
+    def _consume(self, events, cancelled):
+        # Τρέχει στο thread του job: γράφει στο store ό,τι στέλνουν οι workers, με τη σειρά που το στέλνουν
+        while True:
+            try:
+                event = events.get(timeout=0.2)
+            except queue.Empty:
+                event = ()
+            if self._cancelled.is_set():
+                cancelled.set()   # Οι workers σταματάνε στο επόμενο chunk
+            if event is None:
+                return
+            if not event:
+                continue
+            kind, path, *rest = event
+            if kind == 'rows':
+                with self._lock:
+                    self._progress.current = os.path.basename(path)
+                    self._progress.rows_parsed += rest[0]
+                    self._progress.rows_categorized += rest[1]
+            elif kind == 'months':
+                if not self._cancelled.is_set() and path not in self._failed:
+                    self._publish(path, rest[0])
+            elif kind == 'failed':
+                self._failed.add(path)
+                with self._lock:
+                    self._progress.errors.append(IngestError(os.path.basename(path), *rest))
+            elif kind == 'done':
+                with self._lock:
+                    self._progress.files_done += 1
+
+    def _fail(self, file, stage, exc):
+        with self._lock:
+            self._progress.errors.append(IngestError(file, stage, type(exc).__name__, str(exc)))
+
+    def _account(self, path):
+        # (Account, key του Tx_Id)· χωρίς IBAN/αριθμό λογαριασμού το key είναι το hash του αρχείου, με προειδοποίηση
+        key = account_key(path)
+        if key is None:
+            key = file_account_key(path)
+            with self._lock:
+                self._progress.warnings.append(
+                    f"{os.path.basename(path)}: no IBAN or account number in the header, so its transactions "
+                    "are not matched against other statements (overlapping exports may show twice)")
+        return source_account(path), key
+
+    def _publish(self, path, months):
+        """
+        Γράφει στο store (ένα import_transactions) τους μήνες {month: DataFrame} που έστειλε ο worker του path.
+        Τα Tx_Id ανά μήνα είναι ίδια με αυτά ανά αρχείο: οι ίδιες κινήσεις έχουν ίδια ημερομηνία, άρα ίδιο μήνα.
+        """
+        try:
+            if path not in self._accounts:
+                self._accounts[path] = self._account(path)
+            label, key = self._accounts[path]
+            df = pd.concat(months.values(), ignore_index=True).assign(Account=label)
+            df = compact_schema(df.assign(Tx_Id=transaction_ids(df, key)))
+            report = import_transactions(df, self.folder)
+        except Exception as e:
+            self._failed.add(path)
+            self._fail(os.path.basename(path), "import", e)
+            return
+        # Σε ξαναγραμμένο μήνα οι γραμμές που γράψαμε ήδη βγαίνουν "duplicate": δεν μετράνε δεύτερη φορά
+        already = sum(self._rows_imported.get((path, month), 0) for month in months)
+
+        with self._lock:
+            progress = self._progress
+            progress.report.new += report.new
+            progress.report.duplicate += report.duplicate - already
+            progress.report.months.extend(m for m in report.months if m not in progress.report.months)
+            progress.months.extend(m for m in months if m not in progress.months)
+            # Όταν όλες οι γραμμές υπήρχαν ήδη (π.χ. restart με τα ίδια statements) το store δεν άλλαξε: τίποτα για ξαναφόρτωμα
+            if report.months: progress.published += 1
+        for month, part in months.items():
+            self._rows_imported[(path, month)] = len(part)
+
+def start_ingest(paths, **kwargs):
+    """
+    Ξεκινάει την εισαγωγή των statements στο store σε background thread και επιστρέφει το IngestJob.
+    kwargs: folder, cache_dir, max_bytes, chunksize, workers (βλ. IngestJob).
+    """
+    return IngestJob(paths, **kwargs).start()
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+import numpy as np
+import pandas as pd
+from src.store import PROCESSED_DIR, list_months, load_month, month_fingerprint
+from src.cube import CUBE_KEYS, SAVINGS_CATEGORY
+from src.perf import timed, annotate
+
+# Προαιρετικό SQLite ledger: αντίγραφο του store (data/processed) σε έναν πίνακα με indexes,
+# ώστε τα aggregations / top-N του dashboard να γίνονται με SQL χωρίς να φορτώνεται όλο το ιστορικό.
+# Το store μένει η πηγή της αλήθειας· το ledger συγχρονίζεται ανά μήνα με βάση το month_fingerprint.
+# Στο ίδιο αρχείο ζουν και τα budgets / goals (transactional writes).
+# Ενεργοποίηση: CFO_LEDGER=1 στο περιβάλλον.
+LEDGER_FILE = "data/ledger.sqlite"
+LEDGER_ENABLED = os.environ.get("CFO_LEDGER", "") not in ("", "0")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id INTEGER NOT NULL,          -- Tx_Id (uint64) αποθηκευμένο ως signed int64
+    month TEXT NOT NULL,             -- 'YYYY-MM'
+    date TEXT NOT NULL,              -- 'YYYY-MM-DD'
+    account TEXT,
+    description TEXT,
+    comments TEXT,
+    amount_cents INTEGER NOT NULL,
+    category TEXT,
+    subcategory TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_month_category ON transactions (month, category);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE TABLE IF NOT EXISTS synced_months (month TEXT PRIMARY KEY, fingerprint TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS budgets (position INTEGER PRIMARY KEY, category TEXT NOT NULL UNIQUE, limit_eur REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS goals (position INTEGER PRIMARY KEY, name TEXT, target REAL, saved REAL);
+"""
+
+@contextmanager
+def connect(path=LEDGER_FILE):
+    """
+    Σύνδεση στο ledger (δημιουργείται αν δεν υπάρχει) που κλείνει στο τέλος του with.
+    Ένα "with conn:" μέσα σε αυτό είναι ένα transaction (commit ή rollback σε exception).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with closing(sqlite3.connect(path, timeout=30)) as conn:
+        # WAL: οι readers (άλλα sessions) δεν μπλοκάρουν όσο γίνεται sync
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        yield conn
+
+def _text(col):
+    return col.astype(object).where(col.notna(), None).tolist()
+
+def _month_rows(df, month):
+    ids = df['Tx_Id'].to_numpy(np.uint64).view(np.int64).tolist()
+    account = _text(df['Account']) if 'Account' in df.columns else [None] * len(df)
+    comments = _text(df['Comments']) if 'Comments' in df.columns else [None] * len(df)
+    return zip(
+        ids, [month] * len(df), df['Date'].dt.strftime('%Y-%m-%d').tolist(), account,
+        _text(df['Transaction Description']), comments, df['Amount_Cents'].tolist(),
+        _text(df['Category']), _text(df['Subcategory']),
+    )
+
+@timed()
+def sync_ledger(folder=PROCESSED_DIR, path=LEDGER_FILE):
+    """
+    Φέρνει το ledger στην κατάσταση του store: ξαναγράφονται μόνο οι μήνες που άλλαξε το fingerprint τους
+    (νέο import ή διόρθωση στον Editor), ένας-ένας σε δικό του transaction, και σβήνονται όσοι δεν υπάρχουν πια.
+    Επιστρέφει {"synced": [...], "dropped": [...]}.
+    """
+    fingerprints = {month: month_fingerprint(month, folder) for month in list_months(folder)}
+    with connect(path) as conn:
+        stored = dict(conn.execute("SELECT month, fingerprint FROM synced_months"))
+        stale = [m for m, fingerprint in fingerprints.items() if stored.get(m) != fingerprint]
+        dropped = sorted(set(stored) - set(fingerprints))
+
+        for month in stale:
+            df = load_month(month, folder=folder)
+            with conn:
+                conn.execute("DELETE FROM transactions WHERE month = ?", (month,))
+                conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _month_rows(df, month))
+                conn.execute("INSERT OR REPLACE INTO synced_months VALUES (?, ?)", (month, fingerprints[month]))
+        if dropped:
+            with conn:
+                conn.executemany("DELETE FROM transactions WHERE month = ?", [(m,) for m in dropped])
+                conn.executemany("DELETE FROM synced_months WHERE month = ?", [(m,) for m in dropped])
+    annotate(synced=len(stale), dropped=len(dropped))
+    return {"synced": stale, "dropped": dropped}
+
+def ledger_months(path=LEDGER_FILE):
+    """
+    Οι μήνες του ledger, πιο πρόσφατος πρώτος (από το index month/category, χωρίς scan του πίνακα).
+    """
+    with connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT month FROM transactions ORDER BY month DESC")]
+
+@timed()
+def ledger_cube(month=None, start=None, end=None, path=LEDGER_FILE):
+    """
+    Ο aggregate cube (βλ. src.cube.build_cube) υπολογισμένος με GROUP BY στη βάση: ίδιες στήλες,
+    οπότε check_budget / month_totals / τα γραφήματα του History δουλεύουν αμετάβλητα.
+    month ή/και [start, end) σε 'YYYY-MM-DD' περιορίζουν τις γραμμές μέσω των indexes.
+    """
+    where, params = ["amount_cents != 0", "category IS NOT NULL", "subcategory IS NOT NULL"], []
+    if month is not None:
+        where.append("month = ?"); params.append(str(month))
+    if start is not None:
+        where.append("date >= ?"); params.append(str(start))
+    if end is not None:
+        where.append("date < ?"); params.append(str(end))
+    sql = f"""
+        SELECT month AS Month, category AS Category, subcategory AS Subcategory,
+               CASE WHEN amount_cents < 0 THEN 'out' ELSE 'in' END AS Flow,
+               SUM(amount_cents) AS Cents, COUNT(*) AS Count
+        FROM transactions WHERE {' AND '.join(where)}
+        GROUP BY month, category, subcategory, Flow
+    """
+    with connect(path) as conn:
+        cube = pd.read_sql_query(sql, conn, params=params)
+    annotate(rows_out=len(cube))
+    return cube[CUBE_KEYS + ['Cents', 'Count']].astype({'Cents': 'int64', 'Count': 'int64'})
+
+@timed()
+def ledger_top_expenses(month, n=10, path=LEDGER_FILE):
+    """
+    Τα n μεγαλύτερα πραγματικά έξοδα του μήνα (ORDER BY ... LIMIT στη βάση), με τις στήλες του get_top_expenses.
+    """
+    sql = """
+        SELECT date AS Date, subcategory AS Subcategory, comments AS Comments, amount_cents / 100.0 AS Amount
+        FROM transactions
+        WHERE month = ? AND amount_cents < 0 AND category != ?
+        ORDER BY amount_cents ASC LIMIT ?
+    """
+    with connect(path) as conn:
+        top = pd.read_sql_query(sql, conn, params=(str(month), SAVINGS_CATEGORY, n))
+    top['Date'] = pd.to_datetime(top['Date'])
+    return top
+
+# --- Budgets & Goals ---
+def read_budgets(path=LEDGER_FILE):
+    """
+    Τα όρια ανά κατηγορία ({category: limit}), με τη σειρά που αποθηκεύτηκαν. Κενό dict αν δεν έχουν οριστεί.
+    """
+    with connect(path) as conn:
+        return dict(conn.execute("SELECT category, limit_eur FROM budgets ORDER BY position"))
+
+def save_budgets(limits, path=LEDGER_FILE):
+    # Όλα ή τίποτα: ένα transaction για delete + insert
+    with connect(path) as conn, conn:
+        conn.execute("DELETE FROM budgets")
+        conn.executemany("INSERT INTO budgets VALUES (?, ?, ?)", [(i, c, float(v)) for i, (c, v) in enumerate(limits.items())])
+    return limits
+
+def read_goals(path=LEDGER_FILE):
+    """
+    Οι στόχοι αποταμίευσης ως λίστα από dicts (name, target, saved), όπως το savings_goals JSON.
+    """
+    with connect(path) as conn:
+        rows = conn.execute("SELECT name, target, saved FROM goals ORDER BY position").fetchall()
+    return [{"name": name, "target": target, "saved": saved} for name, target, saved in rows]
+
+def save_goals(goals, path=LEDGER_FILE):
+    with connect(path) as conn, conn:
+        conn.execute("DELETE FROM goals")
+        conn.executemany("INSERT INTO goals VALUES (?, ?, ?, ?)",
+                         [(i, g.get("name"), g.get("target"), g.get("saved")) for i, g in enumerate(goals)])
+    return goals
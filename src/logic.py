@@ -1,3 +1,9 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+ALLOCATION_RULES = ['fixed', 'priority', 'deadline']
+
 def calculate_buckets(monthly_savings):
     """
     Αυτή η συνάρτηση παίρνει το ποσό που αποταμίευσες αυτόν τον μήνα
@@ -45,4 +51,85 @@ def calculate_buckets(monthly_savings):
             "percent": new_trip_total / trip_goal,
             "added_this_month": added_to_trip
         }
-    }
\ No newline at end of file
+    }
+
+def allocate_goals(goals, monthly_savings, rule='fixed', horizon=60):
+    """
+    Γενίκευση του calculate_buckets για οποιοδήποτε πλήθος στόχων.
+    goals: λίστα από dicts όπως το goals_config ({name, target, saved}) με προαιρετικά:
+      'share' (για rule='fixed', αλλιώς ίσα μερίδια), 'priority' (για rule='priority', αλλιώς η σειρά της λίστας),
+      'deadline' 'YYYY-MM' (για rule='deadline', αλλιώς το τέλος του ορίζοντα).
+    monthly_savings: ποσό ανά μήνα (αριθμός ή λίστα μήκους horizon). Τα αρνητικά μετράνε ως 0.
+    Στα fixed/deadline, όταν ένας στόχος γεμίσει το μερίδιό του μοιράζεται στους υπόλοιπους (ανάλογα με τα βάρη τους).
+    Όλη η προσομοίωση (στόχοι x μήνες) γίνεται με πράξεις πινάκων, χωρίς loops ανά στόχο.
+    Επιστρέφει (summary DataFrame ανά στόχο, balances DataFrame μήνες x στόχοι).
+    """
+    if rule not in ALLOCATION_RULES:
+        raise ValueError(f"Unknown allocation rule: {rule}")
+    goals_df = pd.DataFrame(goals)
+    if goals_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    target = goals_df['target'].to_numpy(dtype=float)
+    saved = goals_df['saved'].to_numpy(dtype=float)
+    remaining = np.maximum(target - saved, 0.0)
+
+    # Αν η αποταμίευση είναι αρνητική (μπήκες μέσα), δεν προσθέτουμε τίποτα (0)
+    savings = np.broadcast_to(np.maximum(np.asarray(monthly_savings, dtype=float), 0.0), (horizon,))
+    cum_savings = np.cumsum(savings)                       # (μήνες,)
+
+    if rule == 'priority':
+        # Waterfall: κάθε στόχος παίρνει ό,τι περισσεύει αφού γεμίσουν όσοι είναι πριν από αυτόν
+        priority = goals_df['priority'].to_numpy(dtype=float) if 'priority' in goals_df else np.arange(len(goals_df))
+        order = np.argsort(priority, kind='stable')
+        needed_before = np.empty_like(remaining)
+        needed_before[order] = np.cumsum(remaining[order]) - remaining[order]
+        allocated = np.clip(cum_savings[None, :] - needed_before[:, None], 0.0, remaining[:, None])
+    else:
+        if rule == 'fixed':
+            weights = goals_df['share'].fillna(0).to_numpy(dtype=float) if 'share' in goals_df else np.ones(len(goals_df))
+        else:
+            # Deadline-weighted: βάρος = ο μηνιαίος ρυθμός που χρειάζεται για να πιαστεί η προθεσμία
+            months_left = np.full(len(goals_df), float(horizon))
+            if 'deadline' in goals_df:
+                deadline = pd.to_datetime(goals_df['deadline'], errors='coerce')
+                today = pd.Timestamp(datetime.now().date())
+                diff = (deadline.dt.year - today.year) * 12 + (deadline.dt.month - today.month)
+                months_left = np.where(diff.notna(), np.maximum(diff.fillna(1), 1), months_left)
+            weights = remaining / months_left
+        weights = weights / weights.sum() if weights.sum() > 0 else np.zeros_like(weights)
+        # Κάθε ενεργός στόχος έχει πάρει weight * level, για κοινό level: ο στόχος γεμίζει όταν level = remaining / weight.
+        # Ταξινομημένα κατά αυτό το σημείο, με σωρευτικά αθροίσματα βρίσκουμε πόση αποταμίευση χρειάζεται ώσπου να γεμίσει
+        # ο καθένας· μετά από κάθε γέμισμα το level ανεβαίνει πιο γρήγορα (το μερίδιό του πάει στους υπόλοιπους).
+        with np.errstate(divide='ignore'):
+            full_level = np.where(weights > 0, remaining / np.where(weights > 0, weights, 1.0), np.inf)
+        order = np.argsort(full_level, kind='stable')
+        n_active = int(np.isfinite(full_level).sum())     # Στόχοι με βάρος 0 δεν παίρνουν ποτέ τίποτα
+        level_at = full_level[order][:n_active]
+        weight_left = np.cumsum(weights[order][::-1])[::-1][:n_active]       # Σ βαρών όσων δεν έχουν γεμίσει ακόμα
+        filled_before = np.cumsum(remaining[order])[:n_active] - remaining[order][:n_active]
+        needed_at = filled_before + level_at * weight_left                  # Σωρευτική αποταμίευση ώσπου να γεμίσει ο καθένας
+
+        # Για κάθε μήνα: πόσοι έχουν γεμίσει και το level από το τελευταίο γέμισμα και μετά (όλοι γεμάτοι -> σταθερό level)
+        n_full = np.searchsorted(needed_at, cum_savings, side='right')       # (μήνες,)
+        base_level = np.append(0.0, level_at)[n_full]
+        base_needed = np.append(0.0, needed_at)[n_full]
+        level = base_level + (cum_savings - base_needed) / np.append(weight_left, np.inf)[n_full]
+        allocated = np.where(level[None, :] >= full_level[:, None], remaining[:, None],
+                             np.minimum(weights[:, None] * level[None, :], remaining[:, None]))
+
+    balances = saved[:, None] + allocated                  # (στόχοι, μήνες)
+    done = balances >= target[:, None]
+    completion = np.where(saved >= target, 0, np.where(done.any(axis=1), done.argmax(axis=1) + 1, -1))
+
+    today = pd.Timestamp(datetime.now().date())
+    summary = pd.DataFrame({
+        "Goal": goals_df['name'],
+        "Target": target,
+        "Saved": saved,
+        "Monthly": allocated[:, 0],
+        "Completion Month": np.where(completion >= 0, completion, np.nan),
+        "Completion Date": [today + pd.DateOffset(months=int(m)) if m >= 0 else pd.NaT for m in completion],
+    })
+    balances_df = pd.DataFrame(balances.T, columns=goals_df['name'], index=pd.RangeIndex(1, horizon + 1, name='Month'))
+    return summary, balances_df
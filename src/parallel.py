@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+@dataclass
+class ReadResult:
+    """
+    Αποτέλεσμα παράλληλου διαβάσματος: frames με τη σειρά εισόδου και τα σφάλματα ανά αρχείο.
+    """
+    frames: dict = field(default_factory=dict)   # key -> DataFrame
+    errors: dict = field(default_factory=dict)   # key -> μήνυμα σφάλματος
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def read_files(keys, reader, workers=None, use_processes=False, on_done=None):
+    """
+    Καλεί reader(key) για κάθε key (path, μήνας κτλ.) σε thread pool,
+    ή σε process pool όταν η δουλειά είναι CPU-bound (π.χ. κατηγοριοποίηση).
+    Η σειρά των αποτελεσμάτων είναι πάντα ίδια με τη σειρά των keys.
+    on_done(key, frame, error) καλείται στο thread του caller μόλις τελειώσει κάθε key (π.χ. για progress bar).
+    """
+    keys = list(keys)
+    result = ReadResult()
+    if not keys:
+        return result
+
+    workers = min(workers or DEFAULT_WORKERS, len(keys))
+    outcomes = {}
+    if workers == 1:
+        for key in keys:
+            outcomes[key] = _call(reader, key)
+            if on_done: on_done(key, *outcomes[key])
+    else:
+        pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            futures = {pool.submit(_call, reader, key): key for key in keys}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    outcomes[key] = future.result()
+                except Exception as e:   # Π.χ. worker process που πέθανε (BrokenProcessPool)
+                    outcomes[key] = None, f"{type(e).__name__}: {e}"
+                if on_done: on_done(key, *outcomes[key])
+
+    for key in keys:
+        frame, error = outcomes[key]
+        if error is None:
+            result.frames[key] = frame
+        else:
+            result.errors[key] = error
+    return result
+
+def _call(reader, key):
+    # Top-level συνάρτηση ώστε να γίνεται pickle για το process pool
+    try:
+        return reader(key), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
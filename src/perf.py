@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import functools
+import threading
+from datetime import datetime
+
+# Span timers + counters για να φαίνεται πού πάει ο χρόνος ενός rerun (ή ενός batch job).
+# Απενεργοποιημένα (default) κοστίζουν ένα if: το span() επιστρέφει ένα κοινό no-op αντικείμενο.
+# Ενεργοποίηση: perf.enable() / start_trace(enabled=...) ανά thread, ή CFO_PERF=1 στο περιβάλλον για όλα.
+TRACE_DIR = "data/traces"
+MAX_TRACE_FILES = 200
+
+_DEFAULT_ENABLED = os.environ.get("CFO_PERF", "") not in ("", "0")
+_local = threading.local()   # Κάθε session του Streamlit / κάθε thread έχει το δικό του trace και το δικό του on/off
+
+def enable(on=True):
+    """
+    Tracing on/off μόνο για το τρέχον thread: το toggle ενός session δεν αγγίζει τα άλλα sessions ή το background ingest.
+    """
+    _local.enabled = bool(on)
+
+def is_enabled():
+    return getattr(_local, "enabled", _DEFAULT_ENABLED)
+
+class Trace:
+    """
+    Όλα τα spans και οι counters ενός rerun. Γράφεται σε ένα JSONL αρχείο στο end_trace().
+    """
+    def __init__(self, label, trace_dir=TRACE_DIR):
+        self.label = label
+        self.trace_dir = trace_dir
+        self.started = datetime.now()
+        self.t0 = time.perf_counter()
+        self.total_ms = None
+        self.spans = []       # Records με τη σειρά που έκλεισαν
+        self.stack = []       # Ανοιχτά spans (για nesting και annotate)
+        self.counters = {}
+
+    def records(self):
+        return sorted(self.spans, key=lambda r: r["start_ms"])
+
+class _NoSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **fields): pass
+
+_NO_SPAN = _NoSpan()
+
+class Span:
+    def __init__(self, name, fields, root=False):
+        self.name = name
+        self.fields = fields
+        self.root = root
+        self.owns_trace = False
+
+    def __enter__(self):
+        trace = getattr(_local, "trace", None)
+        if trace is None:
+            if not self.root:
+                # Εκτός trace (π.χ. σε worker thread): δεν καταγράφεται
+                self.trace = None
+                return self
+            trace = start_trace(self.name)
+            self.owns_trace = True
+        self.trace = trace
+        self.depth = len(trace.stack)
+        trace.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        trace = self.trace
+        if trace is None:
+            return False
+        trace.stack.pop()
+        if exc_type is not None:
+            self.fields["error"] = f"{exc_type.__name__}: {exc}"
+        trace.spans.append({
+            "name": self.name,
+            "depth": self.depth,
+            "start_ms": (self.start - trace.t0) * 1000,
+            "ms": (end - self.start) * 1000,
+            **self.fields,
+        })
+        if self.owns_trace:
+            end_trace()
+        return False
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+def span(name, **fields):
+    """
+    with perf.span('load_data', rows_in=n) as s: ...; s.set(rows_out=len(df), cache='hit')
+    Καταγράφεται μόνο μέσα σε ανοιχτό trace.
+    """
+    if not is_enabled():
+        return _NO_SPAN
+    return Span(name, fields)
+
+def trace(label, **fields):
+    """
+    with perf.trace('nightly-import'): ...  -> ένα trace (JSONL) για ό,τι τρέχει μέσα,
+    ή απλό span αν υπάρχει ήδη ανοιχτό trace. Έτσι και τα batch jobs βγάζουν τα ίδια traces.
+    """
+    if not is_enabled():
+        return _NO_SPAN
+    return Span(label, fields, root=True)
+
+def _rows(obj):
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+    if hasattr(obj, "columns") or hasattr(obj, "dtype"):
+        return len(obj)
+    return None
+
+def timed(name=None, root=False):
+    """
+    Decorator: span γύρω από τη συνάρτηση, με rows_in (πρώτο όρισμα) και rows_out (αποτέλεσμα) όταν είναι frames.
+    root=True: ξεκινάει δικό του trace αν δεν υπάρχει ανοιχτό (π.χ. ένα fragment που ξανατρέχει μόνο του).
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+            fields = {}
+            rows_in = _rows(args[0]) if args else None
+            if rows_in is not None: fields["rows_in"] = rows_in
+            with Span(label, fields, root) as s:
+                result = fn(*args, **kwargs)
+                rows_out = _rows(result)
+                if rows_out is not None: s.set(rows_out=rows_out)
+            return result
+        return wrapper
+    return decorate
+
+def annotate(**fields):
+    """
+    Προσθέτει πεδία (π.χ. cache='hit', rows_in=...) στο πιο εσωτερικό ανοιχτό span.
+    """
+    if not is_enabled():
+        return
+    trace = getattr(_local, "trace", None)
+    if trace is not None and trace.stack:
+        trace.stack[-1].set(**fields)
+
+def count(name, n=1):
+    if not is_enabled():
+        return
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + n
+
+def start_trace(label="rerun", trace_dir=TRACE_DIR, enabled=None):
+    """
+    Ξεκινάει ένα trace για το τρέχον thread (π.χ. στην αρχή του app.py). Ένα ημιτελές trace πετιέται.
+    enabled: on/off για το thread (βλ. enable)· None = ό,τι ισχύει ήδη.
+    """
+    if enabled is not None:
+        enable(enabled)
+    if not is_enabled():
+        _local.trace = None
+        return None
+    _local.trace = Trace(label, trace_dir)
+    return _local.trace
+
+def end_trace():
+    """
+    Κλείνει το trace του thread και το γράφει σε {trace_dir}/{timestamp}-{label}.jsonl:
+    μία γραμμή "run" (σύνολο + counters) και μία γραμμή ανά span.
+    """
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is None:
+        return None
+    trace.total_ms = (time.perf_counter() - trace.t0) * 1000
+    _local.last = trace
+    if trace.trace_dir:
+        _write_trace(trace)
+    return trace
+
+def last_trace():
+    return getattr(_local, "last", None)
+
+def trace_rows(trace):
+    """
+    Τα spans ενός trace ως γραμμές πίνακα (με εσοχή ανά επίπεδο), π.χ. για st.dataframe.
+    """
+    rows = []
+    for record in trace.records():
+        fields = {k: v for k, v in record.items() if k not in ("name", "depth", "start_ms", "ms")}
+        rows.append({"Stage": "· " * record["depth"] + record["name"], "ms": round(record["ms"], 1), **fields})
+    return rows
+
+def _write_trace(trace):
+    os.makedirs(trace.trace_dir, exist_ok=True)
+    safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in trace.label)
+    path = os.path.join(trace.trace_dir, f"{trace.started.strftime('%Y%m%d-%H%M%S-%f')}-{safe_label}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        run = {"type": "run", "label": trace.label, "started": trace.started.isoformat(), "total_ms": trace.total_ms, "counters": trace.counters}
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+        for record in trace.records():
+            f.write(json.dumps({"type": "span", **record}, ensure_ascii=False, default=str) + "\n")
+
+    # Κρατάμε μόνο τα τελευταία MAX_TRACE_FILES
+    files = sorted(f for f in os.listdir(trace.trace_dir) if f.endswith(".jsonl"))
+    for old in files[:-MAX_TRACE_FILES]:
+        os.remove(os.path.join(trace.trace_dir, old))
+    return path
@@ -0,0 +1,389 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+from dataclasses import dataclass, field
+from src.etl import RAW_FILE, compact_schema, source_account, account_key, file_account_key, transaction_ids
+from src.perf import timed, annotate
+
+PROCESSED_DIR = "data/processed"
+MANIFEST_FILE = "manifest.json"
+TX_INDEX_FILE = "tx_index.parquet"
+OVERRIDES_JOURNAL = "overrides.jsonl"      # Append-only: μία γραμμή ανά χειροκίνητη αλλαγή κατηγορίας
+OVERRIDES_SNAPSHOT = "overrides.parquet"   # Το compacted journal: η τελευταία αλλαγή ανά Tx_Id
+COMPACT_JOURNAL_BYTES = 256 * 1024
+STORE_VERSION = 3   # 2: compact schema (Amount_Cents, period Month, categoricals), 3: Tx_Id ανά γραμμή
+# Ένας writer τη φορά για όλο το process (imports από πολλά sessions/threads): read-modify-write σε index και manifest
+_store_lock = threading.RLock()
+
+def month_file(month):
+    return f"corrected_{month}.parquet"
+
+def atomic_write(path, write):
+    """
+    Γράφει πρώτα σε προσωρινό αρχείο και μετά κάνει os.replace,
+    ώστε ένα μισογραμμένο αρχείο να μη φαίνεται ποτέ στους readers.
+    Μοναδικό προσωρινό αρχείο ανά writer, στον ίδιο φάκελο (το os.replace μένει atomic).
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+LEGACY_ACCOUNT = "legacy"   # Account key των παλιών partitions όταν δεν υπάρχει πια το export τους
+
+def _typed(df):
+    # Τα Tx_Id τα βάζει ο caller (χρειάζονται τον λογαριασμό του export, βλ. etl.transaction_ids)
+    if 'Tx_Id' not in df.columns:
+        raise ValueError("Transactions need a Tx_Id column before they are stored (see etl.transaction_ids)")
+    return compact_schema(df).reset_index(drop=True)
+
+def _legacy_frame(df):
+    # Τα partitions πριν από τα πολλαπλά statements προέρχονταν όλα από το ένα export:
+    # ίδιο Account και ίδια Tx_Id με ένα νέο import του ίδιου export
+    # (πρώτα το compact schema: τα ids χρειάζονται Amount_Cents, τα παλιά frames έχουν float Amount)
+    df = compact_schema(df)
+    exists = os.path.exists(RAW_FILE)
+    if 'Account' not in df.columns:
+        df['Account'] = source_account(RAW_FILE) if exists else ''
+    if 'Tx_Id' not in df.columns:
+        key = (account_key(RAW_FILE) or file_account_key(RAW_FILE)) if exists else LEGACY_ACCOUNT
+        df['Tx_Id'] = transaction_ids(df, key)
+    return df
+
+def read_manifest(folder=PROCESSED_DIR):
+    """
+    Το manifest κρατάει ανά μήνα: αρχείο, γραμμές, εύρος ημερομηνιών και πότε γράφτηκε.
+    Τα παλιά corrected_{month}.csv, και τα Parquet παλιότερης έκδοσης, μετατρέπονται αυτόματα την πρώτη φορά.
+    """
+    path = os.path.join(folder, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding='utf-8') as f: manifest = json.load(f)
+    else:
+        manifest = {"version": STORE_VERSION, "months": {}}
+
+    legacy = [f for f in os.listdir(folder) if f.startswith('corrected_') and f.endswith('.csv')] if os.path.exists(folder) else []
+    legacy = [f for f in legacy if f[len('corrected_'):-len('.csv')] not in manifest["months"]]
+    if manifest.get("version", 1) < STORE_VERSION or legacy:
+        with _store_lock:
+            return _migrate(folder)
+    return manifest
+
+def _migrate(folder):
+    # Κάτω από το _store_lock: ξαναδιαβάζει το manifest, μπορεί να το μετέτρεψε ήδη άλλο thread
+    path = os.path.join(folder, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding='utf-8') as f: manifest = json.load(f)
+    else:
+        manifest = {"version": STORE_VERSION, "months": {}}
+
+    if manifest.get("version", 1) < STORE_VERSION:
+        manifest["version"] = STORE_VERSION
+        for month in list(manifest["months"]):
+            df = _legacy_frame(load_month(month, folder=folder, overlay=False))
+            manifest = save_month(df, month, folder, manifest)
+        _write_manifest(manifest, folder)
+
+    legacy = [f for f in os.listdir(folder) if f.startswith('corrected_') and f.endswith('.csv')]
+    for filename in legacy:
+        month = filename[len('corrected_'):-len('.csv')]
+        if month not in manifest["months"]:
+            legacy_df = _legacy_frame(pd.read_csv(os.path.join(folder, filename)))
+            manifest = save_month(legacy_df, month, folder, manifest)
+    return manifest
+
+def _write_manifest(manifest, folder):
+    path = os.path.join(folder, MANIFEST_FILE)
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding='utf-8') as f: json.dump(manifest, f, ensure_ascii=False, indent=2)
+    atomic_write(path, write)
+
+def list_months(folder=PROCESSED_DIR):
+    return sorted(read_manifest(folder)["months"])
+
+def has_month(month, folder=PROCESSED_DIR):
+    return month in read_manifest(folder)["months"]
+
+def month_fingerprint(month, folder=PROCESSED_DIR):
+    """
+    Φθηνό "αποτύπωμα" του partition (size + mtime) και των overrides του: αλλάζει σε κάθε save_month και σε κάθε διόρθωση.
+    """
+    file_stat = os.stat(os.path.join(folder, month_file(month)))
+    edits, last_seq = override_versions(folder).get(month, (0, 0))
+    return f"{month}:{file_stat.st_size}:{file_stat.st_mtime_ns}:{edits}:{last_seq}"
+
+@timed()
+def save_month(df, month, folder=PROCESSED_DIR, manifest=None):
+    """
+    Αποθηκεύει (atomic) το partition ενός μήνα σε Parquet και ενημερώνει το manifest.
+    """
+    os.makedirs(folder, exist_ok=True)
+    typed = _typed(df)
+    with _store_lock:
+        if manifest is None: manifest = read_manifest(folder)
+        path = os.path.join(folder, month_file(month))
+        atomic_write(path, lambda tmp_path: typed.to_parquet(tmp_path, index=False))
+
+        manifest["months"][month] = {
+            "file": month_file(month),
+            "rows": len(typed),
+            "min_date": typed['Date'].min().isoformat() if not typed.empty else None,
+            "max_date": typed['Date'].max().isoformat() if not typed.empty else None,
+            "updated": datetime.now().isoformat(timespec='seconds'),
+        }
+        _write_manifest(manifest, folder)
+    return manifest
+
+@timed()
+def load_month(month, columns=None, folder=PROCESSED_DIR, overlay=True):
+    """
+    Διαβάζει μόνο τον μήνα (και τις στήλες) που ζητήθηκαν.
+    overlay=True: με τις χειροκίνητες διορθώσεις του Editor (βλ. apply_overrides) από πάνω.
+    """
+    needs_overlay = overlay and (columns is None or 'Category' in columns or 'Subcategory' in columns)
+    read_columns = columns
+    if needs_overlay and columns is not None and 'Tx_Id' not in columns:
+        read_columns = list(columns) + ['Tx_Id']
+    df = pd.read_parquet(os.path.join(folder, month_file(month)), columns=read_columns)
+    if needs_overlay:
+        df = apply_overrides(df, month, folder)
+    return df[columns] if read_columns is not columns else df
+
+def load_months(months=None, columns=None, folder=PROCESSED_DIR):
+    """
+    Φορτώνει πολλούς μήνες (όλους αν months=None) σε χρονολογική σειρά.
+    """
+    available = list_months(folder)
+    months = available if months is None else [m for m in sorted(months) if m in available]
+    if not months:
+        return pd.DataFrame()
+    history = pd.concat([load_month(m, columns, folder) for m in months], ignore_index=True)
+    # Το concat μηνών με διαφορετικές κατηγορίες χάνει το categorical dtype
+    return compact_schema(history)
+
+# --- Identity index: τα Tx_Id όλων των γραμμών του store, ταξινομημένα (binary search ανά νέα γραμμή) ---
+@dataclass
+class ImportReport:
+    """
+    Αποτέλεσμα ενός import: πόσες γραμμές ήταν νέες, πόσες υπήρχαν ήδη και ποιοι μήνες ξαναγράφτηκαν.
+    """
+    new: int = 0
+    duplicate: int = 0
+    months: list = field(default_factory=list)
+
+def _write_index(ids, folder):
+    path = os.path.join(folder, TX_INDEX_FILE)
+    atomic_write(path, lambda tmp_path: pd.DataFrame({'Tx_Id': ids}).to_parquet(tmp_path, index=False))
+
+def read_index(folder=PROCESSED_DIR, manifest=None):
+    """
+    Τα ταξινομημένα Tx_Id του store. Αν το index λείπει ή δεν έχει όσες γραμμές λέει το manifest
+    (π.χ. διακοπή στη μέση ενός import), ξαναχτίζεται από τα partitions.
+    """
+    if manifest is None: manifest = read_manifest(folder)
+    expected = sum(info["rows"] for info in manifest["months"].values())
+    path = os.path.join(folder, TX_INDEX_FILE)
+    if os.path.exists(path):
+        ids = pd.read_parquet(path)['Tx_Id'].to_numpy(dtype=np.uint64)
+        if len(ids) == expected:
+            return ids
+
+    parts = [load_month(m, ['Tx_Id'], folder)['Tx_Id'].to_numpy(dtype=np.uint64) for m in manifest["months"]]
+    ids = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64)
+    if manifest["months"]: _write_index(ids, folder)
+    return ids
+
+def _contains(sorted_ids, ids):
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[pos] == ids
+
+@timed()
+def import_transactions(df, folder=PROCESSED_DIR):
+    """
+    Βάζει στο store μόνο τις συναλλαγές που δεν υπάρχουν ήδη (ίδιο Tx_Id, βλ. etl.transaction_ids).
+    Κάθε γραμμή ελέγχεται στο index με binary search και ξαναγράφονται μόνο οι μήνες με νέες κινήσεις:
+    οι γραμμές που υπήρχαν (με τις διορθώσεις του Editor) μένουν ως έχουν. Επιστρέφει ImportReport.
+    Ένα import τη φορά (_store_lock): δύο ταυτόχρονα θα έβλεπαν το ίδιο index και θα έγραφαν τις ίδιες γραμμές δύο φορές.
+    """
+    if 'Tx_Id' not in df.columns:
+        raise ValueError("import_transactions needs a Tx_Id column (see etl.transaction_ids)")
+    os.makedirs(folder, exist_ok=True)
+    with _store_lock:
+        report = _import(df, folder)
+    annotate(rows_new=report.new, rows_duplicate=report.duplicate, months_written=len(report.months))
+    return report
+
+def _import(df, folder):
+    manifest = read_manifest(folder)
+    index = read_index(folder, manifest)
+
+    ids = df['Tx_Id'].to_numpy(dtype=np.uint64)
+    fresh = ~_contains(index, ids) & ~pd.Series(ids).duplicated().to_numpy()
+    report = ImportReport(new=int(fresh.sum()), duplicate=int(len(df) - fresh.sum()))
+
+    for month, part in df[fresh].groupby('Month', sort=True, observed=True):
+        month = str(month)
+        if month in manifest["months"]:
+            part = pd.concat([load_month(month, folder=folder, overlay=False), part], ignore_index=True)
+        manifest = save_month(part, month, folder, manifest)
+        report.months.append(month)
+
+    # Το index γράφεται τελευταίο: αν κάτι διακοπεί πριν, το read_index το ξαναχτίζει
+    if report.new:
+        new_ids = np.sort(ids[fresh])
+        _write_index(np.insert(index, np.searchsorted(index, new_ids), new_ids), folder)
+    return report
+
+# --- Overrides: οι αλλαγές κατηγορίας του Editor, ανά Tx_Id, πάνω από τα partitions ---
+_journal_lock = threading.Lock()
+_compact_lock = threading.Lock()
+_OVERRIDES = {}   # folder -> (signature των αρχείων, τελευταία αλλαγή ανά Tx_Id, versions ανά μήνα)
+
+def _file_signature(path):
+    try:
+        file_stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (file_stat.st_size, file_stat.st_mtime_ns)
+
+def _parse_journal(text):
+    records = []
+    for line in text.splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue  # Μισογραμμένη γραμμή (διακοπή στη μέση ενός append)
+    return pd.DataFrame({
+        'Tx_Id': np.array([r["tx_id"] for r in records], dtype=np.uint64),
+        'Month': [r["month"] for r in records],
+        'Category': [r["category"] for r in records],
+        'Subcategory': [r["subcategory"] for r in records],
+        'Seq': np.array([r["seq"] for r in records], dtype=np.int64),
+    })
+
+def _latest(overrides):
+    # Για κάθε Tx_Id μετράει μόνο η πιο πρόσφατη αλλαγή
+    return overrides.sort_values('Seq', kind='stable').drop_duplicates('Tx_Id', keep='last').reset_index(drop=True)
+
+def _load_overrides(folder):
+    # Ξαναδιαβάζονται μόνο όταν αλλάξει κάποιο από τα δύο αρχεία
+    journal_path = os.path.join(folder, OVERRIDES_JOURNAL)
+    snapshot_path = os.path.join(folder, OVERRIDES_SNAPSHOT)
+    signature = (_file_signature(journal_path), _file_signature(snapshot_path))
+    cached = _OVERRIDES.get(folder)
+    if cached is not None and cached[0] == signature:
+        return cached
+
+    parts = []
+    if signature[1] is not None:
+        parts.append(pd.read_parquet(snapshot_path))
+    if signature[0] is not None:
+        with open(journal_path, "r", encoding='utf-8') as f: parts.append(_parse_journal(f.read()))
+    overrides = _latest(pd.concat(parts, ignore_index=True)) if parts else _parse_journal("")
+    grouped = overrides.groupby('Month')['Seq'].agg(['size', 'max'])
+    versions = {month: (int(size), int(last)) for month, size, last in zip(grouped.index, grouped['size'], grouped['max'])}
+    _OVERRIDES[folder] = (signature, overrides, versions)
+    return _OVERRIDES[folder]
+
+def read_overrides(folder=PROCESSED_DIR):
+    """
+    Όλες οι χειροκίνητες αλλαγές (snapshot + journal), η τελευταία ανά Tx_Id.
+    """
+    return _load_overrides(folder)[1]
+
+def override_versions(folder=PROCESSED_DIR):
+    """
+    {month: (πλήθος διορθωμένων γραμμών, seq της τελευταίας αλλαγής)}: ίδιο πριν και μετά το compaction.
+    """
+    return _load_overrides(folder)[2]
+
+def apply_overrides(df, month, folder=PROCESSED_DIR):
+    """
+    Category/Subcategory των γραμμών του μήνα που διορθώθηκαν στον Editor (ταίριασμα με Tx_Id).
+    """
+    overrides = read_overrides(folder)
+    overrides = overrides[overrides['Month'] == month]
+    if overrides.empty or 'Tx_Id' not in df.columns:
+        return df
+    pos = pd.Index(overrides['Tx_Id']).get_indexer(df['Tx_Id'])
+    hit = pos >= 0
+    if not hit.any():
+        return df
+
+    df = df.copy()
+    for col in ('Category', 'Subcategory'):
+        if col in df.columns:
+            values = df[col].astype(object).to_numpy(copy=True)
+            values[hit] = overrides[col].to_numpy(dtype=object)[pos[hit]]
+            df[col] = values
+    return compact_schema(df)
+
+@timed()
+def append_overrides(changes, month, folder=PROCESSED_DIR):
+    """
+    Καταγράφει αλλαγές κατηγορίας (DataFrame με Tx_Id, Category, Subcategory, μόνο οι γραμμές που άλλαξαν)
+    με append στο journal: O(αλλαγές) σε χρόνο και I/O, κανένα partition δεν ξαναγράφεται.
+    Όταν το journal μεγαλώσει, γίνεται compaction σε background thread.
+    """
+    if changes.empty:
+        return 0
+    os.makedirs(folder, exist_ok=True)
+    seq = time.time_ns()
+    lines = [
+        json.dumps({"tx_id": int(tx_id), "month": month, "category": category, "subcategory": subcategory, "seq": seq}, ensure_ascii=False)
+        for tx_id, category, subcategory in zip(changes['Tx_Id'], changes['Category'].astype(str), changes['Subcategory'].astype(str))
+    ]
+    path = os.path.join(folder, OVERRIDES_JOURNAL)
+    with _journal_lock:
+        with open(path, "a+b") as f:
+            # Μισογραμμένη τελευταία γραμμή (διακοπή σε προηγούμενο append): οι νέες ξεκινούν σε δική τους γραμμή
+            torn = False
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            f.write((("\n" if torn else "") + "\n".join(lines) + "\n").encode('utf-8'))
+        journal_bytes = os.path.getsize(path)
+    if journal_bytes > COMPACT_JOURNAL_BYTES:
+        threading.Thread(target=compact_overrides, args=(folder,), daemon=True).start()
+    annotate(edits=len(lines))
+    return len(lines)
+
+def compact_overrides(folder=PROCESSED_DIR):
+    """
+    Ενώνει το journal στο snapshot (μία γραμμή ανά Tx_Id) και κρατάει στο journal μόνο ό,τι γράφτηκε στο μεταξύ.
+    Οι readers βλέπουν πάντα ίδιο αποτέλεσμα: στο ενδιάμεσο μια αλλαγή μπορεί να υπάρχει και στα δύο αρχεία.
+    """
+    if not _compact_lock.acquire(blocking=False):
+        return False  # Τρέχει ήδη
+    try:
+        journal_path = os.path.join(folder, OVERRIDES_JOURNAL)
+        snapshot_path = os.path.join(folder, OVERRIDES_SNAPSHOT)
+        if not os.path.exists(journal_path):
+            return False
+        with _journal_lock:
+            with open(journal_path, "rb") as f: compacted = f.read()
+        parts = [_parse_journal(compacted.decode('utf-8'))]
+        if os.path.exists(snapshot_path):
+            parts.insert(0, pd.read_parquet(snapshot_path))
+        snapshot = _latest(pd.concat(parts, ignore_index=True))
+        atomic_write(snapshot_path, lambda tmp_path: snapshot.to_parquet(tmp_path, index=False))
+
+        with _journal_lock:
+            with open(journal_path, "rb") as f: journal = f.read()
+            tail = journal[len(compacted):] if journal.startswith(compacted) else journal
+            def write(tmp_path):
+                with open(tmp_path, "wb") as f: f.write(tail)
+            atomic_write(journal_path, write)
+        return True
+    finally:
+        _compact_lock.release()
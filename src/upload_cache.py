@@ -0,0 +1,143 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import hashlib
+import tempfile
+from src.etl import RAW_FILE, RULES_VERSION, CHUNK_ROWS, compact_schema, load_data
+from src.frame import TransactionFrame
+from src.perf import timed, annotate
+
+UPLOAD_CACHE_DIR = "data/cache/uploads"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+def upload_key(digest):
+    """
+    Το κλειδί είναι το hash (sha256) των bytes του αρχείου + η έκδοση των κανόνων κατηγοριοποίησης.
+    """
+    return f"{RULES_VERSION}-{digest}"
+
+def cache_path(file_path, cache_dir=UPLOAD_CACHE_DIR):
+    # Το hash υπολογίζεται διαβάζοντας το αρχείο τμηματικά (όχι όλα τα bytes στη μνήμη)
+    with open(file_path, 'rb') as f: digest = hashlib.file_digest(f, 'sha256').hexdigest()
+    return os.path.join(cache_dir, f"{upload_key(digest)}.parquet")
+
+def _tmp_file(path):
+    # Μοναδικό προσωρινό αρχείο ανά writer, στον φάκελο του entry (το os.replace μένει atomic)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+def write_cache(df, path):
+    # Atomic: ένα μισογραμμένο entry δεν διαβάζεται ποτέ ως hit
+    tmp_path = _tmp_file(path)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+class CacheWriter:
+    """
+    Γράφει ένα entry chunk-chunk (ένα row group ανά chunk), ώστε να μη χρειάζεται όλο το αρχείο στη μνήμη.
+    Το entry φαίνεται μόνο μετά το commit()· αν βγούμε από το with χωρίς commit, το προσωρινό αρχείο σβήνεται.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = None
+        self._writer = None
+
+    def write(self, df):
+        table = pa.Table.from_pandas(compact_schema(df), preserve_index=False)
+        if self._writer is None:
+            self._tmp_path = _tmp_file(self.path)
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+        # Π.χ. ένα chunk χωρίς κανένα σχόλιο έχει στήλη τύπου null: ίδιο schema με το πρώτο chunk
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def commit(self):
+        if self._writer is None:
+            return False   # Κανένα chunk με συναλλαγές: δεν γράφεται entry
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.path)
+        self._tmp_path = None
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._writer is not None:
+            self._writer.close()
+        if self._tmp_path is not None and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        return False
+
+def iter_cached(path, batch_rows=CHUNK_ROWS):
+    """
+    Το entry σε κομμάτια των batch_rows γραμμών (compact schema), με τη σειρά του αρχείου:
+    η μνήμη μένει O(batch) όσο μεγάλο κι αν είναι το export.
+    """
+    with pq.ParquetFile(path) as parquet:
+        for batch in parquet.iter_batches(batch_size=batch_rows):
+            # Μέσω Table ώστε να ισχύσει το pandas metadata του αρχείου (period Month, categoricals)
+            yield compact_schema(pa.Table.from_batches([batch]).to_pandas())
+
+def read_months(path, months):
+    """
+    Μόνο οι γραμμές των months από ένα entry, ένα κομμάτι τη φορά (βλ. iter_cached): {month: DataFrame}.
+    """
+    months, parts = set(months), {}
+    for df in iter_cached(path):
+        df = df[df['Month'].astype(str).isin(months)]
+        for month, part in df.groupby('Month', sort=False, observed=True):
+            parts.setdefault(str(month), []).append(part)
+    return {month: compact_schema(pd.concat(frames, ignore_index=True)) for month, frames in parts.items()}
+
+def _entries(cache_dir):
+    if not os.path.exists(cache_dir):
+        return []
+    return [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.parquet')]
+
+def evict(cache_dir=UPLOAD_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Σβήνει entries παλιών εκδόσεων κανόνων και μετά τα least-recently-used
+    μέχρι το cache να χωράει στο max_bytes.
+    """
+    live = []
+    for path in _entries(cache_dir):
+        if not os.path.basename(path).startswith(f"{RULES_VERSION}-"):
+            os.remove(path)
+        else:
+            live.append((os.stat(path).st_mtime_ns, os.path.getsize(path), path))
+
+    total = sum(size for _, size, _ in live)
+    for _, size, path in sorted(live):
+        if total <= max_bytes: break
+        os.remove(path)
+        total -= size
+
+@timed()
+def load_cached(file_path=RAW_FILE, cache_dir=UPLOAD_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    load_data με cache: αν το ίδιο αρχείο έχει ξαναφορτωθεί με τους ίδιους κανόνες,
+    επιστρέφονται οι αποθηκευμένες συναλλαγές χωρίς καθόλου ETL.
+    Επιστρέφει (TransactionFrame, cache_hit). max_bytes=None: χωρίς eviction (το κάνει ο caller).
+    Φορτώνει ολόκληρο το entry· όποιος μπορεί να δουλέψει ανά κομμάτι διαβάζει με iter_cached
+    (όπως το ingest.parse_statement).
+    """
+    path = cache_path(file_path, cache_dir)
+    if os.path.exists(path):
+        os.utime(path)   # Ένα hit ανανεώνει το mtime για το LRU
+        annotate(cache='hit')
+        return TransactionFrame(compact_schema(pd.read_parquet(path))), True
+
+    annotate(cache='miss')
+    df = load_data(file_path)
+    write_cache(df.df, path)
+    if max_bytes is not None:
+        evict(cache_dir, max_bytes)
+    return df, False
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from src.etl import compact_schema
+from src.ai_advisor import advice_table, get_financial_advice
+
+# Το report ενός μήνα (get_financial_advice) και το batch advice_table πρέπει να συμφωνούν.
+
+def month_frame(rows, comments=True):
+    df = pd.DataFrame(rows, columns=['Date', 'Transaction Description', 'Comments', 'Amount_Cents', 'Category', 'Subcategory'])
+    df['Date'] = pd.to_datetime(df['Date'])
+    return compact_schema(df if comments else df.drop(columns='Comments'))
+
+ROWS = [
+    ('2024-12-01', 'ΜΙΣΘΟΔΟΣΙΑ', None, 150000, 'Salary', 'Μισθός'),
+    ('2024-12-20', 'ΕΜΒΑΣΜΑ', 'ΔΩΡΟ ΧΡΙΣΤΟΥΓΕΝΝΩΝ', 80000, 'Deposit/Gift', 'Καταθέσεις'),
+    ('2024-12-05', 'ZARA', None, -5000, '🛍️ Shopping', 'Ρούχα & Μόδα'),
+    ('2024-12-06', 'CAFE NERO', None, -3000, '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'),
+    ('2024-12-07', 'WOLT', None, -2000, '🍿 Lifestyle & Έξοδοι', 'Delivery'),
+    ('2024-12-08', 'UBER', None, -5000, '🚗 Μετακίνηση', 'Μεταφορικά'),
+]
+
+def single_month(df):
+    income = df.loc[df['Amount_Cents'] > 0, 'Amount_Cents'].sum() / 100
+    expenses = -df.loc[df['Amount_Cents'] < 0, 'Amount_Cents'].sum() / 100
+    return get_financial_advice(df, income, expenses, income - expenses)
+
+@pytest.mark.parametrize("order", [slice(None), slice(None, None, -1)])
+def test_top_category_tie_is_first_alphabetically(order):
+    # Shopping, Lifestyle και Μετακίνηση ισοπαλία στα 50€: ίδια νικήτρια ανεξάρτητα από τη σειρά των γραμμών
+    df = month_frame(ROWS[order])
+    top = advice_table(df)['Top_Category'].iat[0]
+    assert top == min(['🛍️ Shopping', '🍿 Lifestyle & Έξοδοι', '🚗 Μετακίνηση'])
+    assert f"**Μεγαλύτερο Έξοδο:** {top} (50.00€)" in single_month(df)
+
+def test_without_comments_column():
+    df = month_frame(ROWS, comments=False)
+    table = advice_table(df)
+    assert table['Bonus'].iat[0] == 0.0
+    assert "Δώρο" not in single_month(df)
+    # Με τη στήλη σχολίων το δώρο βρίσκεται
+    assert advice_table(month_frame(ROWS))['Bonus'].iat[0] == 800.0
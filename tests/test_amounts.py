@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.etl import parse_amounts
+
+# Το parse_amounts (vectorized) πρέπει να δίνει ό,τι και το αρχικό clean_amount ανά τιμή, παγωμένο εδώ αυτούσιο.
+
+def clean_amount(amount_str):
+    if pd.isna(amount_str): return 0.0
+    clean_str = str(amount_str).replace(' EUR', '').strip().replace('.', '').replace(',', '.')
+    try:
+        return float(clean_str)
+    except ValueError:
+        return 0.0
+
+def coerced(amount_str):
+    # Οι τιμές που το clean_amount κάνει 0.0 επειδή λείπουν ή δεν διαβάζονται
+    if pd.isna(amount_str): return True
+    try:
+        float(str(amount_str).replace(' EUR', '').strip().replace('.', '').replace(',', '.'))
+        return False
+    except ValueError:
+        return True
+
+VALUES = [
+    '1.234,56 EUR', '-1.234,56 EUR', '1.234.567,89 EUR', '12,50', '-3,20 EUR', '  7,00 EUR  ', '0,00', '0,29',
+    '12,50-', '-', '+5,00', '',  '   ', 'EUR', None, np.nan, 'abc', '1,2,3', '12 345,00', '1e3', 'inf', 'nan', '١٢,٥٠',
+]
+
+@pytest.mark.parametrize("dtype", [object, 'str'])
+@pytest.mark.parametrize("value", VALUES)
+def test_single_value(value, dtype):
+    amounts = pd.Series([value], dtype=dtype)
+    parsed, failed = parse_amounts(amounts)
+    np.testing.assert_array_equal(parsed.to_numpy(), [clean_amount(value)])
+    assert failed == int(coerced(value))
+
+@pytest.mark.parametrize("dtype", [object, 'str'])
+def test_column(dtype):
+    amounts = pd.Series(VALUES * 3, dtype=dtype, index=range(100, 100 + 3 * len(VALUES)), name='Amount')
+    parsed, failed = parse_amounts(amounts)
+    expected = amounts.map(clean_amount)
+    pd.testing.assert_series_equal(parsed, expected.astype(np.float64), check_index_type=False)
+    assert failed == sum(map(coerced, amounts))
+
+def test_cents():
+    # cents=True: ακέραια λεπτά του clean_amount· οι μη πεπερασμένες τιμές (inf/nan) γίνονται 0 και μετράνε ως σφάλματα
+    amounts = pd.Series(VALUES, dtype='str')
+    parsed, failed = parse_amounts(amounts, cents=True)
+    floats = np.array([clean_amount(v) for v in VALUES])
+    finite = np.isfinite(floats)
+    assert parsed.dtype == np.int64
+    assert parsed.tolist() == np.rint(np.where(finite, floats, 0.0) * 100).astype(np.int64).tolist()
+    assert failed == sum(map(coerced, VALUES)) + int((~finite).sum())
+    assert parsed.iat[VALUES.index('0,29')] == 29
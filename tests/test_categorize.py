@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src import etl
+from src.etl import CATEGORY_RULES, BANK_CATEGORY_RULES, categorize_frame
+
+# Το categorize_frame (vectorized, με merchant memo) και το etl.assign_category_data πρέπει να δίνουν σε κάθε γραμμή
+# ό,τι και το αρχικό row-wise assign_category_data, παγωμένο εδώ αυτούσιο (όπως ήταν πριν τους πίνακες κανόνων).
+
+def assign_category_data(row):
+    """
+    V16.0 - Merged Dining & Coffee into one subcategory.
+    """
+    raw_text = (str(row['Transaction Description']) + " " + str(row['Comments'])).upper()
+    full_text = raw_text.replace('Ά', 'Α').replace('Έ', 'Ε').replace('Ή', 'Η').replace('Ί', 'Ι').replace('Ό', 'Ο').replace('Ύ', 'Υ').replace('Ώ', 'Ω')
+    
+    amount = row['Amount']
+    day_name = row.get('Day_Name', '')
+
+    # 1. ΑΠΟΤΑΜΙΕΥΣΗ
+    if amount < 0 and ('TINIAKOS' in full_text or 'ΤΗΝΙΑΚΟΣ' in full_text): return '💰 Αποταμίευση', 'Μεταφορές σε εμένα'
+    if 'ΜΙΣΘΟΔΟΣΙΑ' in full_text: return 'Salary', 'Μισθός'
+    if 'ΚΑΤΑΘΕΣΗ' in full_text and amount > 0: return 'Deposit/Gift', 'Καταθέσεις'
+
+    # 2. ΣΠΙΤΙ & ΠΑΓΙΑ
+    if 'ΕΝΟΙΚ' in full_text or 'ENOIK' in full_text: return '🏠 Σπίτι & Πάγια', 'Ενοίκιο'
+    if any(kw in full_text for kw in ['COSMOTE', 'VODAFONE', 'NOVA', 'WIND', 'DEI', 'PROTERGIA', 'EYDAP', 'VOLTON', 'KOINOXR']): return '🏠 Σπίτι & Πάγια', 'Λογαριασμοί'
+
+    # 3. SUPERMARKET
+    if any(kw in full_text for kw in ['SKLAVENITIS', 'LIDL', 'MARKET IN', 'AB VASSILOPOULOS', 'MY MARKET', 'KRITIKOS', 'MASOUTIS', 'BAZAAR', 'GALAXIAS', 'AV SHOP', 'PAPAGIA', 'KOUOLITY', 'QUALITY FOODS']): 
+        return '🛒 Supermarket', 'Ψώνια Σπιτιού'
+    
+    # 4. LIFESTYLE (ΕΔΩ ΕΓΙΝΕ Η ΑΛΛΑΓΗ)
+    
+    # A. Delivery (Το κρατάμε ξεχωριστά γιατί είναι "κακή συνήθεια" σπιτιού)
+    if any(kw in full_text for kw in ['WOLT', 'WOΛT', 'WΟΛΤ', 'E-FOOD', 'EFOOD', 'BOX', 'PIZZA', 'BURGER', 'SOUVLAKI']): 
+        return '🍿 Lifestyle & Έξοδοι', 'Delivery'
+    
+    # B. Εστίαση & Καφές (Ενωμένα όλα τα "έξω": Καφέδες, Εστιατόρια, Ποτά, Κυλικεία)
+    dining_keywords = [
+        'CAFE', 'COFFEE', 'GREGORYS', 'GRIGORIS', 'EVEREST', 'FOURNOS', 'KYLIKEIO', 'MAMA JAY', 'RUDU', 'DILIEN', 'GEFSINUS', 'KARADIMAS', # Καφέδες
+        'RESTAURANT', 'TAVERNA', 'BAR', 'CLUB', 'ESTIATORIA', 'HOLY GINGER', 'PINAKAS' # Φαγητό έξω
+    ]
+    if any(kw in full_text for kw in dining_keywords): 
+        return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'
+    
+    # C. Διασκέδαση & Συνδρομές
+    if any(kw in full_text for kw in ['NETFLIX', 'SPOTIFY', 'YOUTUBE', 'CINEMA', 'THEATER', 'TICKET', 'VIVA', 'MORE.GR']): 
+        return '🍿 Lifestyle & Έξοδοι', 'Θέαμα & Συνδρομές'
+
+    # 5. SHOPPING
+    if any(kw in full_text for kw in ['PUBLIC', 'PLAISIO', 'ISTORM', 'GERMANOS', 'KOTSOVOLOS', 'APPLE STORE', 'APPLE.COM', 'ELECTRONICS', 'IKEA', 'LEROY', 'JUMBO', 'PRACTIKER', 'E-SHOP']): 
+        return '🛍️ Shopping', 'Tech & Σπίτι'
+    if any(kw in full_text for kw in ['ZARA', 'H&M', 'HM ', 'BSB', 'ATTICA', 'MAZARAKI', 'MICHALIK', 'VANIKIOTI', 'ACCESSORIES', 'CLOTHES', 'SHOES', 'INTERSPORT', 'ELLE', 'ARTOPOIIMATA']): 
+        return '🛍️ Shopping', 'Ρούχα & Μόδα'
+    if any(kw in full_text for kw in ['HONDOS', 'SEPHORA', 'BEAUTY', 'HAIR', 'BARBER', 'PHARMACY', 'FARMAKEIO', 'DOCTOR', 'HOSPITAL', 'IATROS']): 
+        return '🛍️ Shopping', 'Υγεία & Ομορφιά'
+    if 'IQOS' in full_text: return '🛍️ Shopping', 'Διάφορα Ψώνια'
+
+    # 6. IRIS & ΜΕΤΑΦΟΡΕΣ
+    if 'IRIS' in full_text or 'YPER' in full_text or 'ΥΠΕΡ' in full_text: 
+        return '💸 Διάφορα', 'IRIS/Φίλοι'
+
+    # 7. ΥΠΟΛΟΙΠΑ
+    if any(kw in full_text for kw in ['UBER', 'BOLT', 'BEAT', 'FREENOW', 'OASA', 'SHELL', 'EKO', 'AVIN', 'AEGEAN']): return '🚗 Μετακίνηση', 'Μεταφορικά'
+    if any(kw in full_text for kw in ['REVOLUT', 'PAYPAL', 'TOP UP']): return '💳 FinTech', 'Revolut'
+
+    # Weekend Trap -> Πάει στο Εστίαση & Καφές
+    if day_name in ['Saturday', 'Sunday'] and amount < 0:
+        return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'
+
+    # Fallback
+    bank_cat = str(row['Bank Category']).upper()
+    if 'ΕΣΤΙΑΤΟΡΙΑ' in bank_cat: return '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές' # Ενωμένο και εδώ
+    if 'SUPERMARKET' in bank_cat: return '🛒 Supermarket', 'Ψώνια Σπιτιού'
+    if 'ΡΟΥΧΙΣΜΟΣ' in bank_cat or 'ΑΞΕΣΟΥΑΡ' in bank_cat: return '🛍️ Shopping', 'Ρούχα (Bank)'
+    if 'ΥΓΕΙΑ' in bank_cat: return '🛍️ Shopping', 'Υγεία (Bank)'
+    if 'ΤΕΧΝΟΛΟΓΙΑ' in bank_cat: return '💸 Διάφορα', 'Uncategorized Tech'
+    
+    return '💸 Διάφορα', 'Uncategorized'
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    # memo_dir=None: το memo μένει μόνο στη μνήμη· καθαρό σε κάθε test ώστε να τρέχουν οι κανόνες και όχι το memo
+    etl._MEMOS.pop(None, None)
+    yield
+    etl._MEMOS.pop(None, None)
+
+def frame(rows, day_name=True):
+    columns = ['Transaction Description', 'Comments', 'Amount', 'Bank Category', 'Day_Name']
+    df = pd.DataFrame(rows, columns=columns)
+    return df if day_name else df.drop(columns='Day_Name')
+
+def assert_same_as_rows(df):
+    category, subcategory = categorize_frame(df, memo_dir=None)
+    for i, (_, row) in enumerate(df.iterrows()):
+        expected = assign_category_data(row)
+        assert (category.iat[i], subcategory.iat[i]) == expected, f"row {i}: {row.to_dict()}"
+        assert etl.assign_category_data(row) == expected, f"row {i}: {row.to_dict()}"
+
+def test_synthetic_rows():
+    rng = np.random.default_rng(0)
+    keywords = [kw for keywords, *_ in CATEGORY_RULES for kw in keywords] + ['RANDOM SHOP', 'ΆΓΝΩΣΤΟ', '']
+    bank = [kw.title() for keywords, *_ in BANK_CATEGORY_RULES for kw in keywords] + ['Λοιπά', None]
+    n = 3000
+    descriptions = [f"{rng.choice(keywords)} {rng.integers(0, 10_000)}" for _ in range(n)]
+    comments = [rng.choice(keywords) if rng.random() < 0.3 else None for _ in range(n)]
+    df = frame({
+        'Transaction Description': descriptions,
+        'Comments': comments,
+        'Amount': np.round(rng.normal(-20, 150, n), 2),
+        'Bank Category': rng.choice(np.array(bank, dtype=object), n),
+        'Day_Name': rng.choice(etl.DAY_ORDER, n),
+    })
+    assert_same_as_rows(df)
+
+def test_compact_amounts():
+    # Με Amount_Cents (compact schema) μετράει μόνο το πρόσημο, όπως στο Amount
+    df = frame([
+        ['TINIAKOS', None, -12.5, None, 'Monday'],
+        ['ΚΑΤΑΘΕΣΗ', None, 40.0, None, 'Monday'],
+        ['ΑΓΝΩΣΤΟ', None, -3.0, None, 'Sunday'],
+    ])
+    category, subcategory = categorize_frame(df.assign(Amount_Cents=(df['Amount'] * 100).astype(np.int64)).drop(columns='Amount'), memo_dir=None)
+    expected = [assign_category_data(row) for _, row in df.iterrows()]
+    assert list(zip(category, subcategory)) == expected
+
+def test_accents():
+    assert_same_as_rows(frame([
+        ['ενοίκιο Μαρτίου', None, -500.0, None, 'Monday'],
+        ['ΥΠΈΡ ΦΙΛΟΥ', None, -20.0, None, 'Monday'],
+        ['κατάθεση μετρητών', None, 100.0, None, 'Monday'],
+        ['Τηνιακός', None, -50.0, None, 'Monday'],
+        ['ΆΓΝΩΣΤΟ', 'ΕΝΟΊΚΙΟ', -500.0, None, 'Monday'],
+    ]))
+
+def test_overlapping_keywords():
+    # Το πρώτο κατά προτεραιότητα κανόνα κερδίζει, ακόμα κι όταν τα keywords επικαλύπτονται
+    assert_same_as_rows(frame([
+        ['TINIAKOS LIDL', None, -30.0, None, 'Monday'],
+        ['WOLT BAR', None, -15.0, None, 'Monday'],
+        ['BARBER SHOP', None, -10.0, None, 'Monday'],
+        ['MY MARKET IN', None, -25.0, None, 'Monday'],
+        ['HM STORE', None, -40.0, None, 'Monday'],
+        ['PAYPAL NETFLIX', None, -12.0, None, 'Monday'],
+        ['DEI', 'SKLAVENITIS', -60.0, None, 'Monday'],
+    ]))
+
+@pytest.mark.parametrize("amount", [-50.0, 50.0, 0.0])
+def test_savings_only_for_outgoing(amount):
+    assert_same_as_rows(frame([['ΜΕΤΑΦΟΡΑ TINIAKOS', None, amount, None, 'Monday']]))
+
+@pytest.mark.parametrize("amount", [100.0, -100.0])
+def test_deposit_sign(amount):
+    assert_same_as_rows(frame([
+        ['ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ', None, amount, None, 'Monday'],
+        ['ΚΑΤΑΘΕΣΗ', None, amount, 'Εστιατόρια', 'Saturday'],
+    ]))
+
+def test_weekend_fallback():
+    assert_same_as_rows(frame([
+        ['RANDOM SHOP', None, -20.0, 'Supermarket', 'Saturday'],
+        ['RANDOM SHOP', None, -20.0, 'Supermarket', 'Sunday'],
+        ['RANDOM SHOP', None, 20.0, None, 'Sunday'],
+        ['RANDOM SHOP', None, 0.0, None, 'Saturday'],
+        ['RANDOM SHOP', None, -20.0, None, 'Friday'],
+        ['LIDL', None, -20.0, None, 'Sunday'],
+    ]))
+
+def test_bank_category_fallback():
+    assert_same_as_rows(frame([
+        ['RANDOM SHOP', None, -20.0, 'Εστιατόρια', 'Monday'],
+        ['RANDOM SHOP', None, -20.0, 'ΕΣΤΙΑΤΟΡΙΑ', 'Monday'],
+        ['RANDOM SHOP', None, -20.0, 'supermarket', 'Monday'],
+        ['RANDOM SHOP', None, -20.0, 'Ρουχισμός & Αξεσουάρ', 'Monday'],
+        ['RANDOM SHOP', None, 20.0, 'Υγεία', 'Sunday'],
+        ['RANDOM SHOP', None, -20.0, 'Τεχνολογία', 'Monday'],
+        ['RANDOM SHOP', None, -20.0, None, 'Monday'],
+        ['RANDOM SHOP', None, -20.0, '', 'Monday'],
+    ]))
+    assert_same_as_rows(frame([['RANDOM SHOP', None, -20.0, 'Υγεία', None]], day_name=False))
+
+def test_missing_description_and_comments():
+    assert_same_as_rows(frame([
+        [None, None, -20.0, None, 'Monday'],
+        [np.nan, 'WOLT', -20.0, None, 'Monday'],
+        ['HM', np.nan, -20.0, None, 'Monday'],
+        [None, None, -20.0, 'Supermarket', 'Sunday'],
+        ['', '', 20.0, None, 'Monday'],
+    ]))
+
+def test_signed_rule_does_not_hide_same_position_match():
+    # Στην ίδια θέση το regex δίνει μόνο το keyword του κανόνα με τη μεγαλύτερη προτεραιότητα·
+    # αν αυτός δεν ισχύει λόγω πρόσημου, πρέπει να βρεθεί ο επόμενος κανόνας που ταιριάζει εκεί
+    rules = [
+        (['ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ'], 1, 'A', 'a'),
+        (['ΚΑΤΑΘΕΣΗ'], -1, 'B', 'b'),
+        (['ΚΑΤΑΘ'], 0, 'C', 'c'),
+    ]
+    text = pd.Series(['ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ', 'ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ', 'ΚΑΤΑΘΕΣΗ ΜΕΤΡΗΤΩΝ', 'ΚΑΤΑΘΕΣΗ', 'ΑΛΛΟ'], dtype='str')
+    amount = np.array([100.0, -100.0, 0.0, 100.0, -100.0])
+    signs = np.array([rule[1] for rule in rules])
+    found = etl._first_rule(text, etl._compile_rules(rules, signed=True), signs, amount)
+    assert found.tolist() == [0, 1, 2, 2, -1]
@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+from src.etl import load_data, source_account, account_key, file_account_key, transaction_ids
+from src.store import import_transactions, load_months
+from src.ingest import start_ingest
+
+# Dedupe του store: ίδιο Tx_Id = ίδια κίνηση του ίδιου λογαριασμού (βλ. etl.transaction_ids).
+
+HEADER = "Ημ/νία Συναλλαγής\tΠεριγραφή Συναλλαγής\tΣχόλια / Κωδικός Αναφοράς\tΠοσό\tΚατηγορία\n"
+IBAN_A = "GR1601101250000000012300695"
+IBAN_B = "GR9601101250000000099900695"   # Ίδια 4 τελευταία ψηφία με το IBAN_A
+
+JAN = [
+    ("03/01/2024", "SKLAVENITIS 123", "", "-12,50 EUR", "Supermarket"),
+    ("05/01/2024", "CAFE NERO", "", "-3,20 EUR", "Εστιατόρια"),
+    ("05/01/2024", "CAFE NERO", "", "-3,20 EUR", "Εστιατόρια"),   # Δεύτερος ίδιος καφές την ίδια μέρα
+    ("20/01/2024", "NETFLIX.COM", "", "-13,99 EUR", ""),
+]
+FEB = [
+    ("02/02/2024", "LIDL HELLAS", "", "-45,10 EUR", "Supermarket"),
+    ("20/02/2024", "NETFLIX.COM", "", "-13,99 EUR", ""),
+]
+
+def write_export(path, rows, preamble):
+    with open(path, "w", encoding='utf-8') as f:
+        f.write(preamble + "\n" + HEADER)
+        for row in rows:
+            f.write("\t".join(row) + "\n")
+    return str(path)
+
+def import_file(path, folder):
+    df = load_data(path, memo_dir=None).df.assign(Account=source_account(path))
+    key = account_key(path) or file_account_key(path)
+    return import_transactions(df.assign(Tx_Id=transaction_ids(df, key)), folder)
+
+@pytest.fixture
+def store(tmp_path):
+    return str(tmp_path / "store")
+
+def test_overlapping_exports(tmp_path, store):
+    first = write_export(tmp_path / "jan.txt", JAN, f"IBAN {IBAN_A}")
+    # Το επόμενο export (άλλο όνομα αρχείου) ξαναδίνει όλο τον Ιανουάριο μαζί με τον Φεβρουάριο
+    second = write_export(tmp_path / "jan-feb.txt", JAN + FEB, f"IBAN {IBAN_A}")
+
+    report = import_file(first, store)
+    assert (report.new, report.duplicate) == (4, 0)
+    report = import_file(second, store)
+    assert (report.new, report.duplicate) == (2, 4)
+    assert report.months == ['2024-02']
+    assert len(load_months(folder=store)) == 6
+
+def test_same_day_identical_rows_kept(tmp_path, store):
+    full = write_export(tmp_path / "full.txt", JAN, f"IBAN {IBAN_A}")
+    # Ένα export που έχει μόνο τον έναν από τους δύο ίδιους καφέδες
+    partial = write_export(tmp_path / "partial.txt", JAN[:2], f"IBAN {IBAN_A}")
+
+    report = import_file(partial, store)
+    assert (report.new, report.duplicate) == (2, 0)
+    report = import_file(full, store)
+    assert (report.new, report.duplicate) == (2, 2)
+    coffees = load_months(folder=store).query("`Transaction Description` == 'CAFE NERO'")
+    assert len(coffees) == 2 and coffees['Tx_Id'].nunique() == 2
+
+def test_two_accounts_do_not_collide(tmp_path, store):
+    card_a = write_export(tmp_path / "a.txt", JAN, f"IBAN {IBAN_A}")
+    card_b = write_export(tmp_path / "b.txt", JAN, f"IBAN {IBAN_B}")
+
+    assert (import_file(card_a, store).new, import_file(card_b, store).new) == (4, 4)
+    assert source_account(card_a) == source_account(card_b) == "GR…0695"
+
+def test_account_number_from_preamble(tmp_path, store):
+    first = write_export(tmp_path / "one.txt", JAN, "Αριθμός Λογαριασμού: 0123-456789-01")
+    second = write_export(tmp_path / "two.txt", JAN + FEB, "ΑΡΙΘΜΟΣ ΛΟΓΑΡΙΑΣΜΟΥ 0123 456789 01")
+    other = write_export(tmp_path / "card.txt", JAN, "Κάρτα VISA XXXX XXXX XXXX 4321")
+
+    assert account_key(first) == account_key(second) == "number:012345678901"
+    assert source_account(other) == "…4321"
+    assert import_file(first, store).new == 4
+    assert (import_file(second, store).new, import_file(other, store).new) == (2, 4)
+
+def test_no_account_identity(tmp_path, store):
+    # Χωρίς IBAN/αριθμό: το ίδιο αρχείο δεν διπλασιάζεται, αλλά δεν γίνεται dedupe με άλλο export
+    first = write_export(tmp_path / "one.txt", JAN, "Κίνηση")
+    second = write_export(tmp_path / "two.txt", JAN + FEB, "Κίνηση")
+
+    assert account_key(first) is None
+    assert import_file(first, store).new == 4
+    assert import_file(first, store).new == 0
+    assert import_file(second, store).new == 6
+
+def test_transaction_ids_need_an_account():
+    df = pd.DataFrame({'Date': pd.to_datetime(['2024-01-05']), 'Amount_Cents': [-320], 'Transaction Description': ['CAFE']})
+    with pytest.raises(ValueError):
+        transaction_ids(df, '')
+    with pytest.raises(ValueError):
+        import_transactions(df, "unused")
+
+def test_ingest_warns_without_account(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # Το merchant memo γράφεται κάτω από το data/ του cwd
+    paths = [write_export(tmp_path / "one.txt", JAN, "Κίνηση"), write_export(tmp_path / "two.txt", JAN, f"IBAN {IBAN_A}")]
+    job = start_ingest(paths, folder=str(tmp_path / "store"), cache_dir=str(tmp_path / "cache"), workers=1)
+    assert job.wait(60)
+    progress = job.progress()
+    assert progress.state == "done" and not progress.errors
+    assert (progress.report.new, progress.report.duplicate) == (8, 0)
+    assert len(progress.warnings) == 1 and progress.warnings[0].startswith("one.txt:")
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.etl import compact_schema
+from src.editor import COMBO_SEP, filter_positions, editor_page, collect_edits, with_pending, pending_changes
+
+# Ο Editor δουλεύει με θέσεις (iloc) στο DataFrame του μήνα και κρατάει τις αλλαγές ανά Tx_Id.
+
+ROWS = [
+    # Περιγραφή, σχόλια, λεπτά, κατηγορία, υποκατηγορία
+    ("SKLAVENITIS", None, -1250, '🛒 Supermarket', 'Ψώνια Σπιτιού'),
+    ("CAFE NERO", "ΚΑΦΕΣ", -320, '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'),
+    ("RANDOM SHOP", None, -999, '💸 Διάφορα', 'Uncategorized'),
+    ("LIDL", None, -4510, '🛒 Supermarket', 'Ψώνια Σπιτιού'),
+    ("ΜΙΣΘΟΔΟΣΙΑ", None, 150000, 'Salary', 'Μισθός'),
+    ("cafe flora", None, -450, '🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές'),
+    ("ΑΓΝΩΣΤΟ", "cafe", -2000, '💸 Διάφορα', 'Uncategorized'),
+]
+
+@pytest.fixture
+def month_df():
+    n = len(ROWS)
+    df = pd.DataFrame(ROWS, columns=['Transaction Description', 'Comments', 'Amount_Cents', 'Category', 'Subcategory'])
+    df['Tx_Id'] = np.arange(1000, 1000 + n, dtype=np.uint64)
+    df['Date'] = pd.to_datetime('2024-01-01') + pd.to_timedelta([5, 1, 3, 6, 2, 4, 0], unit='D')
+    # Index που δεν είναι 0..n-1: οι θέσεις πρέπει να είναι iloc, όχι labels
+    return compact_schema(df.set_axis(np.arange(n)[::-1] * 10))
+
+def labels(df, positions):
+    return df['Transaction Description'].iloc[positions].tolist()
+
+def test_filter_positions(month_df):
+    assert labels(month_df, filter_positions(month_df)) == ["LIDL", "SKLAVENITIS", "cafe flora", "RANDOM SHOP", "ΜΙΣΘΟΔΟΣΙΑ", "CAFE NERO", "ΑΓΝΩΣΤΟ"]
+    # Κείμενο σε περιγραφή ή σχόλια, χωρίς διάκριση πεζών/κεφαλαίων
+    assert labels(month_df, filter_positions(month_df, text="CAFE", descending=False)) == ["ΑΓΝΩΣΤΟ", "CAFE NERO", "cafe flora"]
+    assert labels(month_df, filter_positions(month_df, categories=['🛒 Supermarket'], sort_by="Amount")) == ["SKLAVENITIS", "LIDL"]
+    assert labels(month_df, filter_positions(month_df, amount_range=(-20.0, -3.2), sort_by="Amount", descending=False)) == ["ΑΓΝΩΣΤΟ", "SKLAVENITIS", "RANDOM SHOP", "cafe flora", "CAFE NERO"]
+    assert labels(month_df, filter_positions(month_df, uncategorized_only=True, sort_by="Description", descending=False)) == ["RANDOM SHOP", "ΑΓΝΩΣΤΟ"]
+    assert len(filter_positions(month_df, text="δεν υπάρχει")) == 0
+
+def test_page_maps_to_absolute_positions(month_df):
+    positions = filter_positions(month_df, sort_by="Amount", descending=False)
+    pages = [editor_page(month_df, positions, page, page_size=3) for page in range(3)]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    for page, page_df in enumerate(pages):
+        rows = month_df.iloc[positions[page * 3:(page + 1) * 3]]
+        assert page_df['Tx_Id'].tolist() == rows['Tx_Id'].tolist()
+        assert page_df['Amount'].tolist() == (rows['Amount_Cents'] / 100).tolist()
+        assert page_df['Category'].tolist() == (rows['Category'].astype(str) + COMBO_SEP + rows['Subcategory'].astype(str)).tolist()
+
+def test_pending_edits_across_pages(month_df):
+    positions = filter_positions(month_df)
+    pending = {}
+    shopping = '🛍️ Shopping' + COMBO_SEP + 'Διάφορα Ψώνια'
+
+    # Σελίδα 1: αλλαγή της 2ης γραμμής
+    first = with_pending(editor_page(month_df, positions, 0, page_size=3), pending)
+    edited = first.copy()
+    edited.loc[1, 'Category'] = shopping
+    collect_edits(first, edited, pending)
+    assert pending == {int(first['Tx_Id'].iat[1]): shopping}
+
+    # Σελίδα 2: άλλη αλλαγή· η σελίδα 1 δεν επηρεάζεται
+    second = with_pending(editor_page(month_df, positions, 1, page_size=3), pending)
+    assert second['Category'].tolist() == editor_page(month_df, positions, 1, page_size=3)['Category'].tolist()
+    edited = second.copy()
+    edited.loc[0, 'Category'] = shopping
+    collect_edits(second, edited, pending)
+    assert len(pending) == 2
+
+    # Πίσω στη σελίδα 1, και με άλλο φίλτρο: η αλλαγή φαίνεται στη γραμμή με το ίδιο Tx_Id
+    assert with_pending(editor_page(month_df, positions, 0, page_size=3), pending)['Category'].iat[1] == shopping
+    filtered = filter_positions(month_df, sort_by="Description")
+    page_df = with_pending(editor_page(month_df, filtered, 0, page_size=10), pending)
+    assert page_df.loc[page_df['Tx_Id'].isin(list(pending)), 'Category'].tolist() == [shopping, shopping]
+
+    changes = pending_changes(month_df, pending)
+    assert sorted(changes['Tx_Id'].tolist()) == sorted(pending)
+    assert set(changes['Category']) == {'🛍️ Shopping'} and set(changes['Subcategory']) == {'Διάφορα Ψώνια'}
+
+    # Επιστροφή στην αρχική κατηγορία: μένει στο pending αλλά δεν είναι πια αλλαγή
+    first = with_pending(editor_page(month_df, positions, 0, page_size=3), pending)
+    edited = first.copy()
+    edited.loc[1, 'Category'] = editor_page(month_df, positions, 0, page_size=3)['Category'].iat[1]
+    collect_edits(first, edited, pending)
+    assert pending_changes(month_df, pending)['Tx_Id'].tolist() == [int(second['Tx_Id'].iat[0])]
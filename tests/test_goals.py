@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.logic import ALLOCATION_RULES, allocate_goals, calculate_buckets
+
+# Κατανομή της μηνιαίας αποταμίευσης σε στόχους (allocate_goals).
+
+def month_offset(months):
+    return (pd.Timestamp.now() + pd.DateOffset(months=months)).strftime('%Y-%m')
+
+GOALS = [
+    {'name': 'car', 'target': 5500, 'saved': 1000, 'share': 0.5, 'priority': 2, 'deadline': month_offset(30)},
+    {'name': 'trip', 'target': 700, 'saved': 100, 'share': 0.3, 'priority': 1, 'deadline': month_offset(6)},
+    {'name': 'laptop', 'target': 1500, 'saved': 0, 'share': 0.2, 'priority': 3, 'deadline': month_offset(12)},
+]
+
+@pytest.mark.parametrize("rule", ALLOCATION_RULES)
+@pytest.mark.parametrize("savings", [300.0, [250.0, -100.0, 0.0, 900.0] * 9])
+def test_allocation_sums_to_available(rule, savings):
+    summary, balances = allocate_goals(GOALS, savings, rule, horizon=36)
+    saved = summary['Saved'].sum()
+    remaining = (summary['Target'] - summary['Saved']).clip(lower=0).sum()
+    cum_savings = np.cumsum(np.broadcast_to(np.maximum(np.asarray(savings, dtype=float), 0.0), (36,)))
+    # Όσο υπάρχει χώρος μοιράζεται όλο το ποσό, μετά όλοι οι στόχοι είναι γεμάτοι
+    np.testing.assert_allclose(balances.sum(axis=1) - saved, np.minimum(cum_savings, remaining))
+    assert (balances.to_numpy() <= summary['Target'].to_numpy() + 1e-9).all()
+    assert (balances.diff().iloc[1:].to_numpy() >= -1e-9).all()
+
+def test_completed_goal_frees_its_share():
+    goals = [
+        {'name': 'small', 'target': 100, 'saved': 0, 'share': 0.5},
+        {'name': 'big', 'target': 10_000, 'saved': 0, 'share': 0.5},
+        {'name': 'done', 'target': 500, 'saved': 600, 'share': 1.0},   # Ήδη γεμάτος: δεν παίρνει τίποτα από την αρχή
+    ]
+    summary, balances = allocate_goals(goals, 100, 'fixed', horizon=4)
+    assert balances['small'].tolist() == [50, 100, 100, 100]
+    assert balances['big'].tolist() == [50, 100, 200, 300]
+    assert balances['done'].tolist() == [600] * 4
+    assert summary['Completion Month'].iat[0] == 2 and summary['Completion Month'].iat[2] == 0
+
+@pytest.mark.parametrize("rule", ['fixed', 'deadline'])
+def test_share_redistributed_mid_month(rule):
+    # Ο στόχος γεμίζει στη μέση του μήνα: το υπόλοιπο του μεριδίου του πάει στον άλλο τον ίδιο μήνα
+    goals = [{'name': 'a', 'target': 75, 'saved': 0, 'deadline': month_offset(1)}, {'name': 'b', 'target': 1000, 'saved': 0, 'deadline': month_offset(12)}]
+    if rule == 'fixed':
+        goals = [dict(goal, share=1) for goal in goals]
+    _, balances = allocate_goals(goals, 100, rule, horizon=2)
+    assert balances.sum(axis=1).tolist() == pytest.approx([100, 200])
+    assert balances['a'].iat[1] == 75
+
+def test_deadline_ordering():
+    goals = [
+        {'name': 'later', 'target': 1200, 'saved': 0, 'deadline': month_offset(24)},
+        {'name': 'sooner', 'target': 1200, 'saved': 0, 'deadline': month_offset(6)},
+        {'name': 'open', 'target': 1200, 'saved': 0},   # Χωρίς προθεσμία: ως το τέλος του ορίζοντα
+    ]
+    summary = allocate_goals(goals, 300, 'deadline', horizon=48)[0].set_index('Goal')
+    # Βάρος = ο μηνιαίος ρυθμός που χρειάζεται: 1200/6, 1200/24, 1200/48
+    assert summary['Monthly'].to_dict() == pytest.approx({'sooner': 300 * 200 / 275, 'later': 300 * 50 / 275, 'open': 300 * 25 / 275})
+    assert summary['Completion Month']['sooner'] < summary['Completion Month']['later'] < summary['Completion Month']['open']
+
+def test_priority_ordering():
+    summary, balances = allocate_goals(GOALS, 300, 'priority', horizon=36)
+    completion = summary.set_index('Goal')['Completion Month']
+    assert completion['trip'] < completion['car'] < completion['laptop']
+    assert balances['laptop'].iat[0] == 0 and balances['trip'].iat[0] == 400
+
+@pytest.mark.parametrize("monthly_savings", [500, 0, -200, 1234.5, 2999])
+def test_two_goals_match_calculate_buckets(monthly_savings):
+    buckets = calculate_buckets(monthly_savings)
+    goals = [
+        {'name': 'car', 'target': buckets['car']['goal'], 'saved': 1000, 'share': 0.8},
+        {'name': 'trip', 'target': buckets['trip']['goal'], 'saved': 100, 'share': 0.2},
+    ]
+    summary, balances = allocate_goals(goals, monthly_savings, 'fixed', horizon=1)
+    for i, key in enumerate(['car', 'trip']):
+        assert summary['Monthly'].iat[i] == pytest.approx(buckets[key]['added_this_month'])
+        assert balances[key].iat[0] == pytest.approx(buckets[key]['current'])
+        assert balances[key].iat[0] / goals[i]['target'] == pytest.approx(buckets[key]['percent'])
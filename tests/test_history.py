@@ -0,0 +1,70 @@
+import os
+import pandas as pd
+import pytest
+from src.etl import load_data, account_key, transaction_ids
+from src.store import append_overrides, import_transactions
+from src.history import HistoryCache, snapshot_path
+
+# Το HistoryCache μετά από restart: οι αμετάβλητοι μήνες από το snapshot, οι υπόλοιποι από το store.
+
+HEADER = "Ημ/νία Συναλλαγής\tΠεριγραφή Συναλλαγής\tΣχόλια / Κωδικός Αναφοράς\tΠοσό\tΚατηγορία\n"
+ROWS = [
+    ("03/01/2024", "SKLAVENITIS 123", "", "-12,50 EUR", "Supermarket"),
+    ("20/01/2024", "NETFLIX.COM", "", "-13,99 EUR", ""),
+    ("02/02/2024", "LIDL HELLAS", "", "-45,10 EUR", "Supermarket"),
+    ("01/02/2024", "ΜΙΣΘΟΔΟΣΙΑ", "", "1.500,00 EUR", ""),
+    ("15/03/2024", "CAFE NERO", "", "-3,20 EUR", "Εστιατόρια"),
+]
+
+def import_rows(path, rows, folder):
+    with open(path, "w", encoding='utf-8') as f:
+        f.write("IBAN GR1601101250000000012300695\n" + HEADER + "".join("\t".join(row) + "\n" for row in rows))
+    df = load_data(str(path), memo_dir=None).df
+    return import_transactions(df.assign(Tx_Id=transaction_ids(df, account_key(str(path)))), folder)
+
+def fresh(folder, columns=None):
+    return HistoryCache(folder, columns, workers=1, persist=False).load()
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = str(tmp_path / "store")
+    import_rows(tmp_path / "first.txt", ROWS, folder)
+    return folder
+
+@pytest.mark.parametrize("columns", [None, ['Date', 'Amount_Cents', 'Category']])
+def test_restart_uses_snapshot(folder, columns):
+    first = HistoryCache(folder, columns, workers=1)
+    history = first.load()
+    assert first.stats["misses"] == 3 and os.path.exists(snapshot_path(folder, columns))
+
+    restarted = HistoryCache(folder, columns, workers=1)
+    restored = restarted.load()
+    assert (restarted.stats["restored"], restarted.stats["misses"]) == (3, 0)
+    pd.testing.assert_frame_equal(restored, history)
+    pd.testing.assert_frame_equal(restored, fresh(folder, columns))
+    pd.testing.assert_frame_equal(restarted.load(['2024-02']), HistoryCache(folder, columns, workers=1, persist=False).load(['2024-02']))
+
+def test_changed_months_reread_after_restart(tmp_path, folder):
+    HistoryCache(folder, workers=1).load()
+    # Όσο ήταν κλειστό: νέα κίνηση τον Φεβρουάριο, νέος μήνας, διόρθωση στον Μάρτιο
+    import_rows(tmp_path / "second.txt", ROWS + [("10/02/2024", "WOLT", "", "-9,90 EUR", ""), ("01/04/2024", "UBER", "", "-7,00 EUR", "")], folder)
+    march = fresh(folder).query("Date >= '2024-03-01' and Date < '2024-04-01'")
+    append_overrides(pd.DataFrame({'Tx_Id': march['Tx_Id'], 'Category': '🛍️ Shopping', 'Subcategory': 'Διάφορα Ψώνια'}), '2024-03', folder)
+
+    restarted = HistoryCache(folder, workers=1)
+    history = restarted.load()
+    assert (restarted.stats["restored"], restarted.stats["misses"]) == (1, 3)
+    pd.testing.assert_frame_equal(history, fresh(folder))
+    assert history.loc[history['Transaction Description'] == 'CAFE NERO', 'Category'].astype(str).tolist() == ['🛍️ Shopping']
+
+    # Το snapshot γράφτηκε ξανά με τους νέους μήνες
+    again = HistoryCache(folder, workers=1)
+    pd.testing.assert_frame_equal(again.load(), history)
+    assert (again.stats["restored"], again.stats["misses"]) == (4, 0)
+
+def test_broken_snapshot_ignored(folder):
+    HistoryCache(folder, workers=1).load()
+    with open(snapshot_path(folder), "wb") as f: f.write(b"not parquet")
+    restarted = HistoryCache(folder, workers=1)
+    pd.testing.assert_frame_equal(restarted.load(), fresh(folder))
+    assert (restarted.stats["restored"], restarted.stats["misses"]) == (0, 3)
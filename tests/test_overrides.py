@@ -0,0 +1,85 @@
+import os
+import pandas as pd
+import pytest
+from src import store
+from src.etl import load_data, account_key, transaction_ids
+from src.store import append_overrides, apply_overrides, compact_overrides, import_transactions, load_month, override_versions, read_overrides
+
+# Οι διορθώσεις του Editor (journal + snapshot) πάνω από τα partitions, ανά Tx_Id.
+
+HEADER = "Ημ/νία Συναλλαγής\tΠεριγραφή Συναλλαγής\tΣχόλια / Κωδικός Αναφοράς\tΠοσό\tΚατηγορία\n"
+JAN = [
+    ("03/01/2024", "SKLAVENITIS 123", "", "-12,50 EUR", "Supermarket"),
+    ("05/01/2024", "CAFE NERO", "", "-3,20 EUR", "Εστιατόρια"),
+    ("20/01/2024", "NETFLIX.COM", "", "-13,99 EUR", ""),
+]
+
+def import_export(path, rows, folder):
+    with open(path, "w", encoding='utf-8') as f:
+        f.write("IBAN GR1601101250000000012300695\n" + HEADER + "".join("\t".join(row) + "\n" for row in rows))
+    df = load_data(str(path), memo_dir=None).df
+    return import_transactions(df.assign(Tx_Id=transaction_ids(df, account_key(str(path)))), folder)
+
+def edit(df, description, category, subcategory):
+    row = df[df['Transaction Description'] == description]
+    return pd.DataFrame({'Tx_Id': row['Tx_Id'], 'Category': category, 'Subcategory': subcategory})
+
+def category_of(df, description):
+    row = df[df['Transaction Description'] == description]
+    return (str(row['Category'].iat[0]), str(row['Subcategory'].iat[0]))
+
+@pytest.fixture
+def folder(tmp_path):
+    return str(tmp_path / "store")
+
+def test_override_survives_compaction_and_reimport(tmp_path, folder):
+    import_export(tmp_path / "jan.txt", JAN, folder)
+    month = load_month('2024-01', folder=folder)
+    assert append_overrides(edit(month, 'CAFE NERO', '🛍️ Shopping', 'Διάφορα Ψώνια'), '2024-01', folder) == 1
+    versions = override_versions(folder)
+
+    assert compact_overrides(folder)
+    assert os.path.getsize(os.path.join(folder, store.OVERRIDES_JOURNAL)) == 0
+    assert override_versions(folder) == versions
+
+    # Νέο export του ίδιου μήνα με μία ακόμα κίνηση: το partition ξαναγράφεται, η διόρθωση μένει
+    report = import_export(tmp_path / "jan-full.txt", JAN + [("28/01/2024", "LIDL HELLAS", "", "-20,00 EUR", "")], folder)
+    assert (report.new, report.months) == (1, ['2024-01'])
+    month = load_month('2024-01', folder=folder)
+    assert len(month) == 4
+    assert category_of(month, 'CAFE NERO') == ('🛍️ Shopping', 'Διάφορα Ψώνια')
+    assert category_of(month, 'SKLAVENITIS 123') == ('🛒 Supermarket', 'Ψώνια Σπιτιού')
+    assert category_of(load_month('2024-01', folder=folder, overlay=False), 'CAFE NERO') == ('🍿 Lifestyle & Έξοδοι', 'Εστίαση & Καφές')
+
+def test_last_write_wins(tmp_path, folder):
+    import_export(tmp_path / "jan.txt", JAN, folder)
+    month = load_month('2024-01', folder=folder, overlay=False)
+    append_overrides(edit(month, 'NETFLIX.COM', '🛍️ Shopping', 'Διάφορα Ψώνια'), '2024-01', folder)
+    append_overrides(edit(month, 'NETFLIX.COM', '💳 FinTech', 'Revolut'), '2024-01', folder)
+    assert category_of(apply_overrides(month, '2024-01', folder), 'NETFLIX.COM') == ('💳 FinTech', 'Revolut')
+
+    # Η πιο πρόσφατη αλλαγή κερδίζει και όταν η παλιότερη έχει ήδη περάσει στο snapshot
+    compact_overrides(folder)
+    append_overrides(edit(month, 'NETFLIX.COM', '🚗 Μετακίνηση', 'Μεταφορικά'), '2024-01', folder)
+    assert category_of(load_month('2024-01', folder=folder), 'NETFLIX.COM') == ('🚗 Μετακίνηση', 'Μεταφορικά')
+    assert len(read_overrides(folder)) == 1
+    compact_overrides(folder)
+    assert category_of(load_month('2024-01', folder=folder), 'NETFLIX.COM') == ('🚗 Μετακίνηση', 'Μεταφορικά')
+
+def test_torn_journal_tail_ignored(tmp_path, folder):
+    import_export(tmp_path / "jan.txt", JAN, folder)
+    month = load_month('2024-01', folder=folder, overlay=False)
+    append_overrides(edit(month, 'CAFE NERO', '🛍️ Shopping', 'Διάφορα Ψώνια'), '2024-01', folder)
+    journal = os.path.join(folder, store.OVERRIDES_JOURNAL)
+    tx_id = int(month.loc[month['Transaction Description'] == 'SKLAVENITIS 123', 'Tx_Id'].iat[0])
+    with open(journal, "a", encoding='utf-8') as f: f.write(f'{{"tx_id": {tx_id}, "month": "2024-01", "categ')
+
+    assert category_of(load_month('2024-01', folder=folder), 'CAFE NERO') == ('🛍️ Shopping', 'Διάφορα Ψώνια')
+    assert category_of(load_month('2024-01', folder=folder), 'SKLAVENITIS 123') == ('🛒 Supermarket', 'Ψώνια Σπιτιού')
+
+    # Το επόμενο append δεν κολλάει πάνω στη μισή γραμμή, και το compaction την πετάει
+    append_overrides(edit(month, 'NETFLIX.COM', '💳 FinTech', 'Revolut'), '2024-01', folder)
+    assert category_of(load_month('2024-01', folder=folder), 'NETFLIX.COM') == ('💳 FinTech', 'Revolut')
+    compact_overrides(folder)
+    assert len(read_overrides(folder)) == 2
+    assert category_of(load_month('2024-01', folder=folder), 'SKLAVENITIS 123') == ('🛒 Supermarket', 'Ψώνια Σπιτιού')